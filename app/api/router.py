@@ -1,7 +1,7 @@
 """API router config."""
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, greet, metrics
+from app.api.v1.endpoints import health, greet, metrics, stats, debug
 
 
 # API v1
@@ -10,3 +10,5 @@ api_v1_router = APIRouter()
 api_v1_router.include_router(health.router, tags=["health"])
 api_v1_router.include_router(greet.router, tags=["greet"])
 api_v1_router.include_router(metrics.router, tags=["metrics"])
+api_v1_router.include_router(stats.router, tags=["stats"])
+api_v1_router.include_router(debug.router, tags=["debug"])
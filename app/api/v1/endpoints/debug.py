@@ -0,0 +1,213 @@
+"""Endpoints de diagnóstico para produção."""
+
+import asyncio
+import hmac
+import os
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
+from fastapi.responses import PlainTextResponse, Response
+
+from app.config.settings import settings
+from app.core.memory import GroupBy, MemoryTracingError, SnapshotNotFoundError, memory_tracer
+from app.core.metrics import metrics
+from app.core.profiler import ProfilerBusyError, profiler
+from app.core.serialization import FastJSONResponse
+from app.core.slowlog import loop_lag_monitor, slow_requests
+from app.core.tracing import tracer
+
+
+async def require_debug_access(authorization: Optional[str] = Header(default=None)) -> None:
+    """
+    Allow the debug endpoints only when enabled, with the debug token.
+
+    Raises:
+        HTTPException: 404 when the endpoints are disabled or no token is set, 401 without the token
+    """
+    if not settings.debug_endpoints_enabled or not settings.debug_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(
+        (authorization or "").encode(), f"Bearer {settings.debug_token}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid debug token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(prefix="/debug", dependencies=[Depends(require_debug_access)], include_in_schema=False)
+
+
+@router.get("/traces")
+async def get_traces(
+    limit: int = Query(default=50, ge=1, le=1000, description="Maximum traces returned"),
+    trace_id: Optional[str] = Query(default=None, description="Return only this trace"),
+) -> FastJSONResponse:
+    """
+    Recent sampled traces of this worker, most recent first.
+
+    Returns:
+        FastJSONResponse: Traces with their spans and the traces buffered
+    """
+    if trace_id is not None:
+        trace = tracer.buffer.find(trace_id)
+        traces = [trace] if trace is not None else []
+    else:
+        traces = tracer.buffer.recent(limit)
+
+    return FastJSONResponse({
+        "buffered": len(tracer.buffer),
+        "sample_rate": tracer.sample_rate,
+        "traces": [trace.as_dict() for trace in traces],
+    })
+
+
+@router.get("/slow")
+async def get_slow_requests(
+    limit: int = Query(default=50, ge=1, le=1000, description="Maximum requests returned"),
+) -> FastJSONResponse:
+    """
+    Recent requests of this worker slower than their threshold, most recent first.
+
+    Each request has its phase timings; sampled requests also have a
+    trace id leading to their spans in `/debug/traces`.
+
+    Returns:
+        FastJSONResponse: Thresholds, current event loop lag and the captured requests
+    """
+    return FastJSONResponse({
+        "threshold_seconds": slow_requests.threshold,
+        "route_thresholds_seconds": slow_requests.route_thresholds,
+        "loop_lag_ms": round(loop_lag_monitor.lag * 1000, 3),
+        "buffered": len(slow_requests),
+        "requests": slow_requests.recent(limit),
+    })
+
+
+@router.get("/profile")
+async def get_profile(
+    seconds: float = Query(default=10.0, gt=0, le=settings.profiler_max_seconds, description="Duration of the profile"),
+    output: Literal["collapsed", "speedscope"] = Query(default="collapsed", alias="format", description="Output format"),
+    interval: Optional[float] = Query(default=None, ge=0.001, le=1, description="Seconds between samples"),
+) -> Response:
+    """
+    Sample the stacks of every thread of this worker for a few seconds.
+
+    The event loop keeps serving while the profile runs. With several
+    workers the profile covers only the worker that got the request,
+    identified by the `X-Worker-PID` header.
+
+    Returns:
+        Response: Collapsed stacks as text, or a speedscope JSON document
+
+    Raises:
+        HTTPException: 409 when a profile is already running in this worker
+    """
+    try:
+        future = profiler.start(seconds, interval or settings.profiler_sample_interval)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    profile = await asyncio.wrap_future(future)
+
+    headers = {"X-Worker-PID": str(os.getpid()), "X-Profile-Samples": str(profile.samples)}
+    if output == "speedscope":
+        return FastJSONResponse(profile.speedscope(f"{settings.app_name} pid {os.getpid()}"), headers=headers)
+    return PlainTextResponse(profile.collapsed(), headers=headers)
+
+
+def _memory_response(operation, *args) -> FastJSONResponse:
+    try:
+        return FastJSONResponse(operation(*args))
+    except MemoryTracingError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except SnapshotNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+
+
+@router.get("/memory")
+async def get_memory() -> FastJSONResponse:
+    """
+    tracemalloc state and the label children of each Prometheus metric.
+
+    Returns:
+        FastJSONResponse: Tracing state, snapshots and metric children counts
+    """
+    return FastJSONResponse({**memory_tracer.status(), "metric_children": metrics.label_children()})
+
+
+@router.post("/memory/start")
+async def start_memory_tracing(
+    frames: int = Query(default=settings.memory_trace_frames, ge=1, le=100, description="Frames stored per allocation"),
+) -> FastJSONResponse:
+    """
+    Start tracing the allocations of this worker.
+
+    Every allocation is slower while tracing, stop it when done.
+
+    Returns:
+        FastJSONResponse: Whether tracing was started by this call
+    """
+    return FastJSONResponse({"started": memory_tracer.start(frames), **memory_tracer.status()})
+
+
+@router.post("/memory/stop")
+async def stop_memory_tracing() -> FastJSONResponse:
+    """
+    Stop tracing and drop the traces and snapshots.
+
+    Returns:
+        FastJSONResponse: Whether tracing was stopped by this call
+    """
+    return FastJSONResponse({"stopped": memory_tracer.stop()})
+
+
+@router.post("/memory/snapshots/{name}")
+def take_memory_snapshot(
+    name: str = Path(..., pattern=r"^[A-Za-z0-9_.-]{1,64}$", description="Snapshot name"),
+    limit: int = Query(default=20, ge=1, le=500, description="Allocation sites returned"),
+) -> FastJSONResponse:
+    """
+    Take a named snapshot of the traced allocations.
+
+    Snapshots are taken in the thread pool, as they walk every trace.
+
+    Returns:
+        FastJSONResponse: Largest allocation sites of the snapshot
+    """
+    def take() -> dict:
+        memory_tracer.take_snapshot(name)
+        return memory_tracer.top(name, limit)
+
+    return _memory_response(take)
+
+
+@router.get("/memory/top")
+def get_memory_top(
+    snapshot: Optional[str] = Query(default=None, description="Snapshot, a new one when empty"),
+    limit: int = Query(default=20, ge=1, le=500, description="Allocation sites returned"),
+    group_by: GroupBy = Query(default="lineno", description="Group by file and line, or by file"),
+) -> FastJSONResponse:
+    """
+    Largest allocation sites.
+
+    Returns:
+        FastJSONResponse: Total traced size and the sites, largest first
+    """
+    return _memory_response(memory_tracer.top, snapshot, limit, group_by)
+
+
+@router.get("/memory/diff")
+def get_memory_diff(
+    base: str = Query(..., description="Older snapshot"),
+    target: Optional[str] = Query(default=None, description="Newer snapshot, a new one when empty"),
+    limit: int = Query(default=20, ge=1, le=500, description="Allocation sites returned"),
+    group_by: GroupBy = Query(default="lineno", description="Group by file and line, or by file"),
+) -> FastJSONResponse:
+    """
+    Allocation sites that changed the most between two snapshots.
+
+    Returns:
+        FastJSONResponse: Total growth and the sites, largest change first
+    """
+    return _memory_response(memory_tracer.diff, base, target, limit, group_by)
@@ -1,14 +1,36 @@
 """Greetings endpoint"""
 
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Optional
-from fastapi import APIRouter, Query, status, HTTPException
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect, status, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from starlette.requests import ClientDisconnect
 from app.models.responses import GreetingResponse, ErrorResponse
-from app.config.settings import settings
 from app.core.metrics import metrics
+from app.core.serialization import ModelResponse
+from app.core.tracing import TracedRoute
+from app.core.streaming import SpooledBody, StreamDecodeError, iter_json_items
+from app.core.validation import (
+    InvalidNameError,
+    NAME_MAX_LENGTH,
+    NAME_MIN_LENGTH,
+    NAME_PATTERN,
+    validate_name,
+)
+
+
+router = APIRouter(route_class=TracedRoute)
+
+# Number of greetings accumulated before recording their metrics
+BATCH_METRICS_FLUSH_SIZE = 1000
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
-router = APIRouter()
+
+def _timestamp() -> str:
+    """Current UTC timestamp in ISO format."""
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
 
 
 @router.get(
@@ -42,12 +64,11 @@ async def greet_user(
         default=None,
         description="Name to send greeting. If it was not sent, it use a standard name to greet!",
         example="Darlei",
-        min_length=1,
-        max_length=100,
-        # This refex filter only alphanumeric chars (a-z, A-Z, 0-9), spaces, hífens, underlines and dots
-        regex=r"^[a-zA-Z0-9\s\-_\.]+$"
+        min_length=NAME_MIN_LENGTH,
+        max_length=NAME_MAX_LENGTH,
+        regex=NAME_PATTERN
     )
-) -> GreetingResponse:
+) -> ModelResponse:
     """
     Greetings endpoint.
     
@@ -58,39 +79,194 @@ async def greet_user(
         alphanumeric chars, spaces, hífens, underlines and dots.
     
     Returns:
-        GreetingResponse: Personalized greet msg
+        ModelResponse: Personalized greet msg (GreetingResponse)
         
     Raises:
         HTTPException: When parameters is invalid
     """
-    # Use a standard name if was not sent
-    if name is None:
-        name = settings.default_greeting_name
-    
-    # Validate if name doesn't have empty after removing spaces
-    name = name.strip()
-    if not name:
-        timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    # Use a standard name if was not sent and validate if name
+    # doesn't have empty after removing spaces
+    try:
+        name = validate_name(name)
+    except InvalidNameError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
-                "error": "Invalid name parameter",
-                "detail": "The name can't been empty or have only spaces",
-                "timestamp": timestamp
+                "error": exc.error,
+                "detail": exc.detail,
+                "timestamp": _timestamp()
             }
         )
     
     # Save greeting request metric
     metrics.record_greet_request(name)
     
-    # Generate greeting message pattern
-    message = f"Hello, {name}!"
-    
-    # timestamp
-    timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-    
+    return ModelResponse(_build_greeting(name))
+
+
+def _build_greeting(name: str) -> GreetingResponse:
+    """Build the greeting response for a validated name."""
     return GreetingResponse(
-        message=message,
+        message=f"Hello, {name}!",
         name=name,
-        timestamp=timestamp
+        timestamp=_timestamp()
     )
+
+
+async def _stream_greetings(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """
+    Generate one NDJSON line per name in the batch.
+    
+    Invalid names, null items included, and invalid NDJSON lines produce
+    an error line and the batch goes on. Metrics are recorded in bulk.
+    """
+    pending: Dict[str, int] = defaultdict(int)
+    pending_total = 0
+    
+    try:
+        async for item in items:
+            if isinstance(item, StreamDecodeError):
+                error = ErrorResponse(error="Invalid batch body", detail=str(item), timestamp=_timestamp())
+                yield error.model_dump_json().encode() + b"\n"
+                continue
+            
+            try:
+                if item is None:
+                    # validate_name takes None as the default name of greet_user
+                    raise InvalidNameError("Invalid name parameter", "The name must be a string")
+                name = validate_name(item)
+            except InvalidNameError as exc:
+                error = ErrorResponse(error=exc.error, detail=exc.detail, timestamp=_timestamp())
+                yield error.model_dump_json().encode() + b"\n"
+                continue
+            
+            yield _build_greeting(name).model_dump_json().encode() + b"\n"
+            
+            pending[name] += 1
+            pending_total += 1
+            if pending_total >= BATCH_METRICS_FLUSH_SIZE:
+                metrics.record_greet_requests(pending)
+                pending.clear()
+                pending_total = 0
+    finally:
+        if pending:
+            metrics.record_greet_requests(pending)
+
+
+@router.post(
+    "/greet/batch",
+    status_code=status.HTTP_200_OK,
+    summary="Batch greetings",
+    description="Greets every name of a JSON array or NDJSON body, streaming the greetings back as NDJSON",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "One greeting (or error) per line, in the order of the names",
+            "content": {
+                NDJSON_MEDIA_TYPE: {
+                    "example": (
+                        '{"message":"Hello, Ana!","name":"Ana","timestamp":"2025-09-12T10:30:00Z"}\n'
+                        '{"error":"Invalid name parameter","detail":"The name can\'t been empty or have only spaces",'
+                        '"timestamp":"2025-09-12T10:30:00Z"}\n'
+                    )
+                }
+            }
+        },
+        400: {
+            "description": "The body is not a JSON array nor NDJSON",
+            "model": ErrorResponse
+        }
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"type": "string"}},
+                    "example": ["Ana", "Bob"]
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"type": "string"},
+                    "example": '"Ana"\n"Bob"\n'
+                }
+            }
+        }
+    },
+    tags=["greet"]
+)
+async def greet_batch(request: Request) -> Response:
+    """
+    Batch greetings endpoint.
+    
+    Accepts a JSON array of names or a NDJSON body with one name per line,
+    validated with the same rules of `greet_user`. The body is decoded
+    while it arrives and the greetings are spooled, spilling to disk past
+    1 MiB, then streamed back once the whole body was read, so memory usage
+    doesn't depend on the batch size.
+    
+    Returns:
+        Response: NDJSON greetings, one per name
+    
+    Raises:
+        HTTPException: 400 when the body as a whole is malformed, e.g. empty or not an array
+    """
+    content_type = request.headers.get("content-type", "")
+    ndjson = content_type.split(";")[0].strip() in (NDJSON_MEDIA_TYPE, "application/ndjson")
+    
+    body = SpooledBody()
+    try:
+        async for line in _stream_greetings(iter_json_items(request.stream(), ndjson=ndjson)):
+            await body.write(line)
+    except ClientDisconnect:
+        body.close()
+        # nginx's status for requests closed by the client, the response is never sent
+        return Response(status_code=499)
+    except StreamDecodeError as exc:
+        body.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid batch body",
+                "detail": str(exc),
+                "timestamp": _timestamp()
+            }
+        )
+    
+    return StreamingResponse(body.iter_chunks(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.websocket("/greet/ws")
+async def greet_websocket(websocket: WebSocket) -> None:
+    """
+    Greetings WebSocket channel.
+    
+    Each text message is a name, validated with the same rules of
+    `greet_user`, and is answered with a GreetingResponse (or an
+    ErrorResponse for invalid names) as JSON. A binary message closes
+    the connection with 1003 (unsupported data). A single long-lived
+    connection avoids the per-request HTTP overhead for clients that
+    greet in tight loops.
+    """
+    await websocket.accept()
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            name = message.get("text")
+            if name is None:
+                await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Names must be text messages")
+                return
+            
+            try:
+                name = validate_name(name)
+            except InvalidNameError as exc:
+                error = ErrorResponse(error=exc.error, detail=exc.detail, timestamp=_timestamp())
+                await websocket.send_text(error.model_dump_json())
+                continue
+            
+            metrics.record_greet_request(name)
+            await websocket.send_text(_build_greeting(name).model_dump_json())
+    except WebSocketDisconnect:
+        pass
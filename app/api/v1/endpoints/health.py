@@ -5,9 +5,12 @@ from fastapi import APIRouter, status
 from app.models.responses import HealthResponse
 from app.config.settings import settings
 from app.core.metrics import metrics
+from app.core.lifecycle import lifecycle
+from app.core.serialization import ModelResponse
+from app.core.tracing import TracedRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get(
@@ -32,14 +35,14 @@ router = APIRouter()
     },
     tags=["health"]
 )
-async def health_check() -> HealthResponse:
+async def health_check() -> ModelResponse:
     """
     Endpoint to check healthy app.
     
     It returns 200 OK with the health when the app is working ok.
     
     Returns:
-        HealthResponse: Status of app health
+        ModelResponse: Status of app health (HealthResponse)
     """
     # Save the metric of health check
     metrics.record_health_check()
@@ -47,8 +50,56 @@ async def health_check() -> HealthResponse:
     # Generate timestamp
     timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
     
-    return HealthResponse(
+    return ModelResponse(HealthResponse(
         status="healthy",
         timestamp=timestamp,
         version=settings.app_version
+    ))
+
+
+@router.get(
+    "/readyz",
+    response_model=HealthResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Readiness verification",
+    description="Return whether the application accepts new traffic",
+    responses={
+        200: {
+            "description": "Application is ready",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "ready",
+                        "timestamp": "2025-09-12T10:30:00Z",
+                        "version": "1.0.0"
+                    }
+                }
+            }
+        },
+        503: {
+            "description": "Application is starting or draining connections",
+            "model": HealthResponse
+        }
+    },
+    tags=["health"]
+)
+async def readiness_check() -> ModelResponse:
+    """
+    Endpoint to check if the app should receive traffic.
+    
+    It returns 503 while the app is starting up or draining on shutdown,
+    so Kubernetes removes the pod from the service endpoints.
+    
+    Returns:
+        ModelResponse: Readiness status of app (HealthResponse)
+    """
+    timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    
+    return ModelResponse(
+        HealthResponse(
+            status="ready" if lifecycle.ready else ("draining" if lifecycle.draining else "starting"),
+            timestamp=timestamp,
+            version=settings.app_version
+        ),
+        status_code=status.HTTP_200_OK if lifecycle.ready else status.HTTP_503_SERVICE_UNAVAILABLE
     )
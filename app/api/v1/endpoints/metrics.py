@@ -1,10 +1,11 @@
 """Endpoint de métricas Prometheus."""
 
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Request, Response, status
 from app.core.metrics import metrics
+from app.core.tracing import TracedRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.get(
@@ -25,7 +26,7 @@ router = APIRouter()
     tags=["metrics"],
     response_class=Response
 )
-async def get_metrics() -> Response:
+async def get_metrics(request: Request) -> Response:
     """
     Endpoint of Prometheus metrics.
     
@@ -38,13 +39,16 @@ async def get_metrics() -> Response:
     - Personalized metrics of app (greeting requests, health checks)
     
     These metrics are automatcly updated when the endpoint is requested,
-    allowing to have fresh stats of system.
+    allowing to have fresh stats of system. Scrapers that accept
+    `application/openmetrics-text` get the OpenMetrics format, with the
+    trace ids of sampled requests as exemplars of the request durations.
     
     Returns:
         Response: Prometheus metrics format
     """
-    metrics_data = metrics.get_metrics()
-    content_type = metrics.get_content_type()
+    openmetrics_format = "application/openmetrics-text" in request.headers.get("accept", "")
+    metrics_data = metrics.get_metrics(openmetrics_format)
+    content_type = metrics.get_content_type(openmetrics_format)
     
     return Response(
         content=metrics_data,
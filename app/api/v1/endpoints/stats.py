@@ -0,0 +1,71 @@
+"""Endpoint de estatísticas RED por rota."""
+
+import os
+import time
+
+from fastapi import APIRouter, status
+
+from app.core.metrics import metrics
+from app.core.serialization import FastJSONResponse
+from app.core.stats import QUANTILES, WINDOWS
+from app.core.tracing import TracedRoute
+
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.get(
+    "/stats",
+    status_code=status.HTTP_200_OK,
+    summary="Per-route request stats",
+    description="Rate, error ratio and latency quantiles per route over the last 1, 5 and 15 minutes of this worker",
+    responses={
+        200: {
+            "description": "Request stats per route and window",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "pid": 7,
+                        "timestamp": 1757673000,
+                        "windows": ["1m", "5m", "15m"],
+                        "routes": {
+                            "/api/v1/greet": {
+                                "1m": {
+                                    "requests": 1200,
+                                    "rate": 20.0,
+                                    "error_ratio": 0.0,
+                                    "p50_ms": 0.61,
+                                    "p90_ms": 0.98,
+                                    "p99_ms": 2.4
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    },
+    tags=["stats"]
+)
+async def get_stats() -> FastJSONResponse:
+    """
+    Endpoint of the sliding-window RED stats.
+    
+    Computed in process from per-second quantile sketches, so it gives a
+    quick view of a single pod without a Prometheus query. Quantiles are
+    within 1% of the exact latency. With several workers each one reports
+    its own requests, identified by `pid`. Requests answered by a middleware
+    before reaching a route (rate limited, cached or unknown paths) are not
+    counted.
+    
+    Returns:
+        FastJSONResponse: Stats of each route over each window
+    """
+    now = time.time()
+    return FastJSONResponse({
+        "pid": os.getpid(),
+        "timestamp": int(now),
+        "windows": [name for name, _ in WINDOWS],
+        "quantiles": [name for name, _ in QUANTILES],
+        "routes": metrics.request_stats.snapshot(now),
+    })
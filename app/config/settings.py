@@ -1,10 +1,35 @@
 """App configuration."""
 
-from typing import Optional
-from pydantic import Field
+from typing import Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import BaseSettings
 
 
+class RateLimit(BaseModel):
+    """Token bucket limit of a route."""
+
+    rate: float = Field(..., gt=0, description="Requests per second allowed per client")
+    burst: float = Field(..., ge=1, description="Requests a client can send at once")
+
+
+class BucketSeries(BaseModel):
+    """Histogram bucket bounds generated as an exponential or linear series."""
+
+    type: Literal["exponential", "linear"] = Field(..., description="Series kind")
+    start: float = Field(..., gt=0, description="First upper bound in seconds")
+    factor: Optional[float] = Field(default=None, gt=1, description="Ratio between bounds of an exponential series")
+    width: Optional[float] = Field(default=None, gt=0, description="Distance between bounds of a linear series")
+    count: int = Field(..., ge=1, le=100, description="Number of bounds")
+
+    @model_validator(mode="after")
+    def check_step(self) -> "BucketSeries":
+        if self.type == "exponential" and self.factor is None:
+            raise ValueError("an exponential series needs a factor")
+        if self.type == "linear" and self.width is None:
+            raise ValueError("a linear series needs a width")
+        return self
+
+
 class Settings(BaseSettings):
     """App config and settings."""
     
@@ -12,20 +37,148 @@ class Settings(BaseSettings):
     app_name: str = Field(default="FastAPI Healthy", description="App name")
     app_version: str = Field(default="1.0.0", description="App version")
     debug: bool = Field(default=False, description="Debug mode")
+    docs_enabled: bool = Field(default=True, description="Serve /docs and /redoc, disable in production")
+    openapi_prebuilt_path: Optional[str] = Field(
+        default=None,
+        description="OpenAPI schema built with `python -m app.core.openapi PATH`, generated on startup when missing"
+    )
     
     # Server
     host: str = Field(default="0.0.0.0", description="Server host")
     port: int = Field(default=8000, description="Server port")
+    uds: Optional[str] = Field(default=None, description="Unix domain socket path to bind instead of the host and port")
+    reuse_port: bool = Field(default=False, description="Bind one SO_REUSEPORT socket per worker")
+    server_profile: Literal["default", "latency", "throughput", "dev"] = Field(
+        default="default",
+        description="uvicorn profile: event loop, HTTP parser, backlog, keep-alive, concurrency and access logs"
+    )
+    workers: Union[int, Literal["auto"]] = Field(default=1, description="Number of worker processes, or auto to size from the CPU quota")
+    thread_pool_size: Optional[int] = Field(default=None, ge=1, description="Thread pool size per worker, derived from the CPU quota with --workers auto and anyio's default otherwise when empty")
+    limit_concurrency: Optional[int] = Field(default=None, ge=1, description="Maximum concurrent connections per worker, derived from the CPU quota with --workers auto and unlimited otherwise when empty")
+
+    # Supervisor
+    supervisor: bool = Field(default=False, description="Run the workers under the recycling supervisor")
+    preload: bool = Field(default=False, description="Load the app in the supervisor and fork the workers from it")
+    worker_max_rss_mb: Optional[int] = Field(default=None, ge=1, description="Worker RSS in MiB that triggers a recycle under the supervisor")
+    worker_max_requests: Optional[int] = Field(default=None, ge=1, description="Requests served by a worker that trigger a recycle under the supervisor")
+    worker_check_interval: float = Field(default=1.0, gt=0, description="Seconds between supervisor checks of the workers")
     
     # Path
     api_v1_prefix: str = Field(default="/api/v1", description="API v1 prefix")    
     metrics_path: str = Field(default="/metrics", description="Prometheus metrics path")
     health_path: str = Field(default="/healthz", description="Health check path")
+    readiness_path: str = Field(default="/readyz", description="Readiness check path")
+
+    # Shutdown
+    shutdown_pre_stop_delay: float = Field(default=0.0, ge=0, description="Seconds to keep serving after readiness is flipped on shutdown")
+    shutdown_drain_timeout: float = Field(default=10.0, ge=0, description="Maximum seconds to wait for in-flight requests on shutdown")
+
+    # Serialization
+    json_engine: Literal["auto", "orjson", "stdlib"] = Field(default="auto", description="JSON encoding engine for responses (auto uses orjson when installed)")
+
+    # Access log
+    access_log_enabled: Optional[bool] = Field(default=None, description="Write the JSON access log, follows the server profile when empty")
+    access_log_default_rate: float = Field(default=1.0, ge=0, le=1, description="Fraction of the requests logged")
+    access_log_sample_rates: Dict[str, float] = Field(
+        default={"/api/v1/healthz": 0.01, "/api/v1/readyz": 0.01},
+        description="Fraction of the requests logged for specific paths"
+    )
+    access_log_max_queue: int = Field(default=10000, ge=1, description="Access log records waiting to be written before new ones are dropped")
+    access_log_flush_interval: float = Field(default=0.5, gt=0, description="Seconds between access log writes")
+
+    # Tracing
+    tracing_enabled: bool = Field(default=True, description="Trace requests and propagate the W3C traceparent")
+    tracing_sample_rate: float = Field(default=0.01, ge=0, le=1, description="Fraction of the requests without a sampled parent that are traced")
+    tracing_buffer_size: int = Field(default=1000, ge=1, description="Sampled traces kept for the debug endpoint")
+    tracing_otlp_endpoint: Optional[str] = Field(default=None, description="OTLP/HTTP JSON traces endpoint, e.g. http://localhost:4318/v1/traces")
+    tracing_export_interval: float = Field(default=5.0, gt=0, description="Seconds between trace export batches")
+    server_timing: Literal["off", "header", "sampled"] = Field(
+        default="off",
+        description="Add a Server-Timing breakdown to requests sending X-Server-Timing (header), or also to every sampled request (sampled); the header never makes a request sampled"
+    )
+
+    # Latency histogram
+    http_duration_buckets: Optional[Union[List[float], BucketSeries]] = Field(
+        default=None,
+        description="Bucket bounds of http_request_duration_seconds, prometheus_client's defaults when empty"
+    )
+    http_duration_route_buckets: Dict[str, Union[List[float], BucketSeries]] = Field(
+        default={
+            "/api/v1/healthz": BucketSeries(type="exponential", start=0.0001, factor=2.5, count=8),
+            "/api/v1/readyz": BucketSeries(type="exponential", start=0.0001, factor=2.5, count=8),
+            "/api/v1/metrics": BucketSeries(type="exponential", start=0.001, factor=2, count=10),
+        },
+        description="Bucket bounds of http_request_duration_seconds for specific route templates"
+    )
+
+    # Queue time
+    request_start_header: Optional[str] = Field(default="X-Request-Start", description="Header the proxy stamps with the time it received the request, empty to disable")
+
+    # Slow requests
+    slow_request_threshold: Optional[float] = Field(default=1.0, gt=0, description="Seconds above which a request is captured for /debug/slow, empty to capture only the routes listed")
+    slow_request_routes: Dict[str, float] = Field(default={}, description="Slow request thresholds in seconds of specific route paths")
+    slow_request_buffer_size: int = Field(default=200, ge=1, description="Slow requests kept for the debug endpoint")
+    event_loop_lag_interval: float = Field(default=0.5, gt=0, description="Seconds between event loop lag measurements")
+
+    # Debug endpoints
+    debug_endpoints_enabled: bool = Field(default=False, description="Serve the /debug endpoints")
+    debug_token: Optional[str] = Field(default=None, description="Bearer token required by the /debug endpoints, which can't be enabled without it")
+    profiler_sample_interval: float = Field(default=0.01, ge=0.001, le=1, description="Default seconds between samples of the CPU profiler")
+    profiler_max_seconds: float = Field(default=60.0, gt=0, description="Longest CPU profile that can be requested")
+    memory_trace_frames: int = Field(default=1, ge=1, le=100, description="Frames stored per allocation when tracemalloc is started")
+    memory_max_snapshots: int = Field(default=10, ge=1, description="tracemalloc snapshots kept before the oldest is dropped")
+
+    # Garbage collector
+    gc_metrics_enabled: bool = Field(default=True, description="Record the pause time and objects of each garbage collection")
+    gc_threshold: Optional[List[int]] = Field(
+        default=None,
+        min_length=1,
+        max_length=3,
+        description="gc.set_threshold values for generations 0, 1 and 2, Python's defaults when empty"
+    )
+    gc_freeze_after_warmup: bool = Field(default=False, description="Move the objects alive after the warm-up to the permanent generation")
+
+    # Warm-up
+    warmup_paths: List[str] = Field(
+        default=[
+            "/",
+            "/api/v1/healthz",
+            "/api/v1/readyz",
+            "/api/v1/greet",
+            "/api/v1/greet?name=Warmup",
+            "/api/v1/metrics",
+            "/openapi.json",
+        ],
+        description="Paths requested in-process on startup before reporting ready, empty to disable"
+    )
+
+    # Response cache
+    response_cache_routes: Dict[str, float] = Field(default={"/": 60.0}, description="Paths served from the response cache and their TTL in seconds")
+    response_cache_max_bytes: int = Field(default=1024 * 1024, ge=0, description="Maximum memory held by the response cache in bytes")
+
+    # Rate limiting
+    rate_limit_enabled: bool = Field(default=True, description="Enable per-client rate limiting")
+    rate_limit_routes: Dict[str, RateLimit] = Field(
+        default={
+            "/api/v1/greet": RateLimit(rate=50, burst=100),
+            "/api/v1/metrics": RateLimit(rate=2, burst=10),
+        },
+        description="Token bucket limit of each rate limited path"
+    )
+    rate_limit_key_header: Optional[str] = Field(default=None, description="Header identifying the client (e.g. X-Forwarded-For), peer address when empty")
+    rate_limit_trusted_hops: int = Field(default=1, ge=1, description="Proxies appending to the key header, the client is the entry this many places from the right")
 
     # Others
     default_greeting_name: str = Field(default="you!!", description="Standard greeting name to use when no name is provided")
     environment: str = Field(default="development", description="Env name")
     
+    @model_validator(mode="after")
+    def check_debug_token(self) -> "Settings":
+        # The debug endpoints expose stacks, allocations and request details
+        if self.debug_endpoints_enabled and not self.debug_token:
+            raise ValueError("DEBUG_ENDPOINTS_ENABLED requires a DEBUG_TOKEN")
+        return self
+    
     class Config:
         """Pydantic configuration."""
         env_file = ".env"
@@ -0,0 +1,134 @@
+"""Sampled JSON access log written in batches by a background thread."""
+
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Optional
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.core.serialization import dumps
+
+
+class AccessLogger:
+    """
+    Access log that keeps formatting and writes off the event loop.
+
+    Requests are sampled per path and appended as tuples to a bounded
+    queue. A background thread wakes up every `flush_interval` seconds,
+    formats the queued records as JSON lines and writes them in a single
+    call. When the queue is full records are dropped and counted instead
+    of blocking the request.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_rate: float = 1.0,
+        max_queue: int = 10000,
+        flush_interval: float = 0.5,
+        stream: Optional[BinaryIO] = None,
+    ):
+        """
+        Constructor.
+
+        Args:
+            sample_rates: Fraction of the requests logged for each path
+            default_rate: Fraction of the requests logged for other paths
+            max_queue: Records waiting to be written before new ones are dropped
+            flush_interval: Seconds between writes
+            stream: Binary stream to write to, stdout when None
+        """
+        self.sample_rates = sample_rates or {}
+        self.default_rate = default_rate
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.stream = stream
+        self._records: deque = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread after writing the queued records."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def log(self, method: str, path: str, status: int, duration: float, client: str) -> None:
+        """Queue the record of a request, subject to the sampling rate of its path."""
+        if self._thread is None:
+            return
+
+        rate = self.sample_rates.get(path, self.default_rate)
+        if rate < 1.0 and random.random() >= rate:
+            return
+
+        if len(self._records) >= self.max_queue:
+            metrics.record_access_log_dropped()
+            return
+        self._records.append((time.time(), method, path, status, duration, client, rate))
+
+    def flush(self) -> int:
+        """
+        Write the queued records.
+
+        Returns:
+            int: Number of records written
+        """
+        depth = len(self._records)
+        metrics.record_access_log_queue_depth(depth)
+        if not depth:
+            return 0
+
+        lines = []
+        popleft = self._records.popleft
+        for _ in range(depth):
+            timestamp, method, path, status, duration, client, rate = popleft()
+            lines.append(dumps({
+                "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace('+00:00', 'Z'),
+                "client": client,
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": round(duration * 1000, 3),
+                "sample_rate": rate,
+            }))
+
+        stream = self.stream or sys.stdout.buffer
+        try:
+            stream.write(b"\n".join(lines) + b"\n")
+            stream.flush()
+        except (OSError, ValueError):
+            # A closed or broken stdout must not take the worker down
+            pass
+        return depth
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+
+access_log = AccessLogger(
+    sample_rates=settings.access_log_sample_rates,
+    default_rate=settings.access_log_default_rate,
+    max_queue=settings.access_log_max_queue,
+    flush_interval=settings.access_log_flush_interval,
+)
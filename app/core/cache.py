@@ -0,0 +1,236 @@
+"""In-memory HTTP response cache for idempotent GET routes."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics
+
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class CacheEntry:
+    """Pre-encoded response kept in the cache."""
+
+    __slots__ = ("status", "headers", "body", "etag", "expires", "size")
+
+    def __init__(self, status: int, headers: Headers, body: bytes, etag: bytes, expires: float):
+        """Constructor."""
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+        self.size = len(body) + sum(len(k) + len(v) for k, v in headers)
+
+
+class ResponseCache:
+    """LRU cache with per entry TTL bounded by the total size of the entries."""
+
+    def __init__(self, max_bytes: int, clock=time.monotonic):
+        """Constructor."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Get a fresh entry and mark it as recently used.
+
+        Returns:
+            Tuple[Optional[CacheEntry], bool]: Entry (None on miss) and whether
+            an expired entry was evicted
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        if entry.expires <= self._clock():
+            self._remove(key)
+            return None, True
+        self._entries.move_to_end(key)
+        return entry, False
+
+    def put(self, key: str, status: int, headers: Headers, body: bytes, etag: bytes, ttl: float) -> int:
+        """
+        Store an entry, evicting the least recently used ones to fit it.
+
+        Returns:
+            int: Number of entries evicted to make room
+        """
+        entry = CacheEntry(status, headers, body, etag, self._clock() + ttl)
+        if entry.size > self.max_bytes:
+            return 0
+
+        if key in self._entries:
+            self._remove(key)
+
+        evicted = 0
+        while self._entries and self.size + entry.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            evicted += 1
+
+        self._entries[key] = entry
+        self.size += entry.size
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        self.size -= self._entries.pop(key).size
+
+
+def make_etag(body: bytes) -> bytes:
+    """Strong ETag for a response body."""
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """Whether an `If-None-Match` header matches an ETag."""
+    if if_none_match.strip() == b"*":
+        return True
+    weak_etag = b"W/" + etag
+    return any(tag.strip() in (etag, weak_etag) for tag in if_none_match.split(b","))
+
+
+def _cache_key(path: str, query_string: bytes) -> str:
+    if not query_string:
+        return path
+    query = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{path}?{urlencode(query)}"
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve cached responses for the configured GET routes.
+
+    Responses are cached with their headers and an ETag, keyed on the path
+    plus the normalized query string. Requests with a matching
+    `If-None-Match` get a `304 Not Modified` without the body.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache, routes: Dict[str, float]):
+        """
+        Constructor.
+
+        Args:
+            app: Wrapped ASGI application
+            cache: Cache storage
+            routes: TTL in seconds of each cached path
+        """
+        self.app = app
+        self.cache = cache
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        ttl = self.routes.get(path)
+        if ttl is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = b""
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+            elif name == b"cache-control" and b"no-cache" in value:
+                # The client asked for a fresh response
+                await self.app(scope, receive, send)
+                return
+
+        key = _cache_key(path, scope.get("query_string", b""))
+        entry, expired = self.cache.get(key)
+        if expired:
+            metrics.record_cache_eviction("expired")
+
+        if entry is not None:
+            metrics.record_cache_hit(path)
+            await self._send_entry(entry, if_none_match, scope["method"], send)
+            return
+
+        metrics.record_cache_miss(path)
+        await self._fetch_and_store(scope, receive, send, key, ttl, if_none_match)
+
+    async def _send_entry(self, entry: CacheEntry, if_none_match: bytes, method: str, send: Send) -> None:
+        if if_none_match and etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", entry.etag)]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # Outer middlewares may add headers in place, so they get a copy
+        await send({"type": "http.response.start", "status": entry.status, "headers": list(entry.headers)})
+        await send({"type": "http.response.body", "body": b"" if method == "HEAD" else entry.body})
+
+    async def _fetch_and_store(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key: str,
+        ttl: float,
+        if_none_match: bytes,
+    ) -> None:
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start = message
+                cacheable = message["status"] == 200 and not any(
+                    name == b"cache-control" and b"no-store" in value
+                    for name, value in message.get("headers", [])
+                )
+                if not cacheable:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # Streaming responses are not cached
+                passthrough = True
+                await send(start)
+                for chunk in chunks:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                return
+
+            body = b"".join(chunks)
+            etag = make_etag(body)
+            headers = [(name, value) for name, value in start.get("headers", []) if name != b"etag"]
+            headers.append((b"etag", etag))
+
+            if scope["method"] == "GET":
+                evicted = self.cache.put(key, start["status"], headers, body, etag, ttl)
+                if evicted:
+                    metrics.record_cache_eviction("capacity", evicted)
+                metrics.record_cache_size(self.cache.size)
+
+            entry = CacheEntry(start["status"], headers, body, etag, 0.0)
+            await self._send_entry(entry, if_none_match, scope["method"], send)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,140 @@
+"""Garbage collector pause instrumentation and tuning."""
+
+import bisect
+import gc
+import time
+from typing import List, Optional
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+
+PAUSE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+GENERATIONS = (0, 1, 2)
+
+
+class GCStats:
+    """
+    Pause time and objects of the collections of each generation.
+
+    The `gc.callbacks` hook runs inside whatever allocation triggered the
+    collection, possibly while a metric lock is held by a scrape, so it
+    only updates plain counters. They are turned into metric families
+    when the registry collects.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self.installed = False
+        self._started = 0.0
+        # Per generation; the last bucket of each histogram is +Inf
+        self.collections = [0] * len(GENERATIONS)
+        self.collected = [0] * len(GENERATIONS)
+        self.uncollectable = [0] * len(GENERATIONS)
+        self.pause_sum = [0.0] * len(GENERATIONS)
+        self.pause_buckets = [[0] * (len(PAUSE_BUCKETS) + 1) for _ in GENERATIONS]
+
+    def install(self) -> None:
+        """Start recording the collections."""
+        if not self.installed:
+            gc.callbacks.append(self._callback)
+            self.installed = True
+
+    def uninstall(self) -> None:
+        """Stop recording the collections."""
+        if self.installed:
+            gc.callbacks.remove(self._callback)
+            self.installed = False
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        # Installed while a collection was running
+        if not self._started:
+            return
+        pause = time.perf_counter() - self._started
+        self._started = 0.0
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.collected[generation] += info["collected"]
+        self.uncollectable[generation] += info["uncollectable"]
+        self.pause_sum[generation] += pause
+        self.pause_buckets[generation][bisect.bisect_left(PAUSE_BUCKETS, pause)] += 1
+
+    def collect(self):
+        pauses = HistogramMetricFamily(
+            'python_gc_pause_seconds',
+            'Garbage collection pause time per generation',
+            labels=['generation']
+        )
+        collections = CounterMetricFamily(
+            'python_gc_collections',
+            'Garbage collections per generation',
+            labels=['generation']
+        )
+        collected = CounterMetricFamily(
+            'python_gc_objects_collected',
+            'Objects collected per generation',
+            labels=['generation']
+        )
+        uncollectable = CounterMetricFamily(
+            'python_gc_objects_uncollectable',
+            'Uncollectable objects found per generation',
+            labels=['generation']
+        )
+        threshold = GaugeMetricFamily(
+            'python_gc_threshold',
+            'Collection threshold per generation',
+            labels=['generation']
+        )
+        for generation, value in zip(GENERATIONS, gc.get_threshold()):
+            label = [str(generation)]
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(PAUSE_BUCKETS + (float("inf"),), self.pause_buckets[generation]):
+                cumulative += count
+                buckets.append((str(bound) if bound != float("inf") else "+Inf", cumulative))
+            pauses.add_metric(label, buckets, self.pause_sum[generation])
+            collections.add_metric(label, self.collections[generation])
+            collected.add_metric(label, self.collected[generation])
+            uncollectable.add_metric(label, self.uncollectable[generation])
+            threshold.add_metric(label, value)
+        yield pauses
+        yield collections
+        yield collected
+        yield uncollectable
+        yield threshold
+        yield GaugeMetricFamily(
+            'python_gc_frozen_objects',
+            'Objects moved to the permanent generation by gc.freeze()',
+            value=gc.get_freeze_count()
+        )
+
+
+def apply_gc_settings(threshold: Optional[List[int]]) -> None:
+    """
+    Set the collection thresholds.
+
+    Args:
+        threshold: Thresholds of generations 0, 1 and 2; unset generations keep their value
+    """
+    if threshold:
+        gc.set_threshold(*threshold)
+
+
+def freeze() -> int:
+    """
+    Collect and move the surviving objects to the permanent generation.
+
+    Objects alive after the warm-up (modules, routes, validators) are then
+    skipped by every later collection, which shortens the gen-2 pauses.
+
+    Returns:
+        int: Objects frozen
+    """
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+gc_stats = GCStats()
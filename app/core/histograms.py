@@ -0,0 +1,183 @@
+"""Latency histogram with a bucket layout per route."""
+
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from prometheus_client import Histogram
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.samples import Exemplar
+from prometheus_client.utils import floatToGoString
+
+from app.config.settings import BucketSeries
+
+
+BucketSpec = Union[Sequence[float], BucketSeries]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(bound for bound in Histogram.DEFAULT_BUCKETS if bound != float("inf"))
+
+
+def _round(value: float) -> float:
+    # Keep generated bounds readable in the exposition, e.g. 0.00025 instead of 0.00025000000000000006
+    return float(f"{value:.6g}")
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> List[float]:
+    """`count` bounds starting at `start`, each `factor` times the previous one."""
+    return [_round(start * factor ** index) for index in range(count)]
+
+
+def linear_buckets(start: float, width: float, count: int) -> List[float]:
+    """`count` bounds starting at `start`, each `width` above the previous one."""
+    return [_round(start + width * index) for index in range(count)]
+
+
+def resolve_buckets(spec: Optional[BucketSpec]) -> Tuple[float, ...]:
+    """
+    Upper bounds of a bucket layout, without the implicit +Inf.
+
+    Args:
+        spec: Explicit bounds, a generated series, or None for prometheus_client's defaults
+
+    Returns:
+        Tuple[float, ...]: Increasing upper bounds
+
+    Raises:
+        ValueError: When the bounds are empty or not strictly increasing
+    """
+    if spec is None:
+        return DEFAULT_BUCKETS
+    if isinstance(spec, BucketSeries):
+        if spec.type == "exponential":
+            bounds = exponential_buckets(spec.start, spec.factor, spec.count)
+        else:
+            bounds = linear_buckets(spec.start, spec.width, spec.count)
+    else:
+        bounds = [float(bound) for bound in spec if bound != float("inf")]
+
+    if not bounds:
+        raise ValueError("Histogram buckets must have at least one bound")
+    if any(upper <= lower for lower, upper in zip(bounds, bounds[1:])):
+        raise ValueError(f"Histogram buckets must be strictly increasing: {bounds}")
+    return tuple(bounds)
+
+
+class _Child:
+    """Counts of one label set."""
+
+    __slots__ = ("bounds", "counts", "sum", "exemplars")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # The last count is the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.exemplars: List[Optional[Exemplar]] = [None] * (len(bounds) + 1)
+
+
+class RouteHistogram:
+    """
+    Histogram whose bucket layout is chosen by the route of each request.
+
+    prometheus_client histograms share one layout across all their label
+    sets, so sub-millisecond probes and slow scrapes would get the same
+    buckets. Here each label set takes the layout of the route template it
+    was first observed for, falling back to the default layout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Optional[BucketSpec] = None,
+        route_buckets: Optional[Dict[str, BucketSpec]] = None,
+    ):
+        """
+        Constructor.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names, in the order of the values passed to `observe`
+            buckets: Default layout
+            route_buckets: Layouts of specific route templates
+
+        Raises:
+            ValueError: When a layout is invalid
+        """
+        self._name = name
+        self._documentation = documentation
+        self._labelnames = tuple(labelnames)
+        self.buckets = resolve_buckets(buckets)
+        self.route_buckets = {route: resolve_buckets(spec) for route, spec in (route_buckets or {}).items()}
+        self._metrics: Dict[Tuple[str, ...], _Child] = {}
+        self._lock = threading.Lock()
+
+    def buckets_for(self, route: Optional[str]) -> Tuple[float, ...]:
+        if route is None:
+            return self.buckets
+        return self.route_buckets.get(route, self.buckets)
+
+    def series_per_label_set(self, route: Optional[str]) -> int:
+        """Series exposed for each label set of a route: the buckets, +Inf, _sum and _count."""
+        return len(self.buckets_for(route)) + 3
+
+    def series_report(self, routes: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+        """
+        Series each route adds to the histogram for each path it serves.
+
+        Args:
+            routes: Route templates and the number of methods they serve
+
+        Returns:
+            Dict[str, int]: Series of each route
+        """
+        return {path: self.series_per_label_set(path) * methods for path, methods in routes}
+
+    def observe(
+        self,
+        labelvalues: Tuple[str, ...],
+        route: Optional[str],
+        value: float,
+        exemplar: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Observe a value.
+
+        Args:
+            labelvalues: Label values, in the order of the label names
+            route: Route template choosing the layout of a new label set
+            value: Observed value
+            exemplar: Exemplar labels attached to the bucket of the value
+        """
+        with self._lock:
+            child = self._metrics.get(labelvalues)
+            if child is None:
+                child = self._metrics[labelvalues] = _Child(self.buckets_for(route))
+            # Buckets are inclusive upper bounds
+            index = bisect.bisect_left(child.bounds, value)
+            child.counts[index] += 1
+            child.sum += value
+            if exemplar:
+                child.exemplars[index] = Exemplar(exemplar, value, time.time())
+
+    def describe(self) -> Iterable[HistogramMetricFamily]:
+        return [HistogramMetricFamily(self._name, self._documentation, labels=self._labelnames)]
+
+    def collect(self) -> Iterable[HistogramMetricFamily]:
+        family = HistogramMetricFamily(self._name, self._documentation, labels=self._labelnames)
+        with self._lock:
+            children = [
+                (labelvalues, child.bounds, list(child.counts), child.sum, list(child.exemplars))
+                for labelvalues, child in self._metrics.items()
+            ]
+        for labelvalues, bounds, counts, total, exemplars in children:
+            buckets = []
+            cumulative = 0
+            for bound, count, exemplar in zip(bounds + (float("inf"),), counts, exemplars):
+                cumulative += count
+                buckets.append((floatToGoString(bound), cumulative, exemplar))
+            family.add_metric(list(labelvalues), buckets, total)
+        return [family]
@@ -0,0 +1,72 @@
+"""Application lifecycle state: readiness and in-flight request tracking."""
+
+from typing import Optional, Sequence
+
+
+# Reasons of worker recycles, indexes of the shared recycle counters
+RECYCLE_REASONS = ("rss", "requests", "crash")
+
+
+class LifecycleState:
+    """Readiness flag and in-flight request counter shared by the app."""
+
+    def __init__(self):
+        """Constructor."""
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+        # Set while the lifespan sends the warm-up requests, which are not recorded
+        self.warming_up = False
+        # Shared with the supervisor process when running under `run.py --supervisor`
+        self.worker_stats: Optional[Sequence[int]] = None
+        self.worker_recycles: Optional[Sequence[int]] = None
+
+    def attach_supervisor(self, worker_stats: Sequence[int], worker_recycles: Sequence[int]) -> None:
+        """
+        Share the request count and readiness of this worker with the supervisor.
+
+        Args:
+            worker_stats: Shared [requests, ready] array of this worker
+            worker_recycles: Shared recycle counters of all workers, see `app.core.supervisor`
+        """
+        self.worker_stats = worker_stats
+        self.worker_recycles = worker_recycles
+
+    def request_started(self) -> None:
+        """Mark the start of a request."""
+        self.in_flight += 1
+        if self.worker_stats is not None:
+            self.worker_stats[0] += 1
+
+    def request_finished(self) -> None:
+        """Mark the end of a request."""
+        self.in_flight -= 1
+
+    def mark_ready(self) -> None:
+        """Report the app as ready to receive traffic."""
+        self.ready = True
+        self.draining = False
+        if self.worker_stats is not None:
+            self.worker_stats[1] = 1
+
+    def begin_drain(self) -> None:
+        """Report the app as not ready, so the load balancer stops routing to it."""
+        self.ready = False
+        self.draining = True
+        if self.worker_stats is not None:
+            self.worker_stats[1] = 0
+
+
+class DrainResult:
+    """Outcome of a shutdown drain."""
+
+    def __init__(self, duration: float, dropped: int):
+        """Constructor."""
+        self.duration = duration
+        self.dropped = dropped
+
+    def __repr__(self) -> str:
+        return f"DrainResult(duration={self.duration:.3f}, dropped={self.dropped})"
+
+
+lifecycle = LifecycleState()
@@ -0,0 +1,193 @@
+"""On-demand tracemalloc snapshots of the worker allocations."""
+
+import threading
+import tracemalloc
+from collections import OrderedDict
+from typing import List, Literal, Optional
+
+from app.config.settings import settings
+
+# Allocations of tracemalloc itself and of the import machinery are noise
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+GroupBy = Literal["lineno", "filename"]
+
+
+class MemoryTracingError(RuntimeError):
+    """Raised when a snapshot is requested while tracemalloc is not tracing."""
+
+
+class SnapshotNotFoundError(LookupError):
+    """Raised when a named snapshot does not exist."""
+
+
+def _stat_dict(stat, group_by: GroupBy) -> dict:
+    frame = stat.traceback[0]
+    result = {"file": frame.filename, "size_bytes": stat.size, "count": stat.count}
+    if group_by == "lineno":
+        result["line"] = frame.lineno
+    return result
+
+
+class MemoryTracer:
+    """
+    Named tracemalloc snapshots, taken on demand.
+
+    tracemalloc slows every allocation down and its traces take memory,
+    so it only runs between `start()` and `stop()`. Snapshots are kept by
+    name, the oldest dropped beyond `max_snapshots`, and all of them are
+    discarded when tracing stops.
+    """
+
+    def __init__(self, max_snapshots: int = 10):
+        """
+        Constructor.
+
+        Args:
+            max_snapshots: Snapshots kept before the oldest is dropped
+        """
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> bool:
+        """
+        Start tracing the allocations.
+
+        Args:
+            frames: Frames stored for each allocation
+
+        Returns:
+            bool: False when tracemalloc was already tracing
+        """
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(frames)
+        return True
+
+    def stop(self) -> bool:
+        """
+        Stop tracing and drop the traces and snapshots.
+
+        Returns:
+            bool: False when tracemalloc was not tracing
+        """
+        with self._lock:
+            self._snapshots.clear()
+        if not tracemalloc.is_tracing():
+            return False
+        tracemalloc.stop()
+        return True
+
+    def snapshots(self) -> List[str]:
+        with self._lock:
+            return list(self._snapshots)
+
+    def take_snapshot(self, name: str) -> tracemalloc.Snapshot:
+        """
+        Take a snapshot and keep it under a name, replacing a previous one.
+
+        Raises:
+            MemoryTracingError: When tracemalloc is not tracing
+        """
+        snapshot = self._take()
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def top(self, name: Optional[str] = None, limit: int = 20, group_by: GroupBy = "lineno") -> dict:
+        """
+        Largest allocation sites of a snapshot.
+
+        Args:
+            name: Snapshot, a new one when None
+            limit: Sites returned
+            group_by: Group the allocations by line or by file
+
+        Returns:
+            dict: Total traced size and the sites, largest first
+
+        Raises:
+            MemoryTracingError: When tracemalloc is not tracing
+            SnapshotNotFoundError: When the snapshot does not exist
+        """
+        snapshot = self._get(name) if name is not None else self._take()
+        stats = snapshot.statistics(group_by)
+        return {
+            "snapshot": name,
+            "total_bytes": sum(stat.size for stat in stats),
+            "stats": [_stat_dict(stat, group_by) for stat in stats[:limit]],
+        }
+
+    def diff(self, base: str, target: Optional[str] = None, limit: int = 20, group_by: GroupBy = "lineno") -> dict:
+        """
+        Allocation sites that grew the most between two snapshots.
+
+        Args:
+            base: Older snapshot
+            target: Newer snapshot, a new one when None
+            limit: Sites returned
+            group_by: Group the allocations by line or by file
+
+        Returns:
+            dict: Total growth and the sites, largest change first
+
+        Raises:
+            MemoryTracingError: When tracemalloc is not tracing
+            SnapshotNotFoundError: When a snapshot does not exist
+        """
+        base_snapshot = self._get(base)
+        target_snapshot = self._get(target) if target is not None else self._take()
+        stats = target_snapshot.compare_to(base_snapshot, group_by)
+
+        items = []
+        for stat in stats[:limit]:
+            item = _stat_dict(stat, group_by)
+            item["size_diff_bytes"] = stat.size_diff
+            item["count_diff"] = stat.count_diff
+            items.append(item)
+        return {
+            "base": base,
+            "target": target,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "stats": items,
+        }
+
+    def status(self) -> dict:
+        """Tracing state, traced memory and the snapshots kept."""
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": self.snapshots(),
+        }
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise MemoryTracingError("tracemalloc is not tracing, start it first")
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def _get(self, name: str) -> tracemalloc.Snapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            raise SnapshotNotFoundError(f"Unknown snapshot {name!r}")
+        return snapshot
+
+
+memory_tracer = MemoryTracer(max_snapshots=settings.memory_max_snapshots)
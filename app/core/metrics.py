@@ -1,22 +1,63 @@
-"""Prometheus metrics collector config."""
+"""
+Prometheus metrics collector config.
+
+psutil and the platform probing are only used when metrics are
+scraped, so they are loaded on first use to keep them off the startup
+path of the workers.
+"""
 
 import time
-import psutil
-import platform
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest, CONTENT_TYPE_LATEST
-from prometheus_client.core import CollectorRegistry
+from prometheus_client.core import CollectorRegistry, CounterMetricFamily
+from prometheus_client.openmetrics import exposition as openmetrics
+
+from app.config.settings import settings
+from app.core.gcstats import gc_stats
+from app.core.histograms import BucketSpec, RouteHistogram
+from app.core.lifecycle import RECYCLE_REASONS, lifecycle
+from app.core.stats import RequestStats
+
+
+class WorkerRecyclesCollector:
+    """Expose the recycle counters the supervisor shares with the workers."""
+    
+    def collect(self):
+        family = CounterMetricFamily(
+            'app_worker_recycles',
+            'Workers recycled by the supervisor',
+            labels=['reason']
+        )
+        recycles = lifecycle.worker_recycles
+        for index, reason in enumerate(RECYCLE_REASONS):
+            family.add_metric([reason], recycles[index] if recycles is not None else 0)
+        yield family
 
 
 class PrometheusMetrics:
     """Prometheus metrics collector config."""
     
-    def __init__(self):
-        """Constructor."""
+    def __init__(
+        self,
+        duration_buckets: Optional[BucketSpec] = None,
+        route_duration_buckets: Optional[Dict[str, BucketSpec]] = None
+    ):
+        """
+        Constructor.
+        
+        Args:
+            duration_buckets: Bucket layout of the request durations, prometheus_client's defaults when None
+            route_duration_buckets: Bucket layouts of the request durations of specific route templates
+        """
         self.registry = CollectorRegistry()
+        self.request_stats = RequestStats()
+        self._duration_buckets = duration_buckets
+        self._route_duration_buckets = route_duration_buckets
         self._init_metrics()
         self._last_cpu_times = None
         self._last_cpu_check = time.time()
+        self._app_info: Optional[Dict[str, str]] = None
+        self._startup_recorded = False
     
     def _init_metrics(self) -> None:
         """Init all Prometheus metrics."""
@@ -28,12 +69,14 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
-        self.http_request_duration_seconds = Histogram(
+        self.http_request_duration_seconds = RouteHistogram(
             'http_request_duration_seconds',
             'HTTP request duration in seconds',
             ['method', 'endpoint'],
-            registry=self.registry
+            buckets=self._duration_buckets,
+            route_buckets=self._route_duration_buckets
         )
+        self.registry.register(self.http_request_duration_seconds)
         
         self.app_info = Info(
             'app_info',
@@ -41,6 +84,12 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
+        self.worker_sizing = Info(
+            'app_worker_sizing',
+            'Resolved worker count, CPU limit and per-worker limits',
+            registry=self.registry
+        )
+        
         # Métricas do sistema
         self.system_cpu_usage = Gauge(
             'system_cpu_usage_percent',
@@ -120,23 +169,141 @@ class PrometheusMetrics:
             registry=self.registry
         )
         
+        self.greet_rejections_total = Counter(
+            'greet_rejections_total',
+            'Greeting requests rejected by the name validation',
+            ['reason'],
+            registry=self.registry
+        )
+        
         self.health_checks_total = Counter(
             'health_checks_total',
             'Total health check requests',
             registry=self.registry
         )
+        
+        self.startup_seconds = Gauge(
+            'app_startup_seconds',
+            'Seconds from process start to the first successful health check',
+            registry=self.registry
+        )
+        
+        self.access_log_dropped_total = Counter(
+            'access_log_dropped_total',
+            'Access log records dropped because the queue was full',
+            registry=self.registry
+        )
+        
+        self.access_log_queue_depth = Gauge(
+            'access_log_queue_depth',
+            'Access log records waiting to be written at the last flush',
+            registry=self.registry
+        )
+        
+        self.trace_export_dropped_total = Counter(
+            'trace_export_dropped_total',
+            'Sampled traces dropped by the exporter on a full queue or a failed export',
+            registry=self.registry
+        )
+        
+        self.http_request_queue_seconds = Histogram(
+            'http_request_queue_seconds',
+            'Seconds requests waited between the proxy stamping X-Request-Start and the app',
+            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+            registry=self.registry
+        )
+        
+        self.slow_requests_total = Counter(
+            'http_slow_requests_total',
+            'Requests slower than their threshold captured for /debug/slow',
+            ['endpoint'],
+            registry=self.registry
+        )
+        
+        self.event_loop_lag_seconds = Gauge(
+            'event_loop_lag_seconds',
+            'Seconds the event loop was late waking up the lag monitor',
+            registry=self.registry
+        )
+        
+        self.warmup_seconds = Gauge(
+            'app_warmup_seconds',
+            'Seconds spent sending the warm-up requests on startup',
+            registry=self.registry
+        )
+        
+        # Lifecycle metrics
+        self.http_requests_in_flight = Gauge(
+            'http_requests_in_flight',
+            'HTTP requests currently being processed',
+            registry=self.registry
+        )
+        
+        self.registry.register(WorkerRecyclesCollector())
+        self.registry.register(gc_stats)
+        
+        # Rate limiting metrics
+        self.rate_limited_total = Counter(
+            'http_rate_limited_total',
+            'Requests rejected by the rate limiter',
+            ['endpoint'],
+            registry=self.registry
+        )
+        
+        # Response cache metrics
+        self.response_cache_hits_total = Counter(
+            'http_response_cache_hits_total',
+            'Requests served from the response cache',
+            ['endpoint'],
+            registry=self.registry
+        )
+        
+        self.response_cache_misses_total = Counter(
+            'http_response_cache_misses_total',
+            'Cacheable requests not found in the response cache',
+            ['endpoint'],
+            registry=self.registry
+        )
+        
+        self.response_cache_evictions_total = Counter(
+            'http_response_cache_evictions_total',
+            'Entries evicted from the response cache',
+            ['reason'],
+            registry=self.registry
+        )
+        
+        self.response_cache_size = Gauge(
+            'http_response_cache_size_bytes',
+            'Memory held by the response cache entries in bytes',
+            registry=self.registry
+        )
     
     def set_app_info(self, app_name: str, version: str, environment: str) -> None:
-        self.app_info.info({
+        """Set the app info, the platform details are added on the first scrape."""
+        self._app_info = {
             'name': app_name,
             'version': version,
             'environment': environment,
+        }
+        self.app_info.info(self._app_info)
+    
+    def _add_platform_info(self) -> None:
+        import platform
+        
+        self._app_info.update({
             'python_version': platform.python_version(),
             'platform': platform.platform(),
             'architecture': platform.machine(),
         })
+        self.app_info.info(self._app_info)
+    
+    def set_worker_sizing(self, sizing: Dict[str, str]) -> None:
+        """Set the resolved worker sizing."""
+        self.worker_sizing.info(sizing)
     
     def update_system_metrics(self) -> None:
+        import psutil
+        
         try:
             # CPU usage
             cpu_percent = psutil.cpu_percent(interval=None)
@@ -177,6 +344,8 @@ class PrometheusMetrics:
             pass
     
     def update_process_metrics(self) -> None:
+        import psutil
+        
         try:
             process = psutil.Process()
             
@@ -204,38 +373,155 @@ class PrometheusMetrics:
             # Handle psutil errors gracefully
             pass
     
-    def record_request(self, method: str, endpoint: str, status_code: int, duration: float) -> None:
-        """Record HTTP request metrics."""
+    def record_request(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: int,
+        duration: float,
+        trace_id: Optional[str] = None,
+        route: Optional[str] = None
+    ) -> None:
+        """
+        Record HTTP request metrics, with the trace id as exemplar of sampled requests.
+        
+        Requests that matched a route are also counted in the sliding-window
+        stats of its path template, which also picks the bucket layout of
+        the duration histogram.
+        """
         self.http_requests_total.labels(
             method=method,
             endpoint=endpoint,
             status=str(status_code)
         ).inc()
         
-        self.http_request_duration_seconds.labels(
-            method=method,
-            endpoint=endpoint
-        ).observe(duration)
+        self.http_request_duration_seconds.observe(
+            (method, endpoint),
+            route,
+            duration,
+            {'trace_id': trace_id} if trace_id else None
+        )
+        
+        if route is not None:
+            self.request_stats.record(route, status_code, duration)
     
     def record_greet_request(self, name: str) -> None:
         """Record greeting request metrics."""
+        if lifecycle.warming_up:
+            return
         self.greet_requests_total.labels(name=name).inc()
     
+    def record_greet_requests(self, counts: Dict[str, int]) -> None:
+        """Record greeting request metrics for a batch of names."""
+        for name, count in counts.items():
+            self.greet_requests_total.labels(name=name).inc(count)
+    
+    def record_greet_rejection(self, reason: str) -> None:
+        """Record a greeting request rejected by the name validation."""
+        self.greet_rejections_total.labels(reason=reason).inc()
+    
     def record_health_check(self) -> None:
         """Record health check request metrics."""
+        if lifecycle.warming_up:
+            return
         self.health_checks_total.inc()
+        if not self._startup_recorded:
+            self._startup_recorded = True
+            self.record_startup()
+    
+    def record_startup(self) -> None:
+        """Record the time from process start until now."""
+        import psutil
+        
+        try:
+            started = psutil.Process().create_time()
+        except Exception:
+            return
+        self.startup_seconds.set(max(time.time() - started, 0.0))
+    
+    def record_access_log_dropped(self) -> None:
+        """Record an access log record dropped on a full queue."""
+        self.access_log_dropped_total.inc()
+    
+    def record_access_log_queue_depth(self, depth: int) -> None:
+        """Record the access log records waiting to be written."""
+        self.access_log_queue_depth.set(depth)
+    
+    def record_trace_export_dropped(self, count: int) -> None:
+        """Record traces the exporter could not deliver."""
+        self.trace_export_dropped_total.inc(count)
+    
+    def record_queue_time(self, seconds: float) -> None:
+        """Record the time a request waited before reaching the app."""
+        self.http_request_queue_seconds.observe(seconds)
+    
+    def record_slow_request(self, endpoint: str) -> None:
+        """Record a request captured as slow."""
+        self.slow_requests_total.labels(endpoint=endpoint).inc()
     
-    def get_metrics(self) -> str:
-        """Get all metrics in Prometheus format."""
+    def record_event_loop_lag(self, lag: float) -> None:
+        """Record the last event loop lag measured."""
+        self.event_loop_lag_seconds.set(lag)
+    
+    def record_warmup(self, duration: float) -> None:
+        """Record the duration of the startup warm-up."""
+        self.warmup_seconds.set(duration)
+    
+    def record_rate_limited(self, endpoint: str) -> None:
+        """Record a request rejected by the rate limiter."""
+        self.rate_limited_total.labels(endpoint=endpoint).inc()
+    
+    def record_cache_hit(self, endpoint: str) -> None:
+        """Record a response cache hit."""
+        self.response_cache_hits_total.labels(endpoint=endpoint).inc()
+    
+    def record_cache_miss(self, endpoint: str) -> None:
+        """Record a response cache miss."""
+        self.response_cache_misses_total.labels(endpoint=endpoint).inc()
+    
+    def record_cache_eviction(self, reason: str, count: int = 1) -> None:
+        """Record response cache evictions."""
+        self.response_cache_evictions_total.labels(reason=reason).inc(count)
+    
+    def record_cache_size(self, size: int) -> None:
+        """Record the memory held by the response cache."""
+        self.response_cache_size.set(size)
+    
+    def label_children(self) -> Dict[str, int]:
+        """Number of label children each labelled metric keeps in memory."""
+        counts = {}
+        for collector in list(self.registry._collector_to_names):
+            if getattr(collector, '_labelnames', None):
+                counts[collector._name] = len(collector._metrics)
+        return counts
+    
+    def get_metrics(self, openmetrics_format: bool = False) -> str:
+        """
+        Get all metrics in Prometheus format.
+        
+        Args:
+            openmetrics_format: Use the OpenMetrics format, which carries the exemplars
+        """
+        if self._app_info is not None and 'platform' not in self._app_info:
+            self._add_platform_info()
+        
         # Update system and process metrics before generating output
         self.update_system_metrics()
         self.update_process_metrics()
+        self.http_requests_in_flight.set(lifecycle.in_flight)
         
+        if openmetrics_format:
+            return openmetrics.generate_latest(self.registry).decode('utf-8')
         return generate_latest(self.registry).decode('utf-8')
     
-    def get_content_type(self) -> str:
+    def get_content_type(self, openmetrics_format: bool = False) -> str:
         """Get the content type of the metrics in Prometheus format."""
+        if openmetrics_format:
+            return openmetrics.CONTENT_TYPE_LATEST
         return CONTENT_TYPE_LATEST
 
 
-metrics = PrometheusMetrics()
+metrics = PrometheusMetrics(
+    duration_buckets=settings.http_duration_buckets,
+    route_duration_buckets=settings.http_duration_route_buckets
+)
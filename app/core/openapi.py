@@ -0,0 +1,151 @@
+"""Pre-encoded OpenAPI schema served with gzip and conditional requests."""
+
+import gzip
+import sys
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, Response
+
+from app.core.cache import etag_matches, make_etag
+from app.core.serialization import dumps
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class OpenAPIDocument:
+    """
+    OpenAPI schema of the app encoded once.
+
+    The schema is generated on startup (or on the first request when the
+    lifespan didn't run), or loaded from a file built with
+    `python -m app.core.openapi PATH` at image build time. It is kept as
+    plain and gzip bytes, each with its own strong ETag, so workers don't
+    keep the schema dict around nor encode it for every request.
+    """
+
+    def __init__(self, prebuilt_path: Optional[str] = None):
+        """
+        Constructor.
+
+        Args:
+            prebuilt_path: File with the encoded schema, generated from the app when missing
+        """
+        self.prebuilt_path = prebuilt_path
+        self.body: Optional[bytes] = None
+        self.gzip_body: Optional[bytes] = None
+        self.etag: Optional[bytes] = None
+        self.gzip_etag: Optional[bytes] = None
+
+    def build(self, app: FastAPI) -> None:
+        """Encode the schema of the app, unless it is already loaded."""
+        if self.body is not None:
+            return
+
+        body = None
+        if self.prebuilt_path:
+            try:
+                body = Path(self.prebuilt_path).read_bytes()
+            except OSError:
+                body = None
+        if body is None:
+            body = dumps(app.openapi())
+            # Only the encoded bytes are kept
+            app.openapi_schema = None
+
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        self.etag = make_etag(body)
+        # A strong ETag identifies the representation, so the gzip body gets its own
+        self.gzip_etag = self.etag[:-1] + b'-gzip"'
+        self.body = body
+
+    async def endpoint(self, request: Request) -> Response:
+        """Serve the schema, honouring `If-None-Match` and `Accept-Encoding`."""
+        self.build(request.app)
+        body, etag = self.body, self.etag
+        headers = {"Vary": "Accept-Encoding"}
+        if _accepts_gzip(request.headers.get("accept-encoding", "")):
+            body, etag = self.gzip_body, self.gzip_etag
+            headers["Content-Encoding"] = "gzip"
+        headers["ETag"] = etag.decode()
+
+        # Conditional requests are matched against the variant selected
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match.encode("latin-1"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+
+def setup_openapi(
+    app: FastAPI,
+    document: OpenAPIDocument,
+    openapi_url: str = "/openapi.json",
+    docs_enabled: bool = True,
+) -> None:
+    """
+    Serve the pre-encoded schema and, when enabled, the docs pages.
+
+    Replaces the routes FastAPI adds itself, so the app must be created
+    with `openapi_url=None`.
+
+    Args:
+        app: Application
+        document: Pre-encoded schema
+        openapi_url: Path of the schema
+        docs_enabled: Serve `/docs` and `/redoc`
+    """
+    app.state.openapi_document = document
+    app.openapi_url = openapi_url
+    app.add_route(openapi_url, document.endpoint, include_in_schema=False)
+
+    if not docs_enabled:
+        app.docs_url = None
+        app.redoc_url = None
+        return
+
+    app.docs_url = "/docs"
+    app.redoc_url = "/redoc"
+
+    async def swagger_ui_html(request: Request) -> HTMLResponse:
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return get_swagger_ui_html(
+            openapi_url=root_path + openapi_url,
+            title=f"{app.title} - Swagger UI",
+            oauth2_redirect_url=root_path + app.swagger_ui_oauth2_redirect_url,
+            init_oauth=app.swagger_ui_init_oauth,
+            swagger_ui_parameters=app.swagger_ui_parameters,
+        )
+
+    async def swagger_ui_redirect(request: Request) -> HTMLResponse:
+        return get_swagger_ui_oauth2_redirect_html()
+
+    async def redoc_html(request: Request) -> HTMLResponse:
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return get_redoc_html(openapi_url=root_path + openapi_url, title=f"{app.title} - ReDoc")
+
+    app.add_route(app.docs_url, swagger_ui_html, include_in_schema=False)
+    app.add_route(app.swagger_ui_oauth2_redirect_url, swagger_ui_redirect, include_in_schema=False)
+    app.add_route(app.redoc_url, redoc_html, include_in_schema=False)
+
+
+def write_openapi(path: str) -> None:
+    """Write the encoded schema of the app to a file."""
+    from app.main import app
+
+    Path(path).write_bytes(dumps(app.openapi()))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m app.core.openapi PATH")
+        sys.exit(1)
+    write_openapi(sys.argv[1])
@@ -0,0 +1,189 @@
+"""On-demand sampling CPU profiler of the worker threads."""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+
+# (function, file, first line)
+FrameKey = Tuple[str, str, int]
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _short_path(filename: str, prefixes: List[str]) -> str:
+    for prefix in prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+class Profile:
+    """Stacks sampled from every thread but the profiler's own."""
+
+    def __init__(self, interval: float):
+        """
+        Constructor.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def add(self, thread_name: str, stack: Tuple[FrameKey, ...]) -> None:
+        self.stacks[(thread_name, stack)] += 1
+
+    def collapsed(self) -> str:
+        """
+        Stacks in the collapsed format of flamegraph.pl and speedscope.
+
+        One line per distinct stack, root first, prefixed with the thread
+        name and followed by the number of samples.
+        """
+        # Longest prefixes first so site-packages wins over the stdlib directory
+        prefixes = sorted({path for path in sys.path if path}, key=len, reverse=True)
+        lines = []
+        for (thread_name, stack), count in self.stacks.most_common():
+            frames = [thread_name.replace(";", ":")]
+            frames.extend(f"{name} ({_short_path(file, prefixes)}:{line})" for name, file, line in stack)
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self, name: str) -> dict:
+        """Stacks in the speedscope file format, one sampled profile per thread."""
+        frames: List[dict] = []
+        frame_index: Dict[FrameKey, int] = {}
+        profiles: Dict[str, dict] = {}
+
+        for (thread_name, stack), count in self.stacks.most_common():
+            indexes = []
+            for key in stack:
+                index = frame_index.get(key)
+                if index is None:
+                    index = frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                indexes.append(index)
+
+            profile = profiles.get(thread_name)
+            if profile is None:
+                profile = profiles[thread_name] = {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(self.duration, 6),
+                    "samples": [],
+                    "weights": [],
+                }
+            profile["samples"].append(indexes)
+            profile["weights"].append(round(count * self.interval, 6))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "fastapi-healthy",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+
+class SamplingProfiler:
+    """
+    Profiler sampling `sys._current_frames()` from a background thread.
+
+    Nothing is installed while idle: the sampling thread only exists for
+    the duration of a profile, so requests pay nothing when no profile
+    runs. Only one profile runs at a time per process; with several
+    workers each one profiles itself.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def start(self, seconds: float, interval: float) -> "Future[Profile]":
+        """
+        Start sampling in a new thread.
+
+        Args:
+            seconds: Duration of the profile
+            interval: Seconds between samples
+
+        Returns:
+            Future[Profile]: Profile, resolved when the duration is over
+
+        Raises:
+            ProfilerBusyError: When a profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+
+        future: "Future[Profile]" = Future()
+
+        def run() -> None:
+            # The lock is released before resolving, so the next profile can
+            # start as soon as the caller gets this one
+            try:
+                profile = self._sample(seconds, interval)
+            except BaseException as exc:
+                self._lock.release()
+                future.set_exception(exc)
+            else:
+                self._lock.release()
+                future.set_result(profile)
+
+        try:
+            threading.Thread(target=run, name="profiler", daemon=True).start()
+        except BaseException:
+            self._lock.release()
+            raise
+        return future
+
+    @staticmethod
+    def _sample(seconds: float, interval: float) -> Profile:
+        profile = Profile(interval)
+        own = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_sample = started
+
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                profile.add(names.get(ident, str(ident)), tuple(stack))
+            profile.samples += 1
+
+            next_sample += interval
+            if next_sample >= deadline:
+                break
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        profile.duration = time.perf_counter() - started
+        return profile
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,100 @@
+"""Named uvicorn server profiles."""
+
+import importlib.util
+from typing import Dict
+
+
+class ServerProfile:
+    """uvicorn options tuned for one kind of workload."""
+
+    def __init__(
+        self,
+        name: str,
+        loop: str,
+        http: str,
+        backlog: int,
+        timeout_keep_alive: int,
+        concurrency_per_cpu: int,
+        access_log: bool,
+    ):
+        """Constructor."""
+        self.name = name
+        self.loop = loop
+        self.http = http
+        self.backlog = backlog
+        self.timeout_keep_alive = timeout_keep_alive
+        self.concurrency_per_cpu = concurrency_per_cpu
+        self.access_log = access_log
+
+    def uvicorn_options(self) -> dict:
+        """Keyword arguments of `uvicorn.run` / `uvicorn.Config`."""
+        return {
+            "loop": self.loop,
+            "http": self.http,
+            "backlog": self.backlog,
+            "timeout_keep_alive": self.timeout_keep_alive,
+            # Requests are logged by app.core.accesslog instead, see `access_log`
+            "access_log": False,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ServerProfile(name={self.name}, loop={self.loop}, http={self.http}, backlog={self.backlog}, "
+            f"timeout_keep_alive={self.timeout_keep_alive}, concurrency_per_cpu={self.concurrency_per_cpu}, "
+            f"access_log={self.access_log})"
+        )
+
+
+# "fast" picks uvloop and httptools when they are installed
+SERVER_PROFILES: Dict[str, dict] = {
+    # uvicorn defaults, the behaviour before profiles existed
+    "default": {
+        "loop": "auto", "http": "auto", "backlog": 2048, "timeout_keep_alive": 5,
+        "concurrency_per_cpu": 100, "access_log": True,
+    },
+    # Short queues so overload is answered with 503 instead of waiting in line
+    "latency": {
+        "loop": "fast", "http": "fast", "backlog": 128, "timeout_keep_alive": 5,
+        "concurrency_per_cpu": 50, "access_log": False,
+    },
+    # Deep queues and long keep-alive (over the 60s idle timeout of most
+    # load balancers) to avoid reconnects
+    "throughput": {
+        "loop": "fast", "http": "fast", "backlog": 4096, "timeout_keep_alive": 75,
+        "concurrency_per_cpu": 200, "access_log": False,
+    },
+    # Pure Python loop and parser for readable tracebacks, with access logs
+    "dev": {
+        "loop": "asyncio", "http": "h11", "backlog": 128, "timeout_keep_alive": 5,
+        "concurrency_per_cpu": 100, "access_log": True,
+    },
+}
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve_server_profile(name: str) -> ServerProfile:
+    """
+    Resolve a named profile to the options available in this environment.
+
+    Args:
+        name: Profile name, see `SERVER_PROFILES`
+
+    Returns:
+        ServerProfile: Resolved profile
+
+    Raises:
+        ValueError: When the profile is unknown
+    """
+    if name not in SERVER_PROFILES:
+        raise ValueError(f"Unknown server profile {name!r}, expected one of {', '.join(SERVER_PROFILES)}")
+
+    options = dict(SERVER_PROFILES[name])
+    if options["loop"] == "fast":
+        options["loop"] = "uvloop" if _available("uvloop") else "asyncio"
+    if options["http"] == "fast":
+        options["http"] = "httptools" if _available("httptools") else "h11"
+
+    return ServerProfile(name=name, **options)
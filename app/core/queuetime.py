@@ -0,0 +1,58 @@
+"""Time requests spent queued before reaching the app, from `X-Request-Start`."""
+
+from typing import Optional
+
+
+# Queue times above this are treated as a broken header or clock
+MAX_QUEUE_SECONDS = 3600.0
+
+
+def parse_request_start(value: str) -> Optional[float]:
+    """
+    Parse an `X-Request-Start` header into a Unix timestamp in seconds.
+
+    Proxies stamp it in different units: nginx `t=${msec}` in seconds
+    with a fractional part, HAProxy and Heroku in milliseconds, Apache
+    `t=%t` in microseconds. The unit is told by the magnitude of the value.
+
+    Returns:
+        Optional[float]: Timestamp in seconds, None when the header is invalid
+    """
+    value = value.strip()
+    if value.startswith("t="):
+        value = value[2:]
+    try:
+        timestamp = float(value)
+    except ValueError:
+        return None
+    if not timestamp > 0 or timestamp == float("inf"):
+        return None
+
+    if timestamp > 1e17:
+        return timestamp / 1e9
+    if timestamp > 1e14:
+        return timestamp / 1e6
+    if timestamp > 1e11:
+        return timestamp / 1e3
+    return timestamp
+
+
+def queue_time(value: str, now: float) -> Optional[float]:
+    """
+    Seconds between the proxy stamping the request and the app receiving it.
+
+    Args:
+        value: `X-Request-Start` header
+        now: Unix timestamp the app received the request at
+
+    Returns:
+        Optional[float]: Queue time, 0 when the proxy clock is slightly
+        ahead, None when the header is invalid or implausible
+    """
+    started = parse_request_start(value)
+    if started is None:
+        return None
+    elapsed = now - started
+    if elapsed > MAX_QUEUE_SECONDS or elapsed < -MAX_QUEUE_SECONDS:
+        return None
+    return max(elapsed, 0.0)
@@ -0,0 +1,170 @@
+"""Per-client token bucket rate limiting."""
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import metrics
+from app.core.serialization import dumps
+
+
+class TokenBucketStore:
+    """
+    Token buckets kept in a sharded dict.
+
+    Buckets are refilled lazily when checked, so there are no timers. A
+    bucket idle long enough to be full again is equivalent to a missing one,
+    so those are evicted a shard at a time while new buckets are created.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        shards: int = 16,
+        sweep_every: int = 256,
+        clock=time.monotonic,
+    ):
+        """
+        Constructor.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+            shards: Number of shards, rounded up to a power of two
+            sweep_every: New buckets created between shard sweeps
+        """
+        self.rate = rate
+        self.burst = burst
+        self.idle_seconds = burst / rate
+        size = 1 << max(shards - 1, 0).bit_length()
+        self._mask = size - 1
+        self._shards: List[Dict[str, List[float]]] = [{} for _ in range(size)]
+        self._sweep_every = sweep_every
+        self._created = 0
+        self._next_sweep = 0
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def acquire(self, key: str) -> float:
+        """
+        Take a token from the bucket of a client.
+
+        Args:
+            key: Client key
+
+        Returns:
+            float: 0.0 when allowed, otherwise seconds until a token is available
+        """
+        now = self._clock()
+        shard = self._shards[hash(key) & self._mask]
+        bucket = shard.get(key)
+
+        if bucket is None:
+            shard[key] = [self.burst - 1.0, now]
+            self._created += 1
+            if self._created >= self._sweep_every:
+                self._created = 0
+                self._sweep(now)
+            return 0.0
+
+        tokens = bucket[0] + (now - bucket[1]) * self.rate
+        bucket[1] = now
+        if tokens >= 1.0:
+            # Clamp to the capacity only on the allowed path
+            bucket[0] = (self.burst if tokens > self.burst else tokens) - 1.0
+            return 0.0
+
+        bucket[0] = tokens
+        return (1.0 - tokens) / self.rate
+
+    def _sweep(self, now: float) -> None:
+        """Evict the buckets of one shard that are full again."""
+        shard = self._shards[self._next_sweep]
+        self._next_sweep = (self._next_sweep + 1) & self._mask
+        idle = [key for key, bucket in shard.items() if now - bucket[1] >= self.idle_seconds]
+        for key in idle:
+            del shard[key]
+
+
+class RateLimitMiddleware:
+    """
+    Limit requests per client on the configured routes.
+
+    Clients are identified by a header (e.g. `X-Forwarded-For` behind the
+    ingress) or by the peer address. Limited requests get a 429 with a
+    `Retry-After` header. Requests without a client key, e.g. over a Unix
+    socket without the header, are not limited rather than all sharing
+    one bucket.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Dict[str, Tuple[float, float]],
+        key_header: Optional[str] = None,
+        trusted_hops: int = 1,
+    ):
+        """
+        Constructor.
+
+        Args:
+            app: Wrapped ASGI application
+            routes: Rate (tokens per second) and burst of each limited path
+            key_header: Header identifying the client, peer address when None
+            trusted_hops: Proxies in front of the app appending to the key header
+        """
+        self.app = app
+        self.stores = {path: TokenBucketStore(rate, burst) for path, (rate, burst) in routes.items()}
+        self.key_header = key_header.lower().encode() if key_header else None
+        self.trusted_hops = trusted_hops
+        self._body = dumps({"error": "HTTP Exception", "detail": "Too Many Requests", "status_code": 429})
+
+    def _client_key(self, scope: Scope) -> str:
+        if self.key_header is not None:
+            entries: List[bytes] = []
+            for name, value in scope["headers"]:
+                if name == self.key_header:
+                    entries.extend(value.split(b","))
+            # Each proxy appends the address it got the request from, so only
+            # the entries on the right are trusted: the ones on the left are
+            # whatever the client sent
+            if len(entries) >= self.trusted_hops:
+                key = entries[-self.trusted_hops].strip().decode("latin-1")
+                if key:
+                    return key
+        client = scope.get("client")
+        return client[0] if client else ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        store = self.stores.get(scope["path"])
+        if store is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self._client_key(scope)
+        if not key:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = store.acquire(key)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        metrics.record_rate_limited(scope["path"])
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._body)).encode()),
+            (b"retry-after", str(math.ceil(retry_after)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": self._body})
@@ -0,0 +1,114 @@
+"""JSON response encoding engine."""
+
+import json
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, Response
+
+from app.config.settings import settings
+from app.core.tracing import phase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+JSON_ENGINES = ("auto", "orjson", "stdlib")
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=str,
+    ).encode("utf-8")
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def resolve_json_engine(engine: str) -> str:
+    """
+    Resolve the configured engine to the one that will be used.
+
+    Args:
+        engine: One of "auto", "orjson" or "stdlib"
+
+    Returns:
+        str: "orjson" or "stdlib"
+    """
+    if engine not in JSON_ENGINES:
+        raise ValueError(f"Unknown JSON engine: {engine}")
+    if engine == "auto":
+        return "orjson" if orjson is not None else "stdlib"
+    if engine == "orjson" and orjson is None:
+        raise ValueError("JSON engine 'orjson' selected but orjson is not installed")
+    return engine
+
+
+_dumps: Callable[[Any], bytes] = _stdlib_dumps
+json_engine = "stdlib"
+
+
+def set_json_engine(engine: str) -> str:
+    """
+    Select the engine used by `dumps` and the JSON responses.
+
+    Args:
+        engine: One of "auto", "orjson" or "stdlib"
+
+    Returns:
+        str: Engine actually in use
+    """
+    global _dumps, json_engine
+    json_engine = resolve_json_engine(engine)
+    _dumps = _orjson_dumps if json_engine == "orjson" else _stdlib_dumps
+    return json_engine
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain Python content (dicts, lists, ...) to JSON bytes."""
+    return _dumps(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the configured engine, used as the app default."""
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialization"):
+            return _dumps(content)
+
+
+class ModelResponse(Response):
+    """
+    JSON response for an already built pydantic model.
+
+    Endpoints that build their response model return it wrapped in this
+    class, so FastAPI skips the `response_model` re-validation and the
+    `jsonable_encoder` pass, and pydantic serializes it straight to bytes.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: BaseModel,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        super().__init__(content, status_code, headers, self.media_type, background)
+
+    def render(self, content: BaseModel) -> bytes:
+        with phase("serialization"):
+            return content.model_dump_json().encode("utf-8")
+
+
+set_json_engine(settings.json_engine)
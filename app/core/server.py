@@ -0,0 +1,98 @@
+"""uvicorn server that reports not ready before it stops accepting connections."""
+
+import asyncio
+import os
+import sys
+import time
+from types import FrameType
+from typing import List, Optional
+
+import uvicorn
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.supervisors import ChangeReload, Multiprocess
+
+from app.core.lifecycle import DrainResult, lifecycle
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    uvicorn server that drains on SIGTERM before closing its listeners.
+
+    On SIGTERM uvicorn closes the listeners at once, waits for the running
+    requests until `timeout_graceful_shutdown`, cancels the rest and only
+    then runs the lifespan shutdown, when no readiness probe can reach the
+    app anymore. Here the first SIGINT or SIGTERM reports the app as not
+    ready and keeps serving for `pre_stop_delay` seconds, so the endpoint
+    is removed upstream while the listeners are still open. The requests
+    uvicorn cancels at the deadline are counted as dropped.
+    """
+
+    def __init__(self, config: uvicorn.Config, pre_stop_delay: float = 0.0, clock=time.monotonic):
+        """
+        Constructor.
+
+        Args:
+            config: uvicorn configuration
+            pre_stop_delay: Seconds to keep serving after readiness is flipped
+        """
+        super().__init__(config)
+        self.pre_stop_delay = pre_stop_delay
+        self.drain_started: Optional[float] = None
+        self.exit_at: Optional[float] = None
+        self.dropped = 0
+        self.drain_result: Optional[DrainResult] = None
+        self._clock = clock
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if self.drain_started is not None or not self.started:
+            # A second signal skips the rest of the delay, or forces the exit on SIGINT
+            super().handle_exit(sig, frame)
+            return
+        self.drain_started = self._clock()
+        self.exit_at = self.drain_started + self.pre_stop_delay
+        lifecycle.begin_drain()
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.exit_at is not None and self._clock() >= self.exit_at:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+    async def _wait_tasks_to_complete(self) -> None:
+        try:
+            await super()._wait_tasks_to_complete()
+        except asyncio.CancelledError:
+            # timeout_graceful_shutdown passed, uvicorn cancels the tasks still running next
+            self.dropped = len(self.server_state.tasks)
+            raise
+
+    async def shutdown(self, sockets: Optional[List] = None) -> None:
+        if self.drain_started is None:
+            self.drain_started = self._clock()
+        await super().shutdown(sockets=sockets)
+        self.drain_result = DrainResult(duration=self._clock() - self.drain_started, dropped=self.dropped)
+        print(f"Drained in {self.drain_result.duration:.3f}s ({self.drain_result.dropped} requests dropped)")
+
+
+def run_server(config: uvicorn.Config, pre_stop_delay: float = 0.0) -> None:
+    """
+    Run the app like `uvicorn.run`, with a `DrainingServer` in each worker.
+
+    Args:
+        config: uvicorn configuration, with the app as an import string for reload or workers
+        pre_stop_delay: Seconds to keep serving after readiness is flipped on shutdown
+    """
+    server = DrainingServer(config, pre_stop_delay=pre_stop_delay)
+
+    if config.should_reload:
+        sock = config.bind_socket()
+        ChangeReload(config, target=server.run, sockets=[sock]).run()
+    elif config.workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+    if config.uds and os.path.exists(config.uds):
+        os.remove(config.uds)
+
+    if not server.started and not config.should_reload and config.workers == 1:
+        sys.exit(STARTUP_FAILURE)
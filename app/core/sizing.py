@@ -0,0 +1,151 @@
+"""Worker, thread pool and concurrency sizing from the container CPU quota."""
+
+import math
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# anyio's default thread limiter size, kept as the upper bound
+MAX_THREAD_POOL_SIZE = 40
+
+# Connections accepted per CPU before uvicorn answers 503, with --workers auto
+CONCURRENCY_PER_CPU = 100
+
+
+class WorkerSizing:
+    """Resolved worker count and per-worker limits."""
+
+    def __init__(
+        self,
+        workers: int,
+        cpu_limit: float,
+        source: str,
+        thread_pool_size: Optional[int],
+        limit_concurrency: Optional[int],
+    ):
+        """Constructor."""
+        self.workers = workers
+        self.cpu_limit = cpu_limit
+        self.source = source
+        self.thread_pool_size = thread_pool_size
+        self.limit_concurrency = limit_concurrency
+
+    def as_dict(self) -> dict:
+        """Sizing as a dict of strings, e.g. for an Info metric."""
+        return {
+            "workers": str(self.workers),
+            "cpu_limit": f"{self.cpu_limit:g}",
+            "source": self.source,
+            "thread_pool_size": str(self.thread_pool_size) if self.thread_pool_size else "default",
+            "limit_concurrency": str(self.limit_concurrency) if self.limit_concurrency else "unlimited",
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"WorkerSizing(workers={self.workers}, cpu_limit={self.cpu_limit:g}, source={self.source}, "
+            f"thread_pool_size={self.thread_pool_size}, limit_concurrency={self.limit_concurrency})"
+        )
+
+
+def read_cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    Read the CPU quota of the container.
+
+    Supports cgroup v2 (`cpu.max`) and v1 (`cpu.cfs_quota_us` and
+    `cpu.cfs_period_us`).
+
+    Returns:
+        Optional[float]: CPUs allowed by the quota, None when unlimited or unknown
+    """
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota_us = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period_us = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        if quota_us <= 0 or period_us <= 0:
+            return None
+        return quota_us / period_us
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> Tuple[float, str]:
+    """
+    CPUs the process can use.
+
+    Returns:
+        Tuple[float, str]: CPU count and where it came from ("cgroup" or "cpu_count")
+    """
+    try:
+        host_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS/Windows
+        host_cpus = os.cpu_count() or 1
+
+    quota = read_cgroup_cpu_limit(root)
+    if quota is not None and quota < host_cpus:
+        return quota, "cgroup"
+    return float(host_cpus), "cpu_count"
+
+
+def resolve_worker_sizing(
+    workers: Union[int, str],
+    thread_pool_size: Optional[int] = None,
+    limit_concurrency: Optional[int] = None,
+    root: Path = CGROUP_ROOT,
+    concurrency_per_cpu: int = CONCURRENCY_PER_CPU,
+) -> WorkerSizing:
+    """
+    Resolve the worker count and the per-worker defaults.
+
+    With `workers="auto"` there is one worker per whole CPU of the quota
+    (at least one), so workers are not throttled by the CFS quota, and
+    the thread pool and the concurrency limit scale with the CPU share of
+    each worker unless set explicitly. Explicit worker counts keep
+    anyio's thread pool and uvicorn's unlimited concurrency by default:
+    sync endpoints would lose threads, and uvicorn counts idle keep-alive
+    connections against the limit, so a pool of upstream connections
+    from a proxy could get 503s.
+
+    Args:
+        workers: Worker count or "auto"
+        thread_pool_size: Explicit anyio thread pool size per worker, None for the default
+        limit_concurrency: Explicit uvicorn concurrency limit per worker, None for the default
+        root: cgroup filesystem root
+        concurrency_per_cpu: In-flight requests per CPU of the default concurrency limit
+
+    Returns:
+        WorkerSizing: Resolved sizing
+    """
+    cpus, source = available_cpus(root)
+
+    if workers == "auto":
+        count = max(1, math.floor(cpus))
+    else:
+        count = int(workers)
+        source = "explicit"
+    if count < 1:
+        raise ValueError("workers must be at least 1")
+
+    cpus_per_worker = max(math.ceil(cpus / count), 1)
+    if workers == "auto":
+        if thread_pool_size is None:
+            thread_pool_size = min(MAX_THREAD_POOL_SIZE, max(4, 5 * cpus_per_worker))
+        if limit_concurrency is None:
+            limit_concurrency = concurrency_per_cpu * cpus_per_worker
+
+    return WorkerSizing(
+        workers=count,
+        cpu_limit=cpus,
+        source=source,
+        thread_pool_size=thread_pool_size,
+        limit_concurrency=limit_concurrency,
+    )
@@ -0,0 +1,152 @@
+"""Capture of slow requests and event loop lag monitoring."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.core.tracing import Phases, Trace, timing_breakdown
+
+
+class EventLoopLagMonitor:
+    """
+    Measure how late the event loop wakes up a sleeping task.
+
+    A task sleeps for `interval` seconds in a loop; the time it wakes up
+    past its deadline is how long callbacks waited for the loop, e.g.
+    behind blocking code in an async handler.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        """
+        Constructor.
+
+        Args:
+            interval: Seconds between measurements
+        """
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start measuring on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(loop.time() - deadline, 0.0)
+            metrics.record_event_loop_lag(self.lag)
+
+
+class SlowRequestLog:
+    """
+    Ring buffer with the requests slower than their route threshold.
+
+    Phase timings are recorded for every request, so each capture has its
+    breakdown; the trace id is only kept for sampled requests.
+    """
+
+    def __init__(self, threshold: Optional[float], route_thresholds: Optional[Dict[str, float]] = None,
+                 capacity: int = 200):
+        """
+        Constructor.
+
+        Args:
+            threshold: Seconds above which a request is captured, None to capture only the routes listed
+            route_thresholds: Thresholds of specific route paths, e.g. /api/v1/metrics
+            capacity: Requests kept, the oldest dropped first
+        """
+        self.threshold = threshold
+        self.route_thresholds = route_thresholds or {}
+        self._requests: deque = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def threshold_for(self, route: str) -> Optional[float]:
+        return self.route_thresholds.get(route, self.threshold)
+
+    def record(
+        self,
+        method: str,
+        route: str,
+        path: str,
+        query: str,
+        status: int,
+        duration: float,
+        in_flight: int,
+        loop_lag: float,
+        phases: Optional[Phases] = None,
+        trace: Optional[Trace] = None,
+    ) -> bool:
+        """
+        Capture a request when it is slower than the threshold of its route.
+
+        Args:
+            method: HTTP method
+            route: Route path template, or the path when no route matched
+            path: Request path
+            query: Query string
+            status: Response status code
+            duration: Seconds spent in the app
+            in_flight: Requests in flight when the request started
+            loop_lag: Last event loop lag measured, in seconds
+            phases: Phases recorded for the request
+            trace: Trace of the request
+
+        Returns:
+            bool: Whether the request was captured
+        """
+        threshold = self.threshold_for(route)
+        if threshold is None or duration < threshold:
+            return False
+
+        sampled = trace is not None and trace.sampled
+        self._requests.append({
+            "timestamp": time.time(),
+            "method": method,
+            "route": route,
+            "path": path,
+            "query": query,
+            "status": status,
+            "duration_ms": round(duration * 1000, 3),
+            "phases_ms": {name: round(value, 3) for name, value in timing_breakdown(phases, duration)}
+            if phases is not None else None,
+            "in_flight_at_start": in_flight,
+            "loop_lag_ms": round(loop_lag * 1000, 3),
+            "trace_id": trace.trace_id if sampled else None,
+        })
+        metrics.record_slow_request(route)
+        return True
+
+    def recent(self, limit: int) -> List[dict]:
+        """Most recent captures first."""
+        requests = list(self._requests)
+        requests.reverse()
+        return requests[:limit]
+
+
+loop_lag_monitor = EventLoopLagMonitor(interval=settings.event_loop_lag_interval)
+
+slow_requests = SlowRequestLog(
+    threshold=settings.slow_request_threshold,
+    route_thresholds=settings.slow_request_routes,
+    capacity=settings.slow_request_buffer_size,
+)
@@ -0,0 +1,183 @@
+"""In-process sliding-window RED stats with mergeable quantile sketches."""
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Window name and length in seconds
+WINDOWS: Tuple[Tuple[str, int], ...] = (("1m", 60), ("5m", 300), ("15m", 900))
+QUANTILES: Tuple[Tuple[str, float], ...] = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+# Durations below this are counted in the zero bin
+MIN_VALUE = 1e-6
+
+
+class DDSketch:
+    """
+    Quantile sketch with a relative accuracy guarantee (DDSketch).
+
+    Values are counted in logarithmic bins of ratio `gamma`, so any
+    quantile is returned within `relative_accuracy` of the exact value.
+    Sketches with the same accuracy are merged by adding their bins, and
+    their size only depends on the range of the values: at 1% accuracy,
+    1 µs to 1 hour fits in about 1100 bins.
+    """
+
+    __slots__ = ("_log_gamma", "_gamma", "bins", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Constructor.
+
+        Args:
+            relative_accuracy: Maximum relative error of the quantiles
+        """
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add the values of a sketch with the same accuracy."""
+        bins = self.bins
+        for index, count in other.bins.items():
+            bins[index] = bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Optional[float]: Estimated value, None when the sketch is empty
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Middle of the bin (gamma^(i-1), gamma^i], in relative terms
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+
+class _Second:
+    """Requests of a route in one second."""
+
+    __slots__ = ("second", "count", "errors", "sketch")
+
+    def __init__(self, second: int, relative_accuracy: float):
+        self.second = second
+        self.count = 0
+        self.errors = 0
+        self.sketch = DDSketch(relative_accuracy)
+
+
+class RequestStats:
+    """
+    Rate, error ratio and latency quantiles per route over sliding windows.
+
+    Each route keeps a ring of per-second buckets covering the longest
+    window, each with its own sketch. Recording a request touches a single
+    bucket; the windows are only merged when the stats are read, so memory
+    is bounded by routes x seconds x occupied bins.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Constructor.
+
+        Args:
+            relative_accuracy: Relative accuracy of the latency quantiles
+        """
+        self.relative_accuracy = relative_accuracy
+        self.horizon = max(seconds for _, seconds in WINDOWS)
+        self._routes: Dict[str, List[Optional[_Second]]] = {}
+
+    def record(self, route: str, status_code: int, duration: float, now: Optional[float] = None) -> None:
+        """
+        Count a request in the bucket of the current second.
+
+        Args:
+            route: Route path template
+            status_code: Response status code, 5xx counts as an error
+            duration: Seconds spent in the app
+            now: Unix timestamp, the current time when None
+        """
+        second = int(now if now is not None else time.time())
+        ring = self._routes.get(route)
+        if ring is None:
+            ring = self._routes[route] = [None] * self.horizon
+
+        slot = second % self.horizon
+        bucket = ring[slot]
+        if bucket is None or bucket.second != second:
+            bucket = ring[slot] = _Second(second, self.relative_accuracy)
+        bucket.count += 1
+        if status_code >= 500:
+            bucket.errors += 1
+        bucket.sketch.add(duration)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict[str, dict]]:
+        """
+        Stats of each route over each window.
+
+        Args:
+            now: Unix timestamp, the current time when None
+
+        Returns:
+            Dict[str, Dict[str, dict]]: For each route and window, the
+            requests, rate per second, error ratio and latency quantiles in
+            milliseconds; routes without requests in the longest window are
+            left out
+        """
+        current = int(now if now is not None else time.time())
+        result = {}
+        for route, ring in self._routes.items():
+            buckets = sorted(
+                (bucket for bucket in ring if bucket is not None and 0 <= current - bucket.second < self.horizon),
+                key=lambda bucket: current - bucket.second,
+            )
+            if not buckets:
+                continue
+
+            merged = DDSketch(self.relative_accuracy)
+            requests = errors = 0
+            position = 0
+            windows = {}
+            for name, seconds in WINDOWS:
+                while position < len(buckets) and current - buckets[position].second < seconds:
+                    bucket = buckets[position]
+                    merged.merge(bucket.sketch)
+                    requests += bucket.count
+                    errors += bucket.errors
+                    position += 1
+                window = {
+                    "requests": requests,
+                    "rate": round(requests / seconds, 3),
+                    "error_ratio": round(errors / requests, 4) if requests else 0.0,
+                }
+                for label, q in QUANTILES:
+                    value = merged.quantile(q)
+                    window[f"{label}_ms"] = round(value * 1000, 3) if value is not None else None
+                windows[name] = window
+            result[route] = windows
+        return result
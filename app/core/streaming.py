@@ -0,0 +1,268 @@
+"""Incremental decoders for streamed JSON request bodies and spooled responses."""
+
+import codecs
+import json
+import tempfile
+from typing import Any, AsyncIterator, List
+
+import anyio
+
+
+# Largest single item kept in memory while waiting for the rest of it
+MAX_ITEM_SIZE = 64 * 1024
+
+# Response bytes kept in memory before spilling to a temporary file
+SPOOL_MAX_MEMORY = 1024 * 1024
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class StreamDecodeError(ValueError):
+    """Raised when a streamed body is not valid JSON or NDJSON."""
+
+
+class JSONArrayDecoder:
+    """Decode the items of a top level JSON array fed in chunks."""
+
+    def __init__(self, max_item_size: int = MAX_ITEM_SIZE):
+        """Constructor."""
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._max_item_size = max_item_size
+        self._started = False
+        self._finished = False
+        self._expect_value = True
+        self._empty = True
+        # Set by a syntax error, the rest of the body is ignored
+        self.failed = False
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        """
+        Feed a piece of the body and return the items completed by it.
+
+        Args:
+            text: Next piece of the body
+            final: Whether this is the last piece
+
+        Returns:
+            List[Any]: Items decoded so far; a syntax error ends the list
+            with a `StreamDecodeError` and sets `failed`
+        """
+        if self.failed:
+            return []
+
+        items: List[Any] = []
+        try:
+            self._decode(text, final, items)
+        except StreamDecodeError as exc:
+            self.failed = True
+            self._buffer = ""
+            items.append(exc)
+        return items
+
+    def _decode(self, text: str, final: bool, items: List[Any]) -> None:
+        buffer = self._buffer + text
+        pos = 0
+        size = len(buffer)
+
+        while True:
+            while pos < size and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == size:
+                break
+
+            char = buffer[pos]
+            if self._finished:
+                raise StreamDecodeError("Unexpected data after the end of the array")
+            if not self._started:
+                if char != "[":
+                    raise StreamDecodeError("Expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+            if char == "]" and (not self._expect_value or self._empty):
+                self._finished = True
+                pos += 1
+                continue
+            if not self._expect_value:
+                if char != ",":
+                    raise StreamDecodeError("Expected ',' or ']' between array items")
+                self._expect_value = True
+                pos += 1
+                continue
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                if final:
+                    raise StreamDecodeError(f"Invalid JSON item: {exc.msg}") from None
+                break
+            # A value touching the end of the buffer may be a truncated number
+            if end == size and not final:
+                break
+
+            items.append(item)
+            self._expect_value = False
+            self._empty = False
+            pos = end
+
+        self._buffer = buffer[pos:]
+        if len(self._buffer) > self._max_item_size:
+            raise StreamDecodeError(f"Array item larger than {self._max_item_size} bytes")
+        if final and not self._finished:
+            raise StreamDecodeError("Unterminated JSON array" if self._started else "Expected a JSON array")
+
+
+class NDJSONDecoder:
+    """Decode newline delimited JSON fed in chunks."""
+
+    def __init__(self, max_item_size: int = MAX_ITEM_SIZE):
+        """Constructor."""
+        self._buffer = ""
+        self._max_item_size = max_item_size
+        # Set by a line over the size limit, the rest of the body is ignored
+        self.failed = False
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        """
+        Feed a piece of the body and return the lines completed by it.
+
+        Args:
+            text: Next piece of the body
+            final: Whether this is the last piece
+
+        Returns:
+            List[Any]: Items decoded so far, with a `StreamDecodeError` in
+            place of each invalid line; a line over the size limit ends the
+            list with a `StreamDecodeError` and sets `failed`
+        """
+        if self.failed:
+            return []
+
+        lines = (self._buffer + text).split("\n")
+        self._buffer = "" if final else lines.pop()
+
+        items: List[Any] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                items.append(StreamDecodeError(f"Invalid JSON line: {exc.msg}"))
+
+        if len(self._buffer) > self._max_item_size:
+            self.failed = True
+            self._buffer = ""
+            items.append(StreamDecodeError(f"Line larger than {self._max_item_size} bytes"))
+        return items
+
+
+async def iter_json_items(chunks: AsyncIterator[bytes], ndjson: bool) -> AsyncIterator[Any]:
+    """
+    Yield the items of a streamed JSON array or NDJSON body.
+
+    Only the item being decoded is kept in memory, so the body size does
+    not change memory usage. Invalid NDJSON lines are yielded as
+    `StreamDecodeError` at their position.
+
+    Args:
+        chunks: Body chunks, as produced by `Request.stream()`
+        ndjson: Whether the body is NDJSON instead of a JSON array
+
+    Raises:
+        StreamDecodeError: When the body as a whole is malformed (not an
+            array, an array syntax error, an oversized item, invalid UTF-8
+            or an empty NDJSON body), after the items before the error
+    """
+    decoder = NDJSONDecoder() if ndjson else JSONArrayDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    async def feed_chunks() -> AsyncIterator[List[Any]]:
+        try:
+            async for chunk in chunks:
+                yield decoder.feed(text_decoder.decode(chunk))
+            yield decoder.feed(text_decoder.decode(b"", final=True), final=True)
+        except UnicodeDecodeError:
+            raise StreamDecodeError("Body is not valid UTF-8") from None
+
+    empty = True
+    async for items in feed_chunks():
+        # The error that failed the decoder is the last item
+        error = items.pop() if decoder.failed else None
+        for item in items:
+            empty = False
+            yield item
+        if error is not None:
+            raise error
+    if ndjson and empty:
+        raise StreamDecodeError("Empty NDJSON body")
+
+
+class SpooledBody:
+    """
+    Response body produced while the request body is read, sent after it.
+
+    Writing the response while the client is still sending the request
+    deadlocks with clients that send the whole body before reading, which
+    is most HTTP/1.1 clients, once the socket buffers fill up. The body is
+    kept in memory up to `max_memory` bytes and spilled to a temporary file
+    past it, so memory usage doesn't depend on its size.
+    """
+
+    def __init__(self, max_memory: int = SPOOL_MAX_MEMORY, chunk_size: int = SPOOL_CHUNK_SIZE):
+        """
+        Constructor.
+
+        Args:
+            max_memory: Bytes kept in memory before spilling to disk
+            chunk_size: Bytes per file write and per response chunk
+        """
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._max_memory = max_memory
+        self._chunk_size = chunk_size
+        self._pending = bytearray()
+        self.size = 0
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the body was moved to a temporary file."""
+        return self.size > self._max_memory
+
+    async def _call(self, func, *args):
+        # Disk I/O goes to the thread pool, in-memory writes stay on the loop
+        if self.spilled:
+            return await anyio.to_thread.run_sync(func, *args)
+        return func(*args)
+
+    async def write(self, data: bytes) -> None:
+        """Append data to the body."""
+        self._pending += data
+        if len(self._pending) >= self._chunk_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        chunk = bytes(self._pending)
+        self._pending.clear()
+        self.size += len(chunk)
+        await self._call(self._file.write, chunk)
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Yield the body in chunks and close it."""
+        try:
+            if self._pending:
+                await self._flush()
+            await self._call(self._file.seek, 0)
+            while True:
+                chunk = await self._call(self._file.read, self._chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Drop the body and its temporary file."""
+        self._file.close()
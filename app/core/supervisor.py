@@ -0,0 +1,287 @@
+"""Worker supervisor that recycles workers past RSS or request-count limits."""
+
+import gc
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import psutil
+import uvicorn
+
+from app.core.lifecycle import RECYCLE_REASONS, lifecycle
+from app.core.server import DrainingServer
+
+
+multiprocessing.allow_connection_pickling()
+
+
+def bind_reuse_port_socket(host: str, port: int) -> socket.socket:
+    """
+    Bind a TCP socket with SO_REUSEPORT.
+
+    Every worker binds its own socket on the same address and the kernel
+    balances the new connections across the listening sockets.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _worker_main(
+    config: uvicorn.Config,
+    sockets: List[socket.socket],
+    worker_stats,
+    worker_recycles,
+    stdin_fileno: Optional[int],
+    reuse_port: bool = False,
+    pre_stop_delay: float = 0.0,
+) -> None:
+    """Entry point of a worker process."""
+    if stdin_fileno is not None:
+        sys.stdin = os.fdopen(stdin_fileno)
+
+    config.configure_logging()
+    lifecycle.attach_supervisor(worker_stats, worker_recycles)
+    if reuse_port:
+        sockets = [bind_reuse_port_socket(config.host, config.port)]
+    DrainingServer(config, pre_stop_delay=pre_stop_delay).run(sockets=sockets)
+
+
+class Worker:
+    """A worker process and the state shared with it."""
+
+    def __init__(self, process: multiprocessing.process.BaseProcess, stats, max_requests: Optional[int]):
+        """Constructor."""
+        self.process = process
+        self.stats = stats
+        self.max_requests = max_requests
+        self.retiring_since: Optional[float] = None
+
+    @property
+    def requests(self) -> int:
+        return self.stats[0]
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.stats[1])
+
+    def rss(self) -> int:
+        """Resident set size of the worker in bytes, 0 when it is gone."""
+        try:
+            return psutil.Process(self.process.pid).memory_info().rss
+        except (psutil.Error, TypeError):
+            return 0
+
+
+class Supervisor:
+    """
+    Run uvicorn workers and replace the ones that grow too much.
+
+    With `preload` the app is imported in the supervisor, the objects are
+    moved to the permanent GC generation with `gc.freeze()` and the workers
+    are forked, so modules and route tables stay copy-on-write pages shared
+    by all workers instead of being built again in each one.
+
+    With `reuse_port` each worker binds its own SO_REUSEPORT socket instead
+    of all workers accepting on the socket bound by the supervisor, so the
+    kernel spreads the connections evenly instead of waking every worker
+    on each one. Connections still queued on a worker socket when it
+    closes are reset, so recycles should be rare in this mode.
+
+    A worker is recycled when its RSS goes over `max_rss` bytes or it has
+    served `max_requests` requests (with up to 10% jitter so workers don't
+    recycle together). A replacement is started first and, once it reports
+    ready (or `ready_timeout` passes), the old worker gets SIGTERM and drains,
+    see `app.core.server.DrainingServer`. Recycles are counted in shared memory and
+    exported by every worker as `app_worker_recycles_total`.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        max_rss: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        check_interval: float = 1.0,
+        ready_timeout: float = 30.0,
+        retire_timeout: float = 30.0,
+        preload: bool = False,
+        reuse_port: bool = False,
+        pre_stop_delay: float = 0.0,
+    ):
+        """
+        Constructor.
+
+        Args:
+            config: uvicorn configuration of the workers
+            workers: Number of workers to keep running
+            max_rss: RSS in bytes that triggers a recycle, None to disable
+            max_requests: Requests served that trigger a recycle, None to disable
+            check_interval: Seconds between checks
+            ready_timeout: Seconds to wait for a replacement to become ready
+            retire_timeout: Seconds to wait for a retired worker to exit before killing it
+            preload: Load the app before forking the workers
+            reuse_port: Bind one SO_REUSEPORT socket per worker
+            pre_stop_delay: Seconds a worker keeps serving after SIGTERM flips its readiness
+        """
+        self.config = config
+        self.workers_count = workers
+        self.max_rss = max_rss
+        self.max_requests = max_requests
+        self.check_interval = check_interval
+        self.ready_timeout = ready_timeout
+        self.retire_timeout = retire_timeout
+        self.preload = preload
+        self.reuse_port = reuse_port
+        self.pre_stop_delay = pre_stop_delay
+        self.context = multiprocessing.get_context("fork" if preload else "spawn")
+        self.sockets: List[socket.socket] = []
+        self.workers: List[Worker] = []
+        self.recycles = self.context.RawArray("Q", len(RECYCLE_REASONS))
+        self.should_exit = False
+
+    def _stdin_fileno(self) -> Optional[int]:
+        if self.preload:
+            # Forked workers keep the stdin of the supervisor
+            return None
+        try:
+            return sys.stdin.fileno()
+        except (OSError, ValueError):
+            return None
+
+    def spawn(self) -> Worker:
+        """Start a new worker."""
+        stats = self.context.RawArray("Q", 2)
+        process = self.context.Process(
+            target=_worker_main,
+            kwargs={
+                "config": self.config,
+                "sockets": self.sockets,
+                "worker_stats": stats,
+                "worker_recycles": self.recycles,
+                "stdin_fileno": self._stdin_fileno(),
+                "reuse_port": self.reuse_port,
+                "pre_stop_delay": self.pre_stop_delay,
+            },
+        )
+        process.start()
+
+        max_requests = None
+        if self.max_requests:
+            max_requests = self.max_requests + random.randint(0, self.max_requests // 10)
+        worker = Worker(process, stats, max_requests)
+        self.workers.append(worker)
+        return worker
+
+    def recycle_reason(self, worker: Worker) -> Optional[str]:
+        """Reason to recycle a worker, None when it is within the limits."""
+        if worker.max_requests and worker.requests >= worker.max_requests:
+            return "requests"
+        if self.max_rss and worker.rss() >= self.max_rss:
+            return "rss"
+        return None
+
+    def recycle(self, worker: Worker, reason: str) -> None:
+        """Start a replacement and retire the worker once the replacement is ready."""
+        self.recycles[RECYCLE_REASONS.index(reason)] += 1
+        print(
+            f"Recycling worker {worker.process.pid} ({reason}: rss={worker.rss()} bytes, "
+            f"requests={worker.requests})"
+        )
+
+        replacement = self.spawn()
+        deadline = time.monotonic() + self.ready_timeout
+        while not replacement.ready and replacement.process.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self.retire(worker)
+
+    def retire(self, worker: Worker) -> None:
+        """Ask a worker to drain and exit."""
+        worker.retiring_since = time.monotonic()
+        if worker.process.is_alive():
+            os.kill(worker.process.pid, signal.SIGTERM)
+
+    def check(self) -> None:
+        """Replace dead workers, recycle the ones past the limits and reap retired ones."""
+        for worker in list(self.workers):
+            if worker.retiring_since is not None:
+                if not worker.process.is_alive():
+                    worker.process.join()
+                    self.workers.remove(worker)
+                elif time.monotonic() - worker.retiring_since > self.retire_timeout:
+                    worker.process.kill()
+                continue
+
+            if not worker.process.is_alive():
+                worker.process.join()
+                self.workers.remove(worker)
+                if not self.should_exit:
+                    self.recycles[RECYCLE_REASONS.index("crash")] += 1
+                    print(f"Worker {worker.process.pid} exited with code {worker.process.exitcode}, restarting")
+                    self.spawn()
+                continue
+
+            reason = self.recycle_reason(worker)
+            if reason is not None:
+                self.recycle(worker, reason)
+
+    def handle_exit(self, sig: int, frame) -> None:
+        self.should_exit = True
+
+    def run(self) -> None:
+        """Start the workers and supervise them until SIGINT or SIGTERM."""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.handle_exit)
+
+        if not self.reuse_port:
+            self.sockets = [self.config.bind_socket()]
+
+        if self.preload:
+            # Workers inherit the loaded config and skip the import. Frozen
+            # objects are never scanned by the collector, so the pages
+            # holding them are not written to after the fork.
+            self.config.load()
+            gc.collect()
+            gc.freeze()
+
+        print(f"Supervisor {os.getpid()} starting {self.workers_count} workers")
+        for _ in range(self.workers_count):
+            self.spawn()
+
+        while not self.should_exit:
+            self.check()
+            time.sleep(self.check_interval)
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop all workers, letting them drain, and remove the Unix socket file."""
+        for worker in self.workers:
+            if worker.process.is_alive():
+                os.kill(worker.process.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.retire_timeout
+        for worker in self.workers:
+            worker.process.join(max(deadline - time.monotonic(), 0))
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+
+        for sock in self.sockets:
+            sock.close()
+        self.workers.clear()
+        if self.config.uds and os.path.exists(self.config.uds):
+            os.remove(self.config.uds)
+
+    def stats(self) -> Dict[str, int]:
+        """Recycle counters by reason."""
+        return {reason: self.recycles[index] for index, reason in enumerate(RECYCLE_REASONS)}
@@ -0,0 +1,536 @@
+"""Request tracing with W3C `traceparent` propagation and head-based sampling."""
+
+import asyncio
+import functools
+import json
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+
+
+# Request header asking for a Server-Timing breakdown
+SERVER_TIMING_REQUEST_HEADER = "x-server-timing"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+_HEX = frozenset("0123456789abcdef")
+
+
+def _is_hex_id(value: str, length: int) -> bool:
+    return len(value) == length and _HEX.issuperset(value) and value != "0" * length
+
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C `traceparent` header.
+
+    Returns:
+        Optional[Tuple[str, str, bool]]: Trace id, parent span id and sampled
+        flag, None when the header is invalid
+    """
+    parts = value.strip().split("-")
+    if len(parts) < 4:
+        return None
+    version, trace_id, parent_id, flags = parts[:4]
+    # Later versions may append fields, version 00 has exactly four
+    if len(version) != 2 or version == "ff" or (version == "00" and len(parts) != 4):
+        return None
+    if not _is_hex_id(trace_id, 32) or not _is_hex_id(parent_id, 16) or len(flags) != 2:
+        return None
+    try:
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return trace_id, parent_id, sampled
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+class Span:
+    """A timed operation of a trace."""
+
+    __slots__ = ("name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, span_id: str, parent_id: Optional[str], kind: int, start_ns: int):
+        """Constructor."""
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns
+        self.end_ns = start_ns
+        self.attributes: Dict[str, object] = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """Spans recorded by this process for one request."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "sampled", "spans", "active", "_token")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], sampled: bool):
+        """Constructor."""
+        self.trace_id = trace_id
+        # Id of the server span, the root of the spans of this process
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.active = self.span_id
+        self._token = None
+
+    def traceparent(self) -> str:
+        """`traceparent` value with the server span as parent, for downstream calls."""
+        return f"00-{self.trace_id}-{self.active}-{'01' if self.sampled else '00'}"
+
+    def as_dict(self) -> dict:
+        return {"trace_id": self.trace_id, "spans": [span.as_dict() for span in self.spans]}
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the request being handled, None when it is not traced."""
+    return _current.get()
+
+
+class _SpanScope:
+    """Context manager recording a child span of the active span."""
+
+    __slots__ = ("trace", "span", "parent")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.parent = trace.active
+        self.span = Span(name, _new_span_id(), self.parent, SPAN_KIND_INTERNAL, time.time_ns())
+
+    def __enter__(self) -> Span:
+        self.trace.active = self.span.span_id
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        self.trace.active = self.parent
+        self.trace.spans.append(self.span)
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+def span(name: str):
+    """
+    Record a child span in the current trace.
+
+    Returns a shared no-op context manager when the request is not
+    sampled, so untraced requests only pay for a context variable lookup.
+    """
+    trace = _current.get()
+    if trace is None or not trace.sampled:
+        return _NOOP_SCOPE
+    return _SpanScope(trace, name)
+
+
+class Phases:
+    """
+    Durations of the route phases of one request, in seconds.
+
+    Recorded for every request, sampled or not, with two `perf_counter`
+    reads per phase, so a slow request gets its breakdown without a trace.
+    """
+
+    __slots__ = ("handler", "endpoint", "serialization", "serialization_in_endpoint", "in_endpoint", "_token")
+
+    def __init__(self):
+        """Constructor."""
+        self.handler: Optional[float] = None
+        self.endpoint: Optional[float] = None
+        self.serialization = 0.0
+        # Responses rendered by the endpoint itself, e.g. FastJSONResponse(...)
+        self.serialization_in_endpoint = 0.0
+        self.in_endpoint = False
+        self._token = None
+
+
+_phases: ContextVar[Optional[Phases]] = ContextVar("phases", default=None)
+
+
+def start_phases() -> Phases:
+    """Make a new phase record current for the request being handled."""
+    phases = Phases()
+    phases._token = _phases.set(phases)
+    return phases
+
+
+def finish_phases(phases: Phases) -> None:
+    """Reset the current phase record."""
+    if phases._token is not None:
+        _phases.reset(phases._token)
+        phases._token = None
+
+
+class _PhaseScope:
+    """Context manager timing a route phase and recording its span when sampled."""
+
+    __slots__ = ("phases", "name", "scope", "start")
+
+    def __init__(self, phases: Phases, name: str):
+        self.phases = phases
+        self.name = name
+        self.scope = span(name)
+        self.start = 0.0
+
+    def __enter__(self) -> Optional[Span]:
+        if self.name == "endpoint":
+            self.phases.in_endpoint = True
+        self.start = time.perf_counter()
+        return self.scope.__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self.start
+        self.scope.__exit__(exc_type, exc, tb)
+        phases = self.phases
+        if self.name == "serialization":
+            phases.serialization += duration
+            if phases.in_endpoint:
+                phases.serialization_in_endpoint += duration
+        elif self.name == "endpoint":
+            phases.endpoint = duration
+            phases.in_endpoint = False
+        else:
+            phases.handler = duration
+
+
+def phase(name: str):
+    """
+    Time a phase of the current request: `handler`, `endpoint` or `serialization`.
+
+    The duration is recorded for every request, the span only when it is
+    sampled. Outside a request this is `span`.
+    """
+    phases = _phases.get()
+    if phases is None:
+        return span(name)
+    return _PhaseScope(phases, name)
+
+
+class TracedRoute(APIRoute):
+    """
+    Route timing its phases and recording spans of the current trace.
+
+    `handler` covers the whole route: body parsing, validation,
+    dependencies, the endpoint and the response. `endpoint` covers only
+    the endpoint function.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        call = self.dependant.call
+        # FastAPI checks whether the call is a coroutine function per request handler
+        if asyncio.iscoroutinefunction(call):
+            async def traced_call(*call_args, **call_kwargs):
+                with phase("endpoint"):
+                    return await call(*call_args, **call_kwargs)
+        else:
+            def traced_call(*call_args, **call_kwargs):
+                with phase("endpoint"):
+                    return call(*call_args, **call_kwargs)
+        self.dependant.call = functools.wraps(call)(traced_call)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def traced_handler(request):
+            with phase("handler") as current:
+                if current is not None:
+                    current.attributes["http.route"] = path
+                return await handler(request)
+
+        return traced_handler
+
+
+def timing_breakdown(phases: Phases, total: float) -> List[Tuple[str, float]]:
+    """
+    Phase durations of a request.
+
+    Args:
+        phases: Phases recorded for the request
+        total: Seconds spent in the app, measured by the metrics middleware
+
+    Returns:
+        List[Tuple[str, float]]: Milliseconds spent in the middlewares, the
+        validation (body parsing, dependencies and response model), the
+        handler body, the response serialization and the total. Only the
+        total when the request didn't reach a route.
+    """
+    total_ms = total * 1000
+    if phases.handler is None:
+        return [("total", total_ms)]
+
+    handler_ms = phases.handler * 1000
+    endpoint_ms = (phases.endpoint or 0.0) * 1000
+    serialization_ms = phases.serialization * 1000
+    serialization_in_endpoint_ms = phases.serialization_in_endpoint * 1000
+    timings = (
+        ("middleware", total_ms - handler_ms),
+        ("validation", handler_ms - endpoint_ms - (serialization_ms - serialization_in_endpoint_ms)),
+        ("handler", endpoint_ms - serialization_in_endpoint_ms),
+        ("serialization", serialization_ms),
+        ("total", total_ms),
+    )
+    return [(name, max(value, 0.0)) for name, value in timings]
+
+
+def server_timing(phases: Phases, total: float) -> str:
+    """`Server-Timing` header value with the phase durations of a request."""
+    return ", ".join(f"{name};dur={value:.3f}" for name, value in timing_breakdown(phases, total))
+
+
+class TraceBuffer:
+    """Ring buffer with the most recent sampled traces."""
+
+    def __init__(self, capacity: int):
+        """Constructor."""
+        self._traces: deque = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+    def append(self, trace: Trace) -> None:
+        self._traces.append(trace)
+
+    def recent(self, limit: int) -> List[Trace]:
+        """Most recent traces first."""
+        traces = list(self._traces)
+        traces.reverse()
+        return traces[:limit]
+
+    def find(self, trace_id: str) -> Optional[Trace]:
+        for trace in reversed(self._traces):
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(traces: List[Trace], service_name: str) -> dict:
+    """Encode traces as an OTLP/JSON `ExportTraceServiceRequest`."""
+    spans = []
+    for trace in traces:
+        for item in trace.spans:
+            encoded = {
+                "traceId": trace.trace_id,
+                "spanId": item.span_id,
+                "name": item.name,
+                "kind": item.kind,
+                "startTimeUnixNano": str(item.start_ns),
+                "endTimeUnixNano": str(item.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in item.attributes.items()],
+            }
+            if item.parent_id:
+                encoded["parentSpanId"] = item.parent_id
+            spans.append(encoded)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+class OTLPExporter:
+    """
+    Push sampled traces in batches to an OTLP/HTTP JSON endpoint.
+
+    Traces are queued by the request path and posted by a background
+    thread every `interval` seconds. Traces beyond `max_queue` and failed
+    batches are dropped and counted.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, interval: float = 5.0, max_queue: int = 2048,
+                 timeout: float = 2.0):
+        """
+        Constructor.
+
+        Args:
+            endpoint: URL of the OTLP traces endpoint, e.g. http://localhost:4318/v1/traces
+            service_name: `service.name` resource attribute
+            interval: Seconds between batches
+            max_queue: Traces waiting to be exported before new ones are dropped
+            timeout: Seconds to wait for the endpoint
+        """
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.interval = interval
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._queue: deque = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def enqueue(self, trace: Trace) -> None:
+        if len(self._queue) >= self.max_queue:
+            metrics.record_trace_export_dropped(1)
+            return
+        self._queue.append(trace)
+
+    def flush(self) -> int:
+        """
+        Post the queued traces.
+
+        Returns:
+            int: Number of traces exported
+        """
+        batch = [self._queue.popleft() for _ in range(len(self._queue))]
+        if not batch:
+            return 0
+
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(otlp_payload(batch, self.service_name)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except Exception:
+            metrics.record_trace_export_dropped(len(batch))
+            return 0
+        return len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+
+class Tracer:
+    """Sampling decisions and storage of the request traces."""
+
+    def __init__(self, sample_rate: float, buffer_size: int, exporter: Optional[OTLPExporter] = None):
+        """
+        Constructor.
+
+        Args:
+            sample_rate: Fraction of the requests without a sampled parent that are traced
+            buffer_size: Traces kept for the debug endpoint
+            exporter: Exporter of the sampled traces
+        """
+        self.sample_rate = sample_rate
+        self.buffer = TraceBuffer(buffer_size)
+        self.exporter = exporter
+
+    def start_request(self, traceparent: Optional[str]) -> Optional[Trace]:
+        """
+        Decide whether a request is traced and make its trace current.
+
+        The sampled flag of a valid incoming `traceparent` is honoured, so a
+        trace is recorded end to end or not at all. Requests without a
+        parent are sampled at `sample_rate`. A trace that is not sampled is
+        still created to propagate the incoming context, but records no
+        spans.
+
+        Args:
+            traceparent: Incoming `traceparent` header
+
+        Returns:
+            Optional[Trace]: Trace of the request, None when it is neither
+            sampled nor part of an incoming trace
+        """
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace = Trace(parent[0], parent[1], parent[2])
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trace = Trace(f"{random.getrandbits(128) or 1:032x}", None, True)
+        else:
+            return None
+
+        trace._token = _current.set(trace)
+        return trace
+
+    def finish_request(self, trace: Trace, name: str, start_ns: int, attributes: Dict[str, object]) -> None:
+        """Record the server span, store the trace and reset the current trace."""
+        if trace._token is not None:
+            _current.reset(trace._token)
+            trace._token = None
+        if not trace.sampled:
+            return
+
+        server_span = Span(name, trace.span_id, trace.parent_id, SPAN_KIND_SERVER, start_ns)
+        server_span.end_ns = time.time_ns()
+        server_span.attributes.update(attributes)
+        trace.spans.append(server_span)
+
+        self.buffer.append(trace)
+        if self.exporter is not None:
+            self.exporter.enqueue(trace)
+
+
+tracer = Tracer(
+    sample_rate=settings.tracing_sample_rate,
+    buffer_size=settings.tracing_buffer_size,
+    exporter=OTLPExporter(
+        settings.tracing_otlp_endpoint,
+        service_name=settings.app_name,
+        interval=settings.tracing_export_interval,
+    ) if settings.tracing_otlp_endpoint else None,
+)
@@ -0,0 +1,171 @@
+"""Validation rules shared by the greeting endpoints."""
+
+import re
+from typing import Dict, Optional
+from urllib.parse import parse_qsl
+
+from pydantic.version import version_short
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.core.metrics import metrics
+from app.core.serialization import dumps
+
+
+# This regex filter only alphanumeric chars (a-z, A-Z, 0-9), spaces, hífens, underlines and dots
+NAME_PATTERN = r"^[a-zA-Z0-9\s\-_\.]+$"
+NAME_MIN_LENGTH = 1
+NAME_MAX_LENGTH = 100
+
+_NAME_REGEX = re.compile(NAME_PATTERN)
+
+# Same error types and messages of the pydantic validation of the query parameter
+_VIOLATIONS = {
+    "string_too_short": (
+        f"String should have at least {NAME_MIN_LENGTH} character",
+        {"min_length": NAME_MIN_LENGTH},
+    ),
+    "string_too_long": (
+        f"String should have at most {NAME_MAX_LENGTH} characters",
+        {"max_length": NAME_MAX_LENGTH},
+    ),
+    "string_pattern_mismatch": (
+        f"String should match pattern '{NAME_PATTERN}'",
+        {"pattern": NAME_PATTERN},
+    ),
+}
+
+
+class InvalidNameError(ValueError):
+    """Raised when a name does not follow the greeting rules."""
+
+    def __init__(self, error: str, detail: str):
+        """Constructor."""
+        super().__init__(detail)
+        self.error = error
+        self.detail = detail
+
+
+def name_violation(name: str) -> Optional[str]:
+    """
+    Check a name against the length and pattern rules.
+
+    Returns:
+        Optional[str]: Pydantic error type of the violated rule, None when valid
+    """
+    if len(name) < NAME_MIN_LENGTH:
+        return "string_too_short"
+    if len(name) > NAME_MAX_LENGTH:
+        return "string_too_long"
+    if not _NAME_REGEX.match(name):
+        return "string_pattern_mismatch"
+    return None
+
+
+def validate_name(name: Optional[str]) -> str:
+    """
+    Validate and normalize a name with the same rules as `greet_user`.
+
+    Args:
+        name: Name to greet, None to use the standard greeting name
+
+    Returns:
+        str: Name without surrounding spaces
+
+    Raises:
+        InvalidNameError: When the name is invalid
+    """
+    if name is None:
+        name = settings.default_greeting_name
+    elif not isinstance(name, str):
+        raise InvalidNameError("Invalid name parameter", "The name must be a string")
+    else:
+        violation = name_violation(name)
+        if violation == "string_pattern_mismatch":
+            raise InvalidNameError(
+                "Invalid name parameter",
+                "The name can only have alphanumeric chars, spaces, hífens, underlines and dots"
+            )
+        elif violation is not None:
+            raise InvalidNameError(
+                "Invalid name parameter",
+                f"The name must have between {NAME_MIN_LENGTH} and {NAME_MAX_LENGTH} characters"
+            )
+
+    name = name.strip()
+    if not name:
+        raise InvalidNameError("Invalid name parameter", "The name can't been empty or have only spaces")
+
+    return name
+
+
+def _rejection_body(reason: str) -> bytes:
+    msg, ctx = _VIOLATIONS[reason]
+    return dumps({
+        "error": "Validation Error",
+        "detail": [{
+            "type": reason,
+            "loc": ["query", "name"],
+            "msg": msg,
+            "ctx": ctx,
+            "url": f"https://errors.pydantic.dev/{version_short()}/v/{reason}",
+        }],
+        "body": None,
+    })
+
+
+class GreetValidationMiddleware:
+    """
+    Reject invalid `/greet` names before routing.
+
+    The name is checked with the precompiled rules and invalid requests get
+    a pre-encoded 422 body with the shape of the validation error handler,
+    skipping the `RequestValidationError` pipeline. The input is not echoed
+    back. Valid requests go on to the endpoint, whose `Query` declaration
+    stays the OpenAPI contract.
+    """
+
+    def __init__(self, app: ASGIApp, path: str):
+        """
+        Constructor.
+
+        Args:
+            app: Wrapped ASGI application
+            path: Path of the greet endpoint
+        """
+        self.app = app
+        self.path = path
+        self._responses: Dict[str, tuple] = {}
+        for reason in _VIOLATIONS:
+            body = _rejection_body(reason)
+            headers = [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            self._responses[reason] = (headers, body)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != self.path or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        query_string = scope.get("query_string", b"")
+        if b"name=" not in query_string:
+            await self.app(scope, receive, send)
+            return
+
+        # Like starlette's QueryParams, the last value wins
+        name = None
+        for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+            if key == "name":
+                name = value
+
+        reason = name_violation(name) if name is not None else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        metrics.record_greet_rejection(reason)
+        headers, body = self._responses[reason]
+        await send({"type": "http.response.start", "status": 422, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": body})
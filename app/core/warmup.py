@@ -0,0 +1,74 @@
+"""Synthetic in-process requests that warm up a worker before it is ready."""
+
+import time
+from typing import List, Tuple
+
+from starlette.types import ASGIApp, Message
+
+
+def _build_scope(path: str) -> dict:
+    raw_path, _, query = path.partition("?")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"warmup"), (b"user-agent", b"warmup")],
+        "client": None,
+        "server": None,
+    }
+
+
+async def _call(app: ASGIApp, path: str) -> int:
+    status = 0
+    request_sent = False
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(_build_scope(path), receive, send)
+    return status
+
+
+async def warm_up(app: ASGIApp, paths: List[str]) -> Tuple[float, List[Tuple[str, str]]]:
+    """
+    Send a GET request to each path through the whole middleware stack.
+
+    The first request of each route builds the pydantic validators and
+    serializers, resolves the dependencies and primes the psutil counters,
+    so it is paid here instead of by the first clients.
+
+    Args:
+        app: Application
+        paths: Paths to request, with their query string
+
+    Returns:
+        Tuple[float, List[Tuple[str, str]]]: Duration in seconds and the paths
+        that failed with the error
+    """
+    started = time.perf_counter()
+    failures = []
+    for path in paths:
+        try:
+            status = await _call(app, path)
+        except Exception as exc:
+            failures.append((path, repr(exc)))
+            continue
+        # 503 is expected from the readiness probe before the worker is ready
+        if status >= 500 and status != 503:
+            failures.append((path, f"status {status}"))
+    return time.perf_counter() - started, failures
@@ -2,17 +2,40 @@
 
 import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
-from fastapi import FastAPI, Request, Response
+from typing import AsyncGenerator, Dict
+import anyio
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config.settings import settings
 from app.api.router import api_v1_router
 from app.core.metrics import metrics
+from app.core.lifecycle import lifecycle
+from app.core.serialization import FastJSONResponse
+from app.core.cache import ResponseCache, ResponseCacheMiddleware
+from app.core.validation import GreetValidationMiddleware
+from app.core.ratelimit import RateLimitMiddleware
+from app.core.sizing import resolve_worker_sizing
+from app.core.openapi import OpenAPIDocument, setup_openapi
+from app.core.warmup import warm_up
+from app.core.accesslog import access_log
+from app.core.tracing import (
+    SERVER_TIMING_REQUEST_HEADER,
+    TracedRoute,
+    finish_phases,
+    server_timing,
+    start_phases,
+    tracer,
+)
+from app.core.gcstats import apply_gc_settings, freeze, gc_stats
+from app.core.slowlog import loop_lag_monitor, slow_requests
+from app.core.queuetime import queue_time
 
 
 @asynccontextmanager
@@ -30,12 +53,180 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         environment=settings.environment
     )
     
+    # Size the thread pool for the CPU share of this worker
+    sizing = resolve_worker_sizing(settings.workers, settings.thread_pool_size, settings.limit_concurrency)
+    if sizing.thread_pool_size is not None:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = sizing.thread_pool_size
+    metrics.set_worker_sizing(sizing.as_dict())
+    
+    # Series of the latency histogram each route adds per distinct path
+    series = metrics.http_request_duration_seconds.series_report(
+        (route.path, len(route.methods)) for route in app.routes if isinstance(route, APIRoute)
+    )
+    print("Latency histogram series: " + ", ".join(f"{path} {count}" for path, count in series.items()))
+    
+    # Garbage collector tuning and pause metrics
+    apply_gc_settings(settings.gc_threshold)
+    if settings.gc_metrics_enabled:
+        gc_stats.install()
+    
+    # Encode the OpenAPI schema once instead of on the first request
+    app.state.openapi_document.build(app)
+    
+    # Pay the first request costs of each route before receiving traffic
+    if settings.warmup_paths:
+        lifecycle.warming_up = True
+        try:
+            duration, failures = await warm_up(app, settings.warmup_paths)
+        finally:
+            lifecycle.warming_up = False
+        metrics.record_warmup(duration)
+        for path, error in failures:
+            print(f"Warm-up request to {path} failed: {error}")
+        print(f"Warmed up {len(settings.warmup_paths)} routes in {duration:.3f}s")
+    
+    # Long-lived objects are then skipped by every collection
+    if settings.gc_freeze_after_warmup:
+        print(f"Froze {freeze()} objects after warm-up")
+    
+    if tracer.exporter is not None:
+        tracer.exporter.start()
+    
+    # uvicorn's access log is off, requests are logged off the event loop
+    if settings.access_log_enabled is not False:
+        access_log.start()
+    
+    loop_lag_monitor.start()
+    
+    lifecycle.mark_ready()
     print(f"Application started successfully on {settings.environment} environment")
     
     yield
     
-    # Shutdown
+    # Shutdown: the server already drained on SIGTERM, see app.core.server
     print(f"Shutting down {settings.app_name}")
+    lifecycle.begin_drain()
+    await loop_lag_monitor.stop()
+    access_log.stop()
+    if tracer.exporter is not None:
+        tracer.exporter.stop()
+    gc_stats.uninstall()
+
+
+class MetricsMiddleware:
+    """
+    Middleware to collect request metrics.
+    
+    A plain ASGI middleware rather than `@app.middleware("http")`: Starlette's
+    `BaseHTTPMiddleware` wraps streaming responses in a response that reads
+    `receive` to detect disconnects, stealing request body messages that
+    arrive after the response started.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        """Constructor."""
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or lifecycle.warming_up:
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.time()
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        path = scope["path"]
+        
+        # Time spent in the ingress and the socket backlog
+        if settings.request_start_header:
+            request_start = headers.get(settings.request_start_header)
+            if request_start is not None:
+                queued = queue_time(request_start, start_time)
+                if queued is not None:
+                    metrics.record_queue_time(queued)
+        
+        # The breakdown comes from the phases timed for every request, so
+        # asking for it doesn't trace the request
+        timing_requested = settings.server_timing != "off" and SERVER_TIMING_REQUEST_HEADER in headers
+        
+        trace = None
+        if settings.tracing_enabled:
+            trace = tracer.start_request(headers.get("traceparent"))
+            start_ns = time.time_ns()
+        
+        status_code = None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                sampled = trace is not None and trace.sampled
+                if trace is not None or timing_requested:
+                    response_headers = MutableHeaders(scope=message)
+                    if trace is not None:
+                        response_headers["traceresponse"] = trace.traceparent()
+                    if timing_requested or (sampled and settings.server_timing == "sampled"):
+                        response_headers["Server-Timing"] = server_timing(phases, time.time() - start_time)
+            await send(message)
+        
+        # Process request
+        in_flight = lifecycle.in_flight
+        lifecycle.request_started()
+        phases = start_phases()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish_phases(phases)
+            lifecycle.request_finished()
+            route = scope.get("route")
+            route_path = route.path if route is not None else path
+            if trace is not None:
+                tracer.finish_request(
+                    trace,
+                    f"{method} {route_path}",
+                    start_ns,
+                    {
+                        "http.method": method,
+                        "http.target": path,
+                        "http.status_code": status_code or 500,
+                    }
+                )
+        
+        if status_code is None:
+            return
+        
+        # Calculate duration
+        duration = time.time() - start_time
+        
+        # Record metrics
+        metrics.record_request(
+            method=method,
+            endpoint=path,
+            status_code=status_code,
+            duration=duration,
+            trace_id=trace.trace_id if trace is not None and trace.sampled else None,
+            route=route.path if route is not None else None
+        )
+        slow_requests.record(
+            method=method,
+            route=route_path,
+            path=path,
+            query=scope["query_string"].decode("latin-1"),
+            status=status_code,
+            duration=duration,
+            in_flight=in_flight,
+            loop_lag=loop_lag_monitor.lag,
+            phases=phases,
+            trace=trace
+        )
+        client = scope.get("client")
+        access_log.log(
+            method=method,
+            path=path,
+            status=status_code,
+            duration=duration,
+            client=client[0] if client else ""
+        )
 
 
 def create_application() -> FastAPI:
@@ -49,13 +240,35 @@ def create_application() -> FastAPI:
         title=settings.app_name,
         version=settings.app_version,
         description="A clean and well structured FastAPI application with health checks, greetings and Prometheus metrics",
-        docs_url="/docs",
-        redoc_url="/redoc",
-        openapi_url="/openapi.json",
+        # Served by setup_openapi below
+        docs_url=None,
+        redoc_url=None,
+        openapi_url=None,
         lifespan=lifespan,
-        debug=settings.debug
+        debug=settings.debug,
+        default_response_class=FastJSONResponse
     )
     
+    # Response cache for idempotent GET routes
+    if settings.response_cache_routes:
+        app.add_middleware(
+            ResponseCacheMiddleware,
+            cache=ResponseCache(max_bytes=settings.response_cache_max_bytes),
+            routes=settings.response_cache_routes
+        )
+    
+    # Cheap rejection of invalid greeting names
+    app.add_middleware(GreetValidationMiddleware, path=f"{settings.api_v1_prefix}/greet")
+    
+    # Per-client rate limiting
+    if settings.rate_limit_enabled and settings.rate_limit_routes:
+        app.add_middleware(
+            RateLimitMiddleware,
+            routes={path: (limit.rate, limit.burst) for path, limit in settings.rate_limit_routes.items()},
+            key_header=settings.rate_limit_key_header,
+            trusted_hops=settings.rate_limit_trusted_hops
+        )
+    
     # Configuring CORS
     app.add_middleware(
         CORSMiddleware,
@@ -65,33 +278,14 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Adding metrics middleware
-    @app.middleware("http")
-    async def metrics_middleware(request: Request, call_next) -> Response:
-        """Middleware to collect request metrics."""
-        start_time = time.time()
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration = time.time() - start_time
-        
-        # Record metrics
-        metrics.record_request(
-            method=request.method,
-            endpoint=request.url.path,
-            status_code=response.status_code,
-            duration=duration
-        )
-        
-        return response
+    # Adding metrics middleware, outermost so it times the whole stack
+    app.add_middleware(MetricsMiddleware)
     
     # Exception handlers
     @app.exception_handler(StarletteHTTPException)
-    async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+    async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> FastJSONResponse:
         """Handle HTTP exceptions."""
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=exc.status_code,
             content={
                 "error": "HTTP Exception",
@@ -101,9 +295,9 @@ def create_application() -> FastAPI:
         )
     
     @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    async def validation_exception_handler(request: Request, exc: RequestValidationError) -> FastJSONResponse:
         """Handle request validation errors."""
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=422,
             content={
                 "error": "Validation Error",
@@ -113,9 +307,9 @@ def create_application() -> FastAPI:
         )
     
     @app.exception_handler(ValidationError)
-    async def pydantic_validation_exception_handler(request: Request, exc: ValidationError) -> JSONResponse:
+    async def pydantic_validation_exception_handler(request: Request, exc: ValidationError) -> FastJSONResponse:
         """Handle Pydantic validation errors."""
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=422,
             content={
                 "error": "Validation Error",
@@ -126,23 +320,33 @@ def create_application() -> FastAPI:
     # Including routers
     app.include_router(api_v1_router, prefix=settings.api_v1_prefix)
     
+    # Pre-encoded OpenAPI schema and docs pages
+    setup_openapi(
+        app,
+        OpenAPIDocument(settings.openapi_prebuilt_path),
+        docs_enabled=settings.docs_enabled
+    )
+    
     # Root endpoint
+    app.router.route_class = TracedRoute
+    
     @app.get(
         "/",
+        response_model=Dict[str, str],
         summary="Root",
         description="Root endpoint with basic application information",
         tags=["root"]
     )
-    async def root() -> dict:
+    async def root() -> FastJSONResponse:
         """Root endpoint with application information."""
-        return {
+        return FastJSONResponse({
             "app": settings.app_name,
             "version": settings.app_version,
             "environment": settings.environment,
-            "docs_url": "/docs",
+            "docs_url": app.docs_url or "",
             "health_url": f"{settings.api_v1_prefix}{settings.health_path}",
             "metrics_url": f"{settings.api_v1_prefix}{settings.metrics_path}"
-        }
+        })
     
     return app
 
@@ -158,6 +362,6 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        access_log=True,
+        access_log=False,
         log_level="info" if not settings.debug else "debug"
     )
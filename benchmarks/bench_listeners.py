@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Compare the listener modes of run.py.
+
+Starts the app with a shared TCP socket (`--workers N`), with one
+SO_REUSEPORT socket per worker (`--reuse-port`) and on a Unix domain
+socket (`--uds`), and greets over keep-alive connections and with a new
+connection per request, where the accept balancing shows.
+
+Usage:
+    python -m benchmarks.bench_listeners [--workers N] [--requests N] [--concurrency N]
+"""
+
+import argparse
+import os
+import tempfile
+from typing import List, Optional
+
+from benchmarks.harness import BenchmarkResult, print_results, run_http, serve
+
+
+PATH = "/api/v1/greet?name=Darlei"
+
+
+def run_mode(name: str, args: List[str], requests: int, concurrency: int,
+             uds: Optional[str] = None) -> List[BenchmarkResult]:
+    with serve(args, uds=uds) as port:
+        return [
+            run_http(f"{name}: keep-alive", port, PATH, requests=requests, concurrency=concurrency, uds=uds),
+            run_http(f"{name}: new connections", port, PATH, requests=requests, concurrency=concurrency,
+                     uds=uds, warmup=10, keep_alive=False),
+        ]
+
+
+def main(workers: int, requests: int, concurrency: int) -> None:
+    base = ["--workers", str(workers)]
+    results = run_mode("shared socket", base, requests, concurrency)
+    results += run_mode("reuse port", base + ["--reuse-port"], requests, concurrency)
+    with tempfile.TemporaryDirectory() as directory:
+        uds = os.path.join(directory, "app.sock")
+        results += run_mode("unix socket", base + ["--uds", uds], requests, concurrency, uds=uds)
+
+    print_results(results)
+    print()
+    for result in results:
+        spread = result.percentile(0.99) / result.percentile(0.50)
+        print(f"{result.name:<40} p99/p50 {spread:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the run.py listener modes")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per case (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent connections (default: 16)")
+    args = parser.parse_args()
+    main(args.workers, args.requests, args.concurrency)
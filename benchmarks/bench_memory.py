@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare the memory of the workers with and without preload.
+
+Starts the app with `run.py --workers N`, then with `--preload`, and
+reports the unique set size (USS, memory only that process holds) and
+proportional set size (PSS, shared pages split between the processes
+using them) of every worker and of the parent process. The PSS total is
+what the pod is charged for.
+
+Usage:
+    python -m benchmarks.bench_memory [--workers N] [--requests N]
+"""
+
+import argparse
+import time
+from typing import List
+
+import psutil
+
+from benchmarks.harness import run_http, serve
+
+
+MIB = 1024 * 1024
+
+
+def _server_processes(workers: int, timeout: float = 30.0) -> List[psutil.Process]:
+    """The run.py process followed by its workers, once all workers are up."""
+    server = psutil.Process().children()[0]
+    deadline = time.monotonic() + timeout
+    while True:
+        children = [
+            child for child in server.children()
+            if "resource_tracker" not in " ".join(child.cmdline())
+        ]
+        if len(children) >= workers or time.monotonic() > deadline:
+            return [server] + children
+        time.sleep(0.1)
+
+
+def measure(name: str, args: List[str], workers: int, requests: int) -> None:
+    with serve(["--workers", str(workers)] + args) as port:
+        processes = _server_processes(workers)
+        # Let every worker finish its startup and serve some traffic
+        run_http(name, port, "/api/v1/greet?name=Darlei", requests=requests, concurrency=workers * 2)
+        time.sleep(1)
+
+        print(f"\n{name}")
+        print(f"{'process':<12}{'pid':>8}{'rss MiB':>10}{'uss MiB':>10}{'pss MiB':>10}")
+        total_uss = total_pss = 0
+        for index, process in enumerate(processes):
+            info = process.memory_full_info()
+            total_uss += info.uss
+            total_pss += info.pss
+            label = "parent" if index == 0 else f"worker {index}"
+            print(f"{label:<12}{process.pid:>8}{info.rss / MIB:>10.1f}{info.uss / MIB:>10.1f}{info.pss / MIB:>10.1f}")
+        print(f"{'total':<12}{'':>8}{'':>10}{total_uss / MIB:>10.1f}{total_pss / MIB:>10.1f}")
+
+
+def main(workers: int, requests: int) -> None:
+    measure("spawned workers (--workers)", [], workers, requests)
+    measure("preloaded workers (--preload)", ["--preload"], workers, requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure worker memory with and without preload")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests sent before measuring (default: 2000)")
+    args = parser.parse_args()
+    main(args.workers, args.requests)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Compare the uvicorn server profiles of run.py.
+
+Starts the app once per profile (`--profile NAME`) and greets over
+keep-alive connections and with a new connection per request.
+
+Usage:
+    python -m benchmarks.bench_profiles [--workers N] [--requests N] [--concurrency N]
+"""
+
+import argparse
+
+from app.core.profiles import SERVER_PROFILES
+from benchmarks.harness import print_results, run_http, serve
+
+
+PATH = "/api/v1/greet?name=Darlei"
+
+
+def main(workers: int, requests: int, concurrency: int) -> None:
+    results = []
+    for profile in SERVER_PROFILES:
+        with serve(["--workers", str(workers), "--profile", profile]) as port:
+            results.append(run_http(f"{profile}: keep-alive", port, PATH, requests=requests,
+                                    concurrency=concurrency))
+            results.append(run_http(f"{profile}: new connections", port, PATH, requests=requests,
+                                    concurrency=concurrency, warmup=10, keep_alive=False))
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the uvicorn server profiles")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per case (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent connections (default: 16)")
+    args = parser.parse_args()
+    main(args.workers, args.requests, args.concurrency)
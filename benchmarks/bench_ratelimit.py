@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Benchmark a single token bucket check.
+
+Usage:
+    python -m benchmarks.bench_ratelimit [--clients N] [--checks N]
+"""
+
+import argparse
+import time
+
+from app.core.ratelimit import TokenBucketStore
+
+
+def main(clients: int, checks: int) -> None:
+    store = TokenBucketStore(rate=1_000_000, burst=1_000_000)
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(clients)]
+    for key in keys:
+        store.acquire(key)
+
+    acquire = store.acquire
+    started = time.perf_counter()
+    for i in range(checks):
+        acquire(keys[i % clients])
+    elapsed = time.perf_counter() - started
+
+    print(f"clients={clients} checks={checks} ns/check={elapsed / checks * 1e9:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark token bucket checks")
+    parser.add_argument("--clients", type=int, default=10000, help="Distinct client keys (default: 10000)")
+    parser.add_argument("--checks", type=int, default=1_000_000, help="Checks to run (default: 1000000)")
+    args = parser.parse_args()
+    main(args.clients, args.checks)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON response encoding engines.
+
+Runs `/healthz`, `/greet`, the root endpoint and a validation error with
+each available engine.
+
+Usage:
+    python -m benchmarks.bench_responses [--requests N]
+"""
+
+import argparse
+import asyncio
+
+from app.core import serialization
+from app.main import create_application
+from benchmarks.harness import print_results, run_asgi
+
+
+CASES = [
+    ("healthz", "/api/v1/healthz"),
+    ("greet", "/api/v1/greet?name=Darlei"),
+    ("root", "/"),
+    ("greet validation error", "/api/v1/greet?name=test%40domain"),
+]
+
+
+async def main(requests: int) -> None:
+    engines = ["stdlib"] + (["orjson"] if serialization.orjson is not None else [])
+    results = []
+
+    for engine in engines:
+        serialization.set_json_engine(engine)
+        app = create_application()
+        for name, path in CASES:
+            results.append(await run_asgi(app, f"{engine}: {name}", path, requests=requests))
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON response engines")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per case (default: 5000)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
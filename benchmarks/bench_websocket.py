@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compare greetings over the WebSocket channel with HTTP keep-alive requests.
+
+Starts the app with `run.py` and greets the same name sequentially over
+one WebSocket connection and over one keep-alive HTTP connection.
+
+Usage:
+    python -m benchmarks.bench_websocket [--messages N]
+"""
+
+import argparse
+import time
+
+from benchmarks.harness import BenchmarkResult, print_results, run_http, serve
+
+
+def run_websocket(port: int, messages: int, warmup: int = 100) -> BenchmarkResult:
+    from websockets.sync.client import connect
+
+    latencies = []
+    with connect(f"ws://127.0.0.1:{port}/api/v1/greet/ws") as websocket:
+        for _ in range(warmup):
+            websocket.send("Darlei")
+            websocket.recv()
+        started = time.perf_counter()
+        for _ in range(messages):
+            message_started = time.perf_counter()
+            websocket.send("Darlei")
+            websocket.recv()
+            latencies.append(time.perf_counter() - message_started)
+        elapsed = time.perf_counter() - started
+    return BenchmarkResult("websocket: messages", latencies, elapsed)
+
+
+def main(messages: int) -> None:
+    with serve() as port:
+        results = [
+            run_http("http keep-alive: /greet", port, "/api/v1/greet?name=Darlei", requests=messages),
+            run_websocket(port, messages),
+        ]
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the WebSocket greeting channel")
+    parser.add_argument("--messages", type=int, default=5000, help="Greetings per case (default: 5000)")
+    args = parser.parse_args()
+    main(args.messages)
@@ -0,0 +1,274 @@
+"""
+Benchmark harness.
+
+`run_asgi` drives an ASGI application directly, without sockets, so the
+numbers reflect the cost of the application code (middlewares,
+validation, handlers and serialization) rather than the network stack.
+`serve` and `run_http` measure a real server over keep-alive connections.
+"""
+
+import asyncio
+import contextlib
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+class BenchmarkResult:
+    """Latencies collected for one benchmark case."""
+
+    def __init__(self, name: str, latencies: List[float], elapsed: float):
+        """Constructor."""
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+
+    def percentile(self, fraction: float) -> float:
+        """Latency percentile in seconds."""
+        index = min(int(len(self.latencies) * fraction), len(self.latencies) - 1)
+        return self.latencies[index]
+
+    def summary(self) -> Dict[str, float]:
+        """Throughput and latency percentiles (in microseconds)."""
+        return {
+            "requests": len(self.latencies),
+            "rps": len(self.latencies) / self.elapsed if self.elapsed else 0.0,
+            "mean_us": statistics.fmean(self.latencies) * 1e6,
+            "p50_us": self.percentile(0.50) * 1e6,
+            "p90_us": self.percentile(0.90) * 1e6,
+            "p99_us": self.percentile(0.99) * 1e6,
+        }
+
+
+def _build_scope(method: str, path: str, headers: List[Tuple[bytes, bytes]]) -> dict:
+    raw_path, _, query = path.partition("?")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")] + headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def call_asgi(
+    app,
+    method: str,
+    path: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+) -> Tuple[int, bytes]:
+    """
+    Send a single request to an ASGI app.
+
+    Returns:
+        Tuple[int, bytes]: Status code and response body
+    """
+    encoded_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    scope = _build_scope(method, path, encoded_headers)
+    request_sent = False
+    status = 0
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.sleep(3600)
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def run_asgi(
+    app,
+    name: str,
+    path: str,
+    requests: int = 5000,
+    method: str = "GET",
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+    warmup: int = 200,
+) -> BenchmarkResult:
+    """
+    Benchmark sequential requests against an ASGI app.
+
+    Args:
+        app: ASGI application
+        name: Case name used in the report
+        path: Path with optional query string
+        requests: Number of measured requests
+        warmup: Number of requests discarded before measuring
+    """
+    for _ in range(warmup):
+        await call_asgi(app, method, path, headers, body)
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        await call_asgi(app, method, path, headers, body)
+        latencies.append(time.perf_counter() - request_started)
+    return BenchmarkResult(name, latencies, time.perf_counter() - started)
+
+
+def print_results(results: List[BenchmarkResult]) -> None:
+    """Print results as a table."""
+    header = f"{'case':<40} {'rps':>10} {'mean us':>10} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        row = result.summary()
+        print(
+            f"{result.name:<40} {row['rps']:>10.0f} {row['mean_us']:>10.1f} "
+            f"{row['p50_us']:>10.1f} {row['p90_us']:>10.1f} {row['p99_us']:>10.1f}"
+        )
+
+
+def free_port() -> int:
+    """Ask the kernel for an unused TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(args: Optional[List[str]] = None, env: Optional[Dict[str, str]] = None, port: Optional[int] = None,
+          uds: Optional[str] = None, timeout: float = 30.0) -> Iterator[int]:
+    """
+    Run the app with `run.py` in a subprocess until the context exits.
+
+    Args:
+        args: Extra `run.py` arguments
+        env: Extra environment variables
+        port: Port to bind, a free one when None
+        uds: Unix socket the server binds instead of the port
+        timeout: Seconds to wait for the server to answer
+
+    Yields:
+        int: Port the server listens on
+    """
+    port = port or free_port()
+    command = [sys.executable, str(ROOT_DIR / "run.py"), "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning"] + (args or [])
+    process_env = dict(os.environ, RATE_LIMIT_ENABLED="false", **(env or {}))
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=process_env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                connection = _connect("127.0.0.1", port, uds)
+                connection.request("GET", "/api/v1/healthz")
+                if connection.getresponse().status == 200:
+                    connection.close()
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Server did not start in time")
+                time.sleep(0.1)
+        yield port
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def _connect(host: str, port: int, uds: Optional[str] = None) -> http.client.HTTPConnection:
+    if uds:
+        return _UnixHTTPConnection(uds)
+    return http.client.HTTPConnection(host, port)
+
+
+def run_http(
+    name: str,
+    port: int,
+    path: str,
+    requests: int = 5000,
+    concurrency: int = 1,
+    host: str = "127.0.0.1",
+    uds: Optional[str] = None,
+    warmup: int = 100,
+    keep_alive: bool = True,
+) -> BenchmarkResult:
+    """
+    Benchmark a running server with keep-alive connections.
+
+    Each of the `concurrency` threads owns one connection and sends
+    `requests / concurrency` sequential requests. Without `keep_alive`
+    every request opens a new connection, so accepts are measured too.
+    """
+    per_connection = max(requests // concurrency, 1)
+    latencies: List[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker() -> None:
+        connection = _connect(host, port, uds)
+        for _ in range(warmup):
+            connection.request("GET", path)
+            connection.getresponse().read()
+        local = []
+        barrier.wait()
+        for _ in range(per_connection):
+            started = time.perf_counter()
+            if not keep_alive:
+                connection.close()
+                connection = _connect(host, port, uds)
+            connection.request("GET", path)
+            connection.getresponse().read()
+            local.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return BenchmarkResult(name, latencies, time.perf_counter() - started)
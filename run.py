@@ -15,6 +15,32 @@ app_dir = Path(__file__).parent / "app"
 sys.path.insert(0, str(app_dir.parent))
 
 from app.config.settings import settings
+from app.core.profiles import SERVER_PROFILES, resolve_server_profile
+from app.core.sizing import resolve_worker_sizing
+
+
+def workers_arg(value: str):
+    """Parse the --workers argument: a positive number or auto."""
+    if value == "auto":
+        return value
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a positive integer or auto")
+    if workers < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer or auto")
+    return workers
+
+
+def positive_int(value: str) -> int:
+    """Parse a positive integer argument."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return number
 
 
 def main():
@@ -31,6 +57,18 @@ def main():
         default=settings.port,
         help=f"Port to bind (default: {settings.port})"
     )
+    parser.add_argument(
+        "--uds",
+        default=settings.uds,
+        metavar="PATH",
+        help="Bind to a Unix domain socket instead of the host and port"
+    )
+    parser.add_argument(
+        "--reuse-port",
+        action="store_true",
+        default=settings.reuse_port,
+        help="Bind one SO_REUSEPORT socket per worker so the kernel balances connections (implies --supervisor)"
+    )
     parser.add_argument(
         "--reload",
         action="store_true",
@@ -38,9 +76,41 @@ def main():
     )
     parser.add_argument(
         "--workers",
-        type=int,
-        default=1,
-        help="Number of worker processes (default: 1)"
+        type=workers_arg,
+        default=settings.workers,
+        help=f"Number of worker processes, or auto to size from the container CPU quota (default: {settings.workers})"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(SERVER_PROFILES),
+        default=settings.server_profile,
+        help=f"uvicorn server profile (default: {settings.server_profile})"
+    )
+    parser.add_argument(
+        "--supervisor",
+        action="store_true",
+        default=settings.supervisor,
+        help="Run the workers under a supervisor that recycles them past the RSS or request limits"
+    )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        default=settings.preload,
+        help="Load the app once and fork the workers from it to share memory (implies --supervisor)"
+    )
+    parser.add_argument(
+        "--max-worker-rss",
+        type=positive_int,
+        default=settings.worker_max_rss_mb,
+        metavar="MB",
+        help="Recycle a worker when its RSS goes over this many MiB (supervisor only)"
+    )
+    parser.add_argument(
+        "--max-worker-requests",
+        type=positive_int,
+        default=settings.worker_max_requests,
+        metavar="N",
+        help="Recycle a worker after serving about N requests (supervisor only)"
     )
     parser.add_argument(
         "--log-level",
@@ -50,27 +120,103 @@ def main():
     )
     
     args = parser.parse_args()
+    args.supervisor = args.supervisor or args.preload or args.reuse_port
+    if args.supervisor and args.reload:
+        parser.error("--supervisor, --preload and --reuse-port can't be combined with --reload")
+    if args.uds and args.reuse_port:
+        parser.error("--reuse-port only applies to TCP sockets, not to --uds")
     
     try:
         import uvicorn
         
+        profile = resolve_server_profile(args.profile)
+        sizing = resolve_worker_sizing(
+            args.workers,
+            settings.thread_pool_size,
+            settings.limit_concurrency,
+            concurrency_per_cpu=profile.concurrency_per_cpu
+        )
+        
+        # Workers read their per-worker limits from the settings, spawned
+        # worker processes load them from the environment
+        settings.workers = args.workers
+        settings.thread_pool_size = sizing.thread_pool_size
+        settings.limit_concurrency = sizing.limit_concurrency
+        os.environ["WORKERS"] = str(args.workers)
+        if sizing.thread_pool_size is not None:
+            os.environ["THREAD_POOL_SIZE"] = str(sizing.thread_pool_size)
+        if sizing.limit_concurrency is not None:
+            os.environ["LIMIT_CONCURRENCY"] = str(sizing.limit_concurrency)
+        if settings.access_log_enabled is None:
+            settings.access_log_enabled = profile.access_log
+            os.environ["ACCESS_LOG_ENABLED"] = str(profile.access_log).lower()
+        
         print(f"Starting {settings.app_name} v{settings.app_version}")
         print(f"Environment: {settings.environment}")
-        print(f"Server: http://{args.host}:{args.port}")
-        print(f"Docs: http://{args.host}:{args.port}/docs")
-        print(f"Healty: http://{args.host}:{args.port}/healthz")
-        print(f"Metrics: http://{args.host}:{args.port}/metrics")
+        server_url = f"unix:{args.uds}" if args.uds else f"http://{args.host}:{args.port}"
+        print(f"Server: {server_url}")
+        print(f"Docs: {server_url}/docs")
+        print(f"Healty: {server_url}/healthz")
+        print(f"Metrics: {server_url}/metrics")
+        print(
+            f"Workers: {sizing.workers} ({sizing.source}, {sizing.cpu_limit:g} CPUs), "
+            f"threads per worker: {sizing.thread_pool_size or 'anyio default'}, "
+            f"concurrency limit per worker: {sizing.limit_concurrency or 'unlimited'}"
+        )
+        print(
+            f"Profile: {profile.name} (loop {profile.loop}, http {profile.http}, backlog {profile.backlog}, "
+            f"keep-alive {profile.timeout_keep_alive}s, access log {'on' if settings.access_log_enabled else 'off'})"
+        )
+        if args.supervisor:
+            print(
+                f"Supervisor: max worker RSS {args.max_worker_rss or '-'} MiB, "
+                f"max worker requests {args.max_worker_requests or '-'}, "
+                f"preload {'on' if args.preload else 'off'}, "
+                f"reuse port {'on' if args.reuse_port else 'off'}"
+            )
         print("-" * 50)
         
-        uvicorn.run(
+        if args.supervisor:
+            from app.core.supervisor import Supervisor
+            
+            config = uvicorn.Config(
+                "app.main:app",
+                host=args.host,
+                port=args.port,
+                uds=args.uds,
+                limit_concurrency=sizing.limit_concurrency,
+                log_level=args.log_level,
+                timeout_graceful_shutdown=settings.shutdown_drain_timeout,
+                **profile.uvicorn_options()
+            )
+            Supervisor(
+                config,
+                workers=sizing.workers,
+                max_rss=args.max_worker_rss * 1024 * 1024 if args.max_worker_rss else None,
+                max_requests=args.max_worker_requests,
+                check_interval=settings.worker_check_interval,
+                retire_timeout=settings.shutdown_pre_stop_delay + settings.shutdown_drain_timeout + 5,
+                preload=args.preload,
+                reuse_port=args.reuse_port,
+                pre_stop_delay=settings.shutdown_pre_stop_delay
+            ).run()
+            return
+        
+        from app.core.server import run_server
+        
+        config = uvicorn.Config(
             "app.main:app",
             host=args.host,
             port=args.port,
+            uds=args.uds,
             reload=args.reload,
-            workers=args.workers,
+            workers=sizing.workers,
+            limit_concurrency=sizing.limit_concurrency,
             log_level=args.log_level,
-            access_log=True
+            timeout_graceful_shutdown=settings.shutdown_drain_timeout,
+            **profile.uvicorn_options()
         )
+        run_server(config, pre_stop_delay=settings.shutdown_pre_stop_delay)
         
     except KeyboardInterrupt:
         print("\nGracefully shutting down...")
@@ -0,0 +1,57 @@
+"""Testes para o orçamento de inicialização da aplicação."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
+# Import of app.main (which creates the app) in seconds, measured with
+# `python -X importtime`. Slow CI runners can raise it with the env var.
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "1.5"))
+
+
+def run_python(*args):
+    """Executa o Python em um processo novo, sem módulos já importados."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time(stderr, module):
+    """Tempo cumulativo de import de um módulo, em segundos."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+    raise AssertionError(f"{module} not found in the importtime output")
+
+
+class TestStartupBudget:
+    """Testes para o tempo de import e criação da aplicação."""
+
+    def test_import_within_budget(self):
+        """Testa o import e a criação da aplicação dentro do orçamento."""
+        result = run_python("-X", "importtime", "-c", "import app.main")
+        elapsed = import_time(result.stderr, "app.main")
+
+        assert elapsed < STARTUP_BUDGET_SECONDS, (
+            f"import app.main took {elapsed:.3f}s, over the {STARTUP_BUDGET_SECONDS}s budget"
+        )
+
+    @pytest.mark.parametrize("module", ["psutil"])
+    def test_heavy_modules_are_lazy(self, module):
+        """Testa que módulos pesados não são importados na inicialização."""
+        result = run_python("-c", f"import sys, app.main; print({module!r} in sys.modules)")
+
+        assert result.stdout.strip() == "False"
@@ -144,3 +144,173 @@ class TestGreetEndpoint:
             data = response.json()
             assert data["name"] == name  # Preserva o case original
             assert data["message"] == f"Hello, {name}!"
+
+
+class TestGreetBatchEndpoint:
+    """Testes para o endpoint de greeting em lote."""
+
+    @staticmethod
+    def parse_lines(response):
+        """Converte a resposta NDJSON em uma lista de objetos."""
+        import json
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_batch_json_array(self, test_client):
+        """Testa o lote enviado como array JSON."""
+        response = test_client.post("/api/v1/greet/batch", json=["Ana", "Bob"])
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = self.parse_lines(response)
+        assert [line["message"] for line in lines] == ["Hello, Ana!", "Hello, Bob!"]
+
+    def test_batch_ndjson(self, test_client):
+        """Testa o lote enviado como NDJSON."""
+        response = test_client.post(
+            "/api/v1/greet/batch",
+            content=b'"Ana"\n" Bob "\n',
+            headers={"content-type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert [line["name"] for line in self.parse_lines(response)] == ["Ana", "Bob"]
+
+    def test_batch_invalid_names(self, test_client):
+        """Testa que nomes inválidos geram linhas de erro sem interromper o lote."""
+        response = test_client.post("/api/v1/greet/batch", json=["   ", "test@domain", "Ana"])
+
+        lines = self.parse_lines(response)
+        assert lines[0]["error"] == "Invalid name parameter"
+        assert lines[1]["error"] == "Invalid name parameter"
+        assert lines[2]["name"] == "Ana"
+
+    @pytest.mark.parametrize("body,content_type", [
+        (b'["Ana", oops]', "application/json"),
+        (b"", "application/json"),
+        (b"[", "application/json"),
+        (b'{"a":1}', "application/json"),
+        (b"", "application/x-ndjson"),
+    ])
+    def test_batch_malformed_body(self, test_client, body, content_type):
+        """Testa que um corpo malformado como um todo retorna 400."""
+        response = test_client.post("/api/v1/greet/batch", content=body, headers={"content-type": content_type})
+
+        assert response.status_code == 400
+        assert "Invalid batch body" in response.json()["detail"]
+
+    def test_batch_null_item(self, test_client):
+        """Testa que um item null gera uma linha de erro em vez do nome padrão."""
+        response = test_client.post("/api/v1/greet/batch", json=[None, "Ana"])
+
+        lines = self.parse_lines(response)
+        assert lines[0]["error"] == "Invalid name parameter"
+        assert lines[1]["name"] == "Ana"
+
+    def test_batch_invalid_ndjson_line(self, test_client):
+        """Testa que uma linha NDJSON inválida gera um erro na sua posição."""
+        response = test_client.post(
+            "/api/v1/greet/batch",
+            content=b'"Ana"\nnot json\n"Bob"\n',
+            headers={"content-type": "application/x-ndjson"}
+        )
+
+        lines = self.parse_lines(response)
+        assert lines[0]["name"] == "Ana"
+        assert lines[1]["error"] == "Invalid batch body"
+        assert lines[2]["name"] == "Bob"
+
+    def test_batch_body_in_several_messages(self):
+        """Testa um corpo recebido em várias mensagens, como em um servidor real."""
+        import asyncio
+        import json
+        from app.main import create_application
+
+        app = create_application()
+        messages = [
+            {"type": "http.request", "body": b'"Ana"\n"Bob"\n', "more_body": True},
+            {"type": "http.request", "body": b'"Cid"\n', "more_body": True},
+            {"type": "http.request", "body": b"", "more_body": False},
+        ]
+        events = []
+
+        async def receive():
+            if not messages:
+                # Like a server, blocks until the client disconnects
+                await asyncio.Event().wait()
+            await asyncio.sleep(0)
+            message = messages.pop(0)
+            events.append(("receive", message["more_body"]))
+            return message
+
+        async def send(message):
+            events.append((message["type"], message.get("body", b"")))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/api/v1/greet/batch",
+            "raw_path": b"/api/v1/greet/batch",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"content-type", b"application/x-ndjson")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        asyncio.run(app(scope, receive, send))
+
+        body = b"".join(data for kind, data in events if kind == "http.response.body")
+        assert [json.loads(line)["name"] for line in body.splitlines()] == ["Ana", "Bob", "Cid"]
+        # The response only starts after the whole body was read
+        start = events.index(("http.response.start", b""))
+        assert events[start - 1] == ("receive", False)
+
+    @patch('app.core.metrics.metrics.record_greet_requests')
+    def test_batch_metrics_recorded_in_bulk(self, mock_record, test_client):
+        """Testa que as métricas do lote são registradas em bloco."""
+        response = test_client.post("/api/v1/greet/batch", json=["Ana", "Ana", "Bob"])
+
+        assert response.status_code == 200
+        mock_record.assert_called_once_with({"Ana": 2, "Bob": 1})
+
+
+class TestGreetWebSocket:
+    """Testes para o canal WebSocket de greeting."""
+
+    def test_websocket_greetings(self, test_client):
+        """Testa múltiplas saudações na mesma conexão."""
+        with test_client.websocket_connect("/api/v1/greet/ws") as websocket:
+            for name in ["Ana", " Bob "]:
+                websocket.send_text(name)
+                data = websocket.receive_json()
+                assert data["message"] == f"Hello, {name.strip()}!"
+                assert data["timestamp"].endswith("Z")
+
+    def test_websocket_invalid_name(self, test_client):
+        """Testa que nomes inválidos retornam erro sem fechar a conexão."""
+        with test_client.websocket_connect("/api/v1/greet/ws") as websocket:
+            websocket.send_text("test@domain")
+            assert websocket.receive_json()["error"] == "Invalid name parameter"
+
+            websocket.send_text("Ana")
+            assert websocket.receive_json()["name"] == "Ana"
+
+    def test_websocket_binary_message(self, test_client):
+        """Testa que uma mensagem binária fecha a conexão com 1003."""
+        with test_client.websocket_connect("/api/v1/greet/ws") as websocket:
+            websocket.send_bytes(b"Ana")
+            message = websocket.receive()
+
+        assert message["type"] == "websocket.close"
+        assert message["code"] == 1003
+
+    @patch('app.core.metrics.metrics.record_greet_request')
+    def test_websocket_metrics_recorded(self, mock_record, test_client):
+        """Testa se as métricas de greeting são registradas."""
+        with test_client.websocket_connect("/api/v1/greet/ws") as websocket:
+            websocket.send_text("TestUser")
+            websocket.receive_json()
+
+        mock_record.assert_called_once_with("TestUser")
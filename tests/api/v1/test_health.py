@@ -83,3 +83,41 @@ class TestHealthEndpoint:
         # Health check deve ser rápido (< 1 segundo)
         response_time = end_time - start_time
         assert response_time < 1.0
+
+
+class TestReadinessEndpoint:
+    """Testes para o endpoint de readiness."""
+
+    def test_readiness_after_startup(self):
+        """Testa que a aplicação fica pronta após o startup."""
+        from fastapi.testclient import TestClient
+        from app.main import create_application
+
+        with TestClient(create_application()) as client:
+            response = client.get("/api/v1/readyz")
+
+            assert response.status_code == 200
+            assert response.json()["status"] == "ready"
+
+    @patch('app.api.v1.endpoints.health.lifecycle')
+    def test_readiness_while_draining(self, mock_lifecycle, test_client):
+        """Testa que a aplicação retorna 503 durante o drain."""
+        mock_lifecycle.ready = False
+        mock_lifecycle.draining = True
+
+        response = test_client.get("/api/v1/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "draining"
+
+    def test_shutdown_reports_not_ready(self):
+        """Testa que o shutdown do lifespan marca a aplicação como não pronta."""
+        from fastapi.testclient import TestClient
+        from app.main import create_application
+        from app.core.lifecycle import lifecycle
+
+        with TestClient(create_application()):
+            assert lifecycle.ready is True
+
+        assert lifecycle.ready is False
+        assert lifecycle.draining is True
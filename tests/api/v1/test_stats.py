@@ -0,0 +1,22 @@
+"""Testes para o endpoint de estatísticas."""
+
+
+class TestStatsEndpoint:
+    """Testes para o endpoint de estatísticas."""
+
+    def test_stats_per_route(self, test_client):
+        """Testa as estatísticas das rotas requisitadas."""
+        test_client.get("/api/v1/healthz")
+        test_client.get("/api/v1/nao-existe")
+
+        response = test_client.get("/api/v1/stats")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["windows"] == ["1m", "5m", "15m"]
+        assert "/api/v1/nao-existe" not in body["routes"]
+        window = body["routes"]["/api/v1/healthz"]["1m"]
+        assert window["requests"] >= 1
+        assert window["error_ratio"] == 0.0
+        assert window["p50_ms"] > 0
+        assert set(window) == {"requests", "rate", "error_ratio", "p50_ms", "p90_ms", "p99_ms"}
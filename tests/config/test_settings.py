@@ -168,3 +168,12 @@ class TestSettings:
             with patch.dict(os.environ, {"ENVIRONMENT": env}):
                 settings = Settings()
                 assert settings.environment == env
+
+    def test_debug_endpoints_require_token(self):
+        """Testa que os endpoints de debug não podem ser habilitados sem token."""
+        with patch.dict(os.environ, {"DEBUG_ENDPOINTS_ENABLED": "true"}):
+            with pytest.raises(ValueError):
+                Settings()
+
+        with patch.dict(os.environ, {"DEBUG_ENDPOINTS_ENABLED": "true", "DEBUG_TOKEN": "secret"}):
+            assert Settings().debug_endpoints_enabled is True
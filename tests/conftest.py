@@ -8,6 +8,22 @@ from app.main import create_application
 from app.core.metrics import PrometheusMetrics
 
 
+class FakeClock:
+    """Relógio controlado pelos testes, avançado atribuindo `now`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Relógio falso para os componentes que recebem um `clock`."""
+    return FakeClock()
+
+
 @pytest.fixture
 def test_client():
     """Cliente de teste para a aplicação FastAPI."""
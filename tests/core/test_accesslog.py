@@ -0,0 +1,131 @@
+"""Testes para o access log em JSON."""
+
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.accesslog import AccessLogger, access_log
+from app.core.metrics import metrics
+from app.main import create_application
+
+
+@pytest.fixture
+def stream():
+    """Stream em memória para as linhas do log."""
+    return io.BytesIO()
+
+
+def lines(stream):
+    """Registros escritos no stream."""
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestAccessLogger:
+    """Testes para a classe AccessLogger."""
+
+    def test_not_running(self, stream):
+        """Testa que nada é enfileirado com o logger parado."""
+        logger = AccessLogger(stream=stream)
+        logger.log("GET", "/", 200, 0.001, "127.0.0.1")
+
+        assert logger.flush() == 0
+
+    def test_batched_json_lines(self, stream):
+        """Testa a escrita dos registros em lote como linhas JSON."""
+        logger = AccessLogger(stream=stream, flush_interval=60)
+        logger.start()
+        try:
+            logger.log("GET", "/api/v1/greet", 200, 0.0015, "10.0.0.1")
+            logger.log("POST", "/api/v1/greet/batch", 422, 0.002, "10.0.0.2")
+        finally:
+            logger.stop()
+
+        records = lines(stream)
+        assert [record["path"] for record in records] == ["/api/v1/greet", "/api/v1/greet/batch"]
+        assert records[0]["status"] == 200
+        assert records[0]["duration_ms"] == 1.5
+        assert records[0]["client"] == "10.0.0.1"
+        assert records[0]["timestamp"].endswith("Z")
+
+    def test_per_route_sampling(self, stream):
+        """Testa a amostragem por rota."""
+        logger = AccessLogger(sample_rates={"/api/v1/healthz": 0.0}, stream=stream, flush_interval=60)
+        logger.start()
+        try:
+            for _ in range(10):
+                logger.log("GET", "/api/v1/healthz", 200, 0.001, "")
+            logger.log("GET", "/api/v1/greet", 200, 0.001, "")
+        finally:
+            logger.stop()
+
+        assert [record["path"] for record in lines(stream)] == ["/api/v1/greet"]
+
+    def test_sample_rate(self, stream):
+        """Testa a taxa de amostragem registrada no log."""
+        logger = AccessLogger(default_rate=0.5, stream=stream, flush_interval=60)
+        logger.start()
+        try:
+            with patch('app.core.accesslog.random.random', side_effect=[0.1, 0.9]):
+                logger.log("GET", "/", 200, 0.001, "")
+                logger.log("GET", "/", 200, 0.001, "")
+        finally:
+            logger.stop()
+
+        records = lines(stream)
+        assert len(records) == 1
+        assert records[0]["sample_rate"] == 0.5
+
+    def test_full_queue_drops(self, stream):
+        """Testa o descarte de registros com a fila cheia."""
+        logger = AccessLogger(max_queue=2, stream=stream, flush_interval=60)
+        before = metrics.access_log_dropped_total._value.get()
+        logger.start()
+        try:
+            for _ in range(5):
+                logger.log("GET", "/", 200, 0.001, "")
+            assert metrics.access_log_dropped_total._value.get() == before + 3
+        finally:
+            logger.stop()
+
+        assert len(lines(stream)) == 2
+
+    def test_queue_depth(self, stream):
+        """Testa a profundidade da fila registrada no flush."""
+        logger = AccessLogger(stream=stream, flush_interval=60)
+        logger.start()
+        try:
+            logger.log("GET", "/", 200, 0.001, "")
+            logger.log("GET", "/", 200, 0.001, "")
+            assert logger.flush() == 2
+            assert metrics.access_log_queue_depth._value.get() == 2
+        finally:
+            logger.stop()
+
+
+class TestAccessLogMiddleware:
+    """Testes para o registro das requisições da aplicação."""
+
+    def test_requests_are_logged(self, stream):
+        """Testa o registro das requisições quando o lifespan inicia o logger."""
+        with patch.object(access_log, 'stream', stream), \
+                patch.object(access_log, 'flush_interval', 60), \
+                patch.object(access_log, 'sample_rates', {}):
+            with TestClient(create_application()) as client:
+                client.get("/api/v1/greet?name=Ana")
+            assert not access_log.running
+
+        records = lines(stream)
+        assert [record["path"] for record in records] == ["/api/v1/greet"]
+        assert records[0]["method"] == "GET"
+
+    def test_disabled(self):
+        """Testa a desativação do access log."""
+        with patch('app.main.settings.access_log_enabled', False), \
+                patch.object(access_log, 'start') as mock_start:
+            with TestClient(create_application()):
+                pass
+
+        mock_start.assert_not_called()
@@ -0,0 +1,157 @@
+"""Testes para o cache de respostas HTTP."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.cache import ResponseCache, ResponseCacheMiddleware, make_etag
+
+
+class TestResponseCache:
+    """Testes para a classe ResponseCache."""
+
+    def test_put_and_get(self, clock):
+        """Testa armazenar e recuperar uma entrada."""
+        cache = ResponseCache(max_bytes=1000, clock=clock)
+        cache.put("/", 200, [], b"body", b'"etag"', ttl=10)
+
+        entry, expired = cache.get("/")
+        assert entry.body == b"body"
+        assert expired is False
+
+    def test_ttl_expiration(self, clock):
+        """Testa a expiração de uma entrada."""
+        cache = ResponseCache(max_bytes=1000, clock=clock)
+        cache.put("/", 200, [], b"body", b'"etag"', ttl=10)
+        clock.now = 11
+
+        entry, expired = cache.get("/")
+        assert entry is None
+        assert expired is True
+        assert cache.size == 0
+
+    def test_lru_eviction_by_size(self, clock):
+        """Testa a remoção das entradas menos usadas ao atingir o limite de bytes."""
+        cache = ResponseCache(max_bytes=10, clock=clock)
+        cache.put("a", 200, [], b"aaaa", b"", ttl=10)
+        cache.put("b", 200, [], b"bbbb", b"", ttl=10)
+        cache.get("a")
+
+        evicted = cache.put("c", 200, [], b"cccc", b"", ttl=10)
+
+        assert evicted == 1
+        assert cache.get("b")[0] is None
+        assert cache.get("a")[0] is not None
+        assert cache.size <= 10
+
+    def test_entry_larger_than_cache(self, clock):
+        """Testa que entradas maiores que o cache não são armazenadas."""
+        cache = ResponseCache(max_bytes=2, clock=clock)
+        cache.put("a", 200, [], b"aaaa", b"", ttl=10)
+
+        assert len(cache) == 0
+
+
+class TestResponseCacheMiddleware:
+    """Testes para o middleware de cache de respostas."""
+
+    @pytest.fixture
+    def calls(self):
+        """Contador de chamadas do endpoint."""
+        return []
+
+    @pytest.fixture
+    def client(self, calls):
+        """Aplicação mínima com o middleware de cache."""
+        app = FastAPI()
+
+        @app.get("/cached")
+        async def cached(name: str = "x"):
+            calls.append(name)
+            return {"name": name}
+
+        @app.get("/other")
+        async def other():
+            calls.append("other")
+            return {"ok": True}
+
+        app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache(max_bytes=10000), routes={"/cached": 60})
+        return TestClient(app)
+
+    def test_cache_hit(self, client, calls):
+        """Testa que a segunda requisição é servida do cache."""
+        first = client.get("/cached?name=a")
+        second = client.get("/cached?name=a")
+
+        assert first.json() == second.json() == {"name": "a"}
+        assert calls == ["a"]
+        assert second.headers["etag"] == make_etag(first.content).decode()
+
+    def test_normalized_query(self, client, calls):
+        """Testa que a ordem dos parâmetros não altera a chave."""
+        client.get("/cached?name=a&z=1")
+        client.get("/cached?z=1&name=a")
+
+        assert calls == ["a"]
+
+    def test_different_query_is_a_miss(self, client, calls):
+        """Testa que consultas diferentes não compartilham entrada."""
+        client.get("/cached?name=a")
+        client.get("/cached?name=b")
+
+        assert calls == ["a", "b"]
+
+    def test_route_not_enabled(self, client, calls):
+        """Testa que rotas não configuradas não são cacheadas."""
+        client.get("/other")
+        client.get("/other")
+
+        assert calls == ["other", "other"]
+
+    def test_conditional_request(self, client):
+        """Testa o retorno 304 quando o ETag confere."""
+        etag = client.get("/cached").headers["etag"]
+
+        response = client.get("/cached", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_conditional_request_on_miss(self, client):
+        """Testa o retorno 304 mesmo quando a resposta ainda não estava no cache."""
+        etag = make_etag(b'{"name":"x"}').decode()
+
+        response = client.get("/cached", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+        assert response.status_code == 304
+
+    def test_no_cache_request(self, client, calls):
+        """Testa que Cache-Control: no-cache ignora o cache."""
+        client.get("/cached")
+        client.get("/cached", headers={"Cache-Control": "no-cache"})
+
+        assert calls == ["x", "x"]
+
+    @patch('app.core.cache.metrics')
+    def test_metrics_recorded(self, mock_metrics, client):
+        """Testa o registro de hits e misses."""
+        client.get("/cached")
+        client.get("/cached")
+
+        mock_metrics.record_cache_miss.assert_called_once_with("/cached")
+        mock_metrics.record_cache_hit.assert_called_once_with("/cached")
+
+
+class TestRootEndpointCache:
+    """Testes para o cache do endpoint raiz da aplicação."""
+
+    def test_root_is_cached_with_etag(self, test_client):
+        """Testa que o endpoint raiz retorna ETag e suporta 304."""
+        response = test_client.get("/")
+        assert response.status_code == 200
+        assert "etag" in response.headers
+
+        cached = test_client.get("/", headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304
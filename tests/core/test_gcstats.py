@@ -0,0 +1,124 @@
+"""Testes para as métricas e o ajuste do coletor de lixo."""
+
+import gc
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.gcstats import GCStats, apply_gc_settings, freeze, gc_stats
+from app.core.metrics import PrometheusMetrics
+from app.main import create_application
+
+
+def samples(stats, name):
+    """Amostras de uma família de métricas indexadas por nome e labels."""
+    for family in stats.collect():
+        if family.name == name:
+            return {(sample.name, tuple(sorted(sample.labels.items()))): sample.value for sample in family.samples}
+    raise AssertionError(f"{name} not collected")
+
+
+class TestGCStats:
+    """Testes para a classe GCStats."""
+
+    def test_records_collections(self):
+        """Testa o registro de pausas e objetos por geração."""
+        stats = GCStats()
+        with patch('app.core.gcstats.time.perf_counter', side_effect=[10.0, 10.003]):
+            stats._callback("start", {"generation": 2})
+            stats._callback("stop", {"generation": 2, "collected": 5, "uncollectable": 1})
+
+        pauses = samples(stats, "python_gc_pause_seconds")
+        label = (("generation", "2"),)
+        assert pauses[("python_gc_pause_seconds_count", label)] == 1
+        assert pauses[("python_gc_pause_seconds_sum", label)] == pytest.approx(0.003)
+        assert pauses[("python_gc_pause_seconds_bucket", (("generation", "2"), ("le", "0.0025")))] == 0
+        assert pauses[("python_gc_pause_seconds_bucket", (("generation", "2"), ("le", "0.005")))] == 1
+        assert pauses[("python_gc_pause_seconds_bucket", (("generation", "2"), ("le", "+Inf")))] == 1
+        assert samples(stats, "python_gc_objects_collected")[("python_gc_objects_collected_total", label)] == 5
+        assert samples(stats, "python_gc_objects_uncollectable")[("python_gc_objects_uncollectable_total", label)] == 1
+        assert samples(stats, "python_gc_collections")[("python_gc_collections_total", (("generation", "0"),))] == 0
+
+    def test_ignores_stop_without_start(self):
+        """Testa a instalação no meio de uma coleta."""
+        stats = GCStats()
+        stats._callback("stop", {"generation": 0, "collected": 1, "uncollectable": 0})
+
+        assert stats.collections == [0, 0, 0]
+
+    def test_install_records_real_collections(self):
+        """Testa o hook instalado em gc.callbacks."""
+        stats = GCStats()
+        stats.install()
+        stats.install()
+        try:
+            assert gc.callbacks.count(stats._callback) == 1
+            gc.collect()
+        finally:
+            stats.uninstall()
+
+        assert stats._callback not in gc.callbacks
+        assert stats.collections[2] >= 1
+        assert stats.pause_sum[2] > 0
+
+    def test_threshold_and_frozen_gauges(self):
+        """Testa os limites e os objetos congelados expostos."""
+        threshold = samples(GCStats(), "python_gc_threshold")
+
+        assert threshold[("python_gc_threshold", (("generation", "0"),))] == gc.get_threshold()[0]
+        assert samples(GCStats(), "python_gc_frozen_objects")[("python_gc_frozen_objects", ())] == gc.get_freeze_count()
+
+    def test_exposed_by_metrics(self):
+        """Testa a exposição no registro da aplicação."""
+        output = PrometheusMetrics().get_metrics()
+
+        assert 'python_gc_pause_seconds_bucket{generation="2",le="+Inf"}' in output
+        assert 'python_gc_objects_uncollectable_total{generation="0"}' in output
+
+
+class TestGCTuning:
+    """Testes para o ajuste do coletor de lixo."""
+
+    @pytest.fixture(autouse=True)
+    def restore_gc(self):
+        """Restaura os limites após cada teste."""
+        threshold = gc.get_threshold()
+        yield
+        gc.set_threshold(*threshold)
+
+    def test_apply_threshold(self):
+        """Testa a definição dos limites."""
+        apply_gc_settings([5000, 20])
+
+        assert gc.get_threshold()[:2] == (5000, 20)
+
+    def test_apply_default(self):
+        """Testa que sem configuração os limites não mudam."""
+        threshold = gc.get_threshold()
+        apply_gc_settings(None)
+
+        assert gc.get_threshold() == threshold
+
+    def test_freeze(self):
+        """Testa o congelamento dos objetos vivos."""
+        try:
+            assert freeze() > 0
+            assert gc.get_freeze_count() > 0
+        finally:
+            # Os testes seguintes não podem rodar com o heap congelado
+            gc.unfreeze()
+
+    def test_lifespan(self):
+        """Testa o ajuste e o congelamento durante a inicialização."""
+        try:
+            with patch('app.main.settings.gc_threshold', [4000, 15, 15]), \
+                 patch('app.main.settings.gc_freeze_after_warmup', True):
+                with TestClient(create_application()):
+                    assert gc.get_threshold() == (4000, 15, 15)
+                    assert gc.get_freeze_count() > 0
+                    assert gc_stats.installed is True
+        finally:
+            gc.unfreeze()
+
+        assert gc_stats.installed is False
@@ -0,0 +1,128 @@
+"""Testes para o histograma de latência com buckets por rota."""
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from unittest.mock import patch
+
+from app.config.settings import BucketSeries, Settings
+from app.core.histograms import (
+    DEFAULT_BUCKETS,
+    RouteHistogram,
+    exponential_buckets,
+    linear_buckets,
+    resolve_buckets,
+)
+from app.core.metrics import PrometheusMetrics
+from app.main import create_application
+
+
+class TestBucketLayouts:
+    """Testes para a geração e validação dos limites dos buckets."""
+
+    def test_exponential(self):
+        """Testa a série exponencial."""
+        assert exponential_buckets(0.0001, 2.5, 4) == [0.0001, 0.00025, 0.000625, 0.0015625]
+
+    def test_linear(self):
+        """Testa a série linear."""
+        assert linear_buckets(0.1, 0.1, 3) == [0.1, 0.2, 0.3]
+
+    def test_resolve(self):
+        """Testa as formas aceitas de configuração."""
+        assert resolve_buckets(None) == DEFAULT_BUCKETS
+        assert resolve_buckets([0.1, 0.5, float("inf")]) == (0.1, 0.5)
+        assert resolve_buckets(BucketSeries(type="linear", start=1, width=1, count=2)) == (1.0, 2.0)
+
+    @pytest.mark.parametrize("bounds", [[], [0.5, 0.1], [0.1, 0.1]])
+    def test_invalid_bounds(self, bounds):
+        """Testa limites vazios ou fora de ordem."""
+        with pytest.raises(ValueError):
+            resolve_buckets(bounds)
+
+    def test_series_needs_step(self):
+        """Testa séries sem o passo correspondente."""
+        with pytest.raises(ValidationError):
+            BucketSeries(type="exponential", start=0.001, width=1, count=5)
+        with pytest.raises(ValidationError):
+            BucketSeries(type="linear", start=0.001, factor=2, count=5)
+
+    def test_settings_from_env(self, monkeypatch):
+        """Testa a configuração por variáveis de ambiente."""
+        monkeypatch.setenv("HTTP_DURATION_BUCKETS", '{"type": "exponential", "start": 0.001, "factor": 2, "count": 5}')
+        monkeypatch.setenv("HTTP_DURATION_ROUTE_BUCKETS", '{"/api/v1/greet": [0.001, 0.01]}')
+
+        settings = Settings()
+
+        assert settings.http_duration_buckets.factor == 2
+        assert settings.http_duration_route_buckets == {"/api/v1/greet": [0.001, 0.01]}
+
+
+class TestRouteHistogram:
+    """Testes para a classe RouteHistogram."""
+
+    @pytest.fixture
+    def histogram(self):
+        """Histograma com um layout específico para /healthz."""
+        return RouteHistogram(
+            'duration_seconds',
+            'Duration',
+            ['method', 'endpoint'],
+            buckets=[0.1, 1.0],
+            route_buckets={"/healthz": [0.001, 0.01, 0.1]},
+        )
+
+    def buckets(self, histogram, endpoint):
+        """Contagens cumulativas dos buckets de um endpoint."""
+        family = list(histogram.collect())[0]
+        return {
+            sample.labels["le"]: sample.value
+            for sample in family.samples
+            if sample.name.endswith("_bucket") and sample.labels["endpoint"] == endpoint
+        }
+
+    def test_layout_per_route(self, histogram):
+        """Testa o layout escolhido pela rota."""
+        histogram.observe(("GET", "/healthz"), "/healthz", 0.0005)
+        histogram.observe(("GET", "/healthz"), "/healthz", 0.01)
+        histogram.observe(("GET", "/greet"), "/greet", 0.5)
+        histogram.observe(("GET", "/missing"), None, 5)
+
+        assert self.buckets(histogram, "/healthz") == {"0.001": 1, "0.01": 2, "0.1": 2, "+Inf": 2}
+        assert self.buckets(histogram, "/greet") == {"0.1": 0, "1.0": 1, "+Inf": 1}
+        assert self.buckets(histogram, "/missing") == {"0.1": 0, "1.0": 0, "+Inf": 1}
+
+    def test_series_report(self, histogram):
+        """Testa a contagem de séries por rota."""
+        assert histogram.series_report([("/healthz", 1), ("/greet", 2)]) == {"/healthz": 6, "/greet": 10}
+
+    def test_exemplar(self, histogram):
+        """Testa o exemplar no bucket do valor observado."""
+        histogram.observe(("GET", "/greet"), "/greet", 0.5, {"trace_id": "abc"})
+
+        family = list(histogram.collect())[0]
+        exemplars = {sample.labels["le"]: sample.exemplar for sample in family.samples if sample.exemplar}
+
+        assert list(exemplars) == ["1.0"]
+        assert exemplars["1.0"].labels == {"trace_id": "abc"}
+
+    def test_exposition(self):
+        """Testa a exposição pelas métricas da aplicação."""
+        metrics = PrometheusMetrics(route_duration_buckets={"/api/v1/healthz": [0.0005, 0.001]})
+        metrics.record_request("GET", "/api/v1/healthz", 200, 0.0007, route="/api/v1/healthz")
+
+        output = metrics.get_metrics()
+
+        assert 'http_request_duration_seconds_bucket{endpoint="/api/v1/healthz",le="0.001",method="GET"} 1.0' in output
+        assert 'http_request_duration_seconds_count{endpoint="/api/v1/healthz",method="GET"} 1.0' in output
+        assert metrics.label_children()["http_request_duration_seconds"] == 1
+
+    def test_startup_report(self, capsys):
+        """Testa o relatório de séries na inicialização."""
+        with patch('app.main.settings.warmup_paths', []):
+            with TestClient(create_application()):
+                pass
+
+        report = next(line for line in capsys.readouterr().out.splitlines() if line.startswith("Latency histogram series"))
+        assert "/api/v1/healthz 11" in report
+        assert "/api/v1/greet 17" in report
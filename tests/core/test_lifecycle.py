@@ -0,0 +1,38 @@
+"""Testes para o estado de ciclo de vida da aplicação."""
+
+import pytest
+
+from app.core.lifecycle import LifecycleState
+
+
+class TestLifecycleState:
+    """Testes para a classe LifecycleState."""
+
+    @pytest.fixture
+    def state(self):
+        """Instância limpa do estado de ciclo de vida."""
+        return LifecycleState()
+
+    def test_initial_state(self, state):
+        """Testa o estado inicial (não pronto, sem requests)."""
+        assert state.ready is False
+        assert state.draining is False
+        assert state.in_flight == 0
+
+    def test_request_tracking(self, state):
+        """Testa a contagem de requests em andamento."""
+        state.request_started()
+        state.request_started()
+        assert state.in_flight == 2
+
+        state.request_finished()
+        assert state.in_flight == 1
+
+    def test_mark_ready_and_drain(self, state):
+        """Testa a transição de pronto para drenando."""
+        state.mark_ready()
+        assert state.ready is True
+
+        state.begin_drain()
+        assert state.ready is False
+        assert state.draining is True
@@ -0,0 +1,144 @@
+"""Testes para os snapshots de memória com tracemalloc."""
+
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.memory import MemoryTracer, MemoryTracingError, SnapshotNotFoundError, memory_tracer
+from app.core.metrics import PrometheusMetrics
+from app.main import create_application
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    """Garante que o tracemalloc não continue ligado após cada teste."""
+    yield
+    memory_tracer.stop()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+class TestMemoryTracer:
+    """Testes para a classe MemoryTracer."""
+
+    def test_off_by_default(self):
+        """Testa que o tracemalloc só liga sob demanda."""
+        tracer = MemoryTracer()
+
+        assert tracer.tracing is False
+        with pytest.raises(MemoryTracingError):
+            tracer.take_snapshot("base")
+        with pytest.raises(MemoryTracingError):
+            tracer.top()
+
+    def test_start_and_stop(self):
+        """Testa ligar e desligar o rastreamento."""
+        tracer = MemoryTracer()
+
+        assert tracer.start() is True
+        assert tracer.start() is False
+        tracer.take_snapshot("base")
+        assert tracer.stop() is True
+
+        assert tracer.tracing is False
+        assert tracer.snapshots() == []
+        assert tracer.stop() is False
+
+    def test_top_and_diff(self):
+        """Testa os maiores pontos de alocação e a diferença entre snapshots."""
+        tracer = MemoryTracer()
+        tracer.start()
+        tracer.take_snapshot("base")
+        retained = [bytearray(1024) for _ in range(200)]
+        tracer.take_snapshot("after")
+
+        diff = tracer.diff("base", "after", limit=5)
+        top = tracer.top("after", limit=5)
+        del retained
+
+        assert diff["size_diff_bytes"] >= 200 * 1024
+        assert diff["stats"][0]["file"] == __file__
+        assert diff["stats"][0]["count_diff"] >= 200
+        assert {"file", "line", "size_bytes", "count"} <= set(top["stats"][0])
+
+    def test_group_by_filename(self):
+        """Testa o agrupamento por arquivo."""
+        tracer = MemoryTracer()
+        tracer.start()
+
+        stats = tracer.top(group_by="filename")["stats"]
+
+        assert "line" not in stats[0]
+        assert len({item["file"] for item in stats}) == len(stats)
+
+    def test_max_snapshots(self):
+        """Testa o descarte do snapshot mais antigo."""
+        tracer = MemoryTracer(max_snapshots=2)
+        tracer.start()
+        for name in ("a", "b", "c"):
+            tracer.take_snapshot(name)
+
+        assert tracer.snapshots() == ["b", "c"]
+        with pytest.raises(SnapshotNotFoundError):
+            tracer.diff("a")
+
+
+class TestLabelChildren:
+    """Testes para a contagem de filhos das métricas com labels."""
+
+    def test_counts_children(self):
+        """Testa a contagem por métrica."""
+        metrics = PrometheusMetrics()
+        for name in ("Ana", "Bia", "Ana"):
+            metrics.record_greet_request(name)
+
+        children = metrics.label_children()
+
+        assert children["greet_requests"] == 2
+        assert children["http_requests"] == 0
+        assert "health_checks" not in children
+
+
+class TestMemoryEndpoints:
+    """Testes para os endpoints /debug/memory."""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de teste com os endpoints de debug habilitados."""
+        with patch('app.api.v1.endpoints.debug.settings.debug_endpoints_enabled', True), \
+             patch('app.api.v1.endpoints.debug.settings.debug_token', "secret"):
+            yield TestClient(create_application(), headers={"Authorization": "Bearer secret"})
+
+    def test_status(self, client):
+        """Testa o estado com o rastreamento desligado."""
+        body = client.get("/api/v1/debug/memory").json()
+
+        assert body["tracing"] is False
+        assert "greet_requests" in body["metric_children"]
+
+    def test_snapshot_requires_tracing(self, client):
+        """Testa o snapshot com o rastreamento desligado."""
+        assert client.post("/api/v1/debug/memory/snapshots/base").status_code == 409
+
+    def test_snapshot_and_diff(self, client):
+        """Testa o fluxo de iniciar, capturar, comparar e parar."""
+        assert client.post("/api/v1/debug/memory/start?frames=2").json()["frames"] == 2
+
+        response = client.post("/api/v1/debug/memory/snapshots/base?limit=3")
+        assert response.status_code == 200
+        assert len(response.json()["stats"]) <= 3
+
+        diff = client.get("/api/v1/debug/memory/diff?base=base&limit=5").json()
+        assert diff["base"] == "base"
+        assert "size_diff_bytes" in diff["stats"][0]
+
+        assert client.get("/api/v1/debug/memory/top?snapshot=base").status_code == 200
+        assert client.get("/api/v1/debug/memory/diff?base=missing").status_code == 404
+        assert client.post("/api/v1/debug/memory/stop").json() == {"stopped": True}
+        assert tracemalloc.is_tracing() is False
+
+    def test_invalid_snapshot_name(self, client):
+        """Testa um nome de snapshot inválido."""
+        assert client.post("/api/v1/debug/memory/snapshots/a%20b").status_code == 422
@@ -34,6 +34,26 @@ class TestPrometheusMetrics:
         # Nota: Como Info é um tipo especial, verificamos apenas se não há erro
         assert True  # Se chegou até aqui, a função funcionou
 
+    def test_platform_info_on_first_scrape(self, metrics_instance):
+        """Testa que os detalhes da plataforma são adicionados na primeira coleta."""
+        metrics_instance.set_app_info(app_name="Test App", version="1.0.0", environment="test")
+        assert 'platform' not in metrics_instance._app_info
+
+        output = metrics_instance.get_metrics()
+        assert f'python_version="{platform.python_version()}"' in output
+        assert 'name="Test App"' in output
+
+    @patch('psutil.Process')
+    def test_startup_recorded_on_first_health_check(self, mock_process_class, metrics_instance):
+        """Testa o registro do tempo de inicialização no primeiro health check."""
+        mock_process_class.return_value.create_time.return_value = 0.0
+
+        metrics_instance.record_health_check()
+        metrics_instance.record_health_check()
+
+        assert mock_process_class.call_count == 1
+        assert metrics_instance.startup_seconds._value.get() > 0
+
     def test_record_request(self, metrics_instance):
         """Testa o registro de métricas de request."""
         metrics_instance.record_request(
@@ -74,8 +94,8 @@ class TestPrometheusMetrics:
         assert isinstance(metrics_data, str)
         assert len(metrics_data) > 0
 
-    @patch('app.core.metrics.psutil.cpu_percent')
-    @patch('app.core.metrics.psutil.virtual_memory')
+    @patch('psutil.cpu_percent')
+    @patch('psutil.virtual_memory')
     def test_update_system_metrics(self, mock_memory, mock_cpu, metrics_instance):
         """Testa a atualização de métricas do sistema."""
         # Configurar mocks
@@ -87,7 +107,7 @@ class TestPrometheusMetrics:
         
         assert True
 
-    @patch('app.core.metrics.psutil.Process')
+    @patch('psutil.Process')
     def test_update_process_metrics(self, mock_process_class, metrics_instance):
         """Testa a atualização de métricas do processo."""
         # Configurar mock
@@ -117,7 +137,7 @@ class TestPrometheusMetrics:
         
         assert True
 
-    @patch('app.core.metrics.psutil.cpu_percent', side_effect=Exception("Test error"))
+    @patch('psutil.cpu_percent', side_effect=Exception("Test error"))
     def test_system_metrics_error_handling(self, mock_cpu, metrics_instance):
         """Testa o tratamento de erros nas métricas do sistema."""
         # Não deve lançar erro mesmo se psutil falhar
@@ -125,7 +145,7 @@ class TestPrometheusMetrics:
         
         assert True
 
-    @patch('app.core.metrics.psutil.Process', side_effect=Exception("Test error"))
+    @patch('psutil.Process', side_effect=Exception("Test error"))
     def test_process_metrics_error_handling(self, mock_process, metrics_instance):
         """Testa o tratamento de erros nas métricas do processo."""
         # Não deve lançar erro mesmo se psutil falhar
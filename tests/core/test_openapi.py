@@ -0,0 +1,138 @@
+"""Testes para o schema OpenAPI pré-codificado."""
+
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.openapi import OpenAPIDocument, _accepts_gzip, write_openapi
+from app.main import create_application
+
+
+class TestAcceptsGzip:
+    """Testes para a negociação de Accept-Encoding."""
+
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.8", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        """Testa a aceitação de gzip pelo cliente."""
+        assert _accepts_gzip(header) is expected
+
+
+class TestOpenAPIDocument:
+    """Testes para a classe OpenAPIDocument."""
+
+    def test_build_from_app(self):
+        """Testa a codificação do schema da aplicação."""
+        app = create_application()
+        document = OpenAPIDocument()
+        document.build(app)
+
+        schema = json.loads(document.body)
+        assert "/api/v1/healthz" in schema["paths"]
+        assert gzip.decompress(document.gzip_body) == document.body
+        assert len(document.gzip_body) < len(document.body)
+        assert app.openapi_schema is None
+
+    def test_build_from_prebuilt_file(self, tmp_path):
+        """Testa o carregamento do schema gerado no build da imagem."""
+        path = tmp_path / "openapi.json"
+        with patch('app.main.app', create_application()):
+            write_openapi(str(path))
+
+        document = OpenAPIDocument(str(path))
+        app = create_application()
+        app.openapi = lambda: pytest.fail("schema should not be generated")
+        document.build(app)
+
+        assert document.body == path.read_bytes()
+
+    def test_missing_prebuilt_file(self, tmp_path):
+        """Testa a geração do schema quando o arquivo não existe."""
+        document = OpenAPIDocument(str(tmp_path / "missing.json"))
+        document.build(create_application())
+
+        assert "paths" in json.loads(document.body)
+
+
+class TestOpenAPIEndpoint:
+    """Testes para o endpoint do schema."""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de teste para a aplicação."""
+        return TestClient(create_application())
+
+    def test_gzip_response(self, client):
+        """Testa o schema comprimido com ETag."""
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"]
+        assert response.json()["info"]["title"] == "FastAPI Healthy"
+
+    def test_identity_response(self, client):
+        """Testa o schema sem compressão."""
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert "openapi" in response.json()
+
+    def test_not_modified(self, client):
+        """Testa a resposta 304 para um ETag conhecido."""
+        etag = client.get("/openapi.json").headers["etag"]
+
+        response = client.get("/openapi.json", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_per_encoding(self, client):
+        """Testa que cada codificação tem seu próprio ETag."""
+        gzip_etag = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        identity = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+
+        assert identity.headers["etag"] != gzip_etag
+        assert gzip_etag == identity.headers["etag"][:-1] + '-gzip"'
+
+        response = client.get("/openapi.json", headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+        response = client.get(
+            "/openapi.json",
+            headers={"Accept-Encoding": "identity", "If-None-Match": identity.headers["etag"]}
+        )
+        assert response.status_code == 304
+
+    def test_docs_pages(self, client):
+        """Testa as páginas de documentação apontando para o schema."""
+        for path in ("/docs", "/redoc"):
+            response = client.get(path)
+            assert response.status_code == 200
+            assert "/openapi.json" in response.text
+
+    def test_docs_disabled(self):
+        """Testa a desativação das páginas de documentação."""
+        with patch('app.main.settings.docs_enabled', False):
+            app = create_application()
+        client = TestClient(app)
+
+        assert app.docs_url is None
+        assert client.get("/docs").status_code == 404
+        assert client.get("/redoc").status_code == 404
+        assert client.get("/openapi.json").status_code == 200
+        assert client.get("/").json()["docs_url"] == ""
@@ -0,0 +1,146 @@
+"""Testes para o profiler de CPU por amostragem."""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.profiler import Profile, ProfilerBusyError, SamplingProfiler, profiler
+from app.main import create_application
+
+
+def busy_loop(stop):
+    """Função que ocupa a CPU até ser interrompida."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestProfile:
+    """Testes para os formatos de saída do perfil."""
+
+    @pytest.fixture
+    def profile(self):
+        """Perfil com duas pilhas da mesma thread."""
+        profile = Profile(interval=0.01)
+        profile.duration = 0.05
+        main = ("main", "/srv/app.py", 1)
+        work = ("work", "/srv/app.py", 10)
+        for _ in range(3):
+            profile.add("MainThread", (main, work))
+        profile.add("MainThread", (main,))
+        return profile
+
+    def test_collapsed(self, profile):
+        """Testa o formato collapsed, com a pilha mais frequente primeiro."""
+        lines = profile.collapsed().splitlines()
+
+        assert lines == [
+            "MainThread;main (/srv/app.py:1);work (/srv/app.py:10) 3",
+            "MainThread;main (/srv/app.py:1) 1",
+        ]
+
+    def test_speedscope(self, profile):
+        """Testa o formato speedscope com os frames compartilhados."""
+        document = profile.speedscope("test")
+
+        assert [frame["name"] for frame in document["shared"]["frames"]] == ["main", "work"]
+        thread = document["profiles"][0]
+        assert thread["name"] == "MainThread"
+        assert thread["type"] == "sampled"
+        assert thread["samples"] == [[0, 1], [0]]
+        assert thread["weights"] == [0.03, 0.01]
+        assert thread["endValue"] == 0.05
+
+    def test_empty(self):
+        """Testa um perfil sem amostras."""
+        assert Profile(interval=0.01).collapsed() == ""
+
+
+class TestSamplingProfiler:
+    """Testes para a classe SamplingProfiler."""
+
+    def test_samples_busy_thread(self):
+        """Testa a amostragem de uma thread ocupada."""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+        worker.start()
+        try:
+            profile = SamplingProfiler().start(0.2, 0.005).result(timeout=5)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile.samples > 1
+        assert any(name == "busy" and stack[-1][0] in ("busy_loop", "is_set")
+                   for name, stack in profile.stacks)
+        assert not any(name == "profiler" for name, _ in profile.stacks)
+
+    def test_one_profile_at_a_time(self):
+        """Testa que só um perfil roda por vez no processo."""
+        local = SamplingProfiler()
+        future = local.start(0.2, 0.01)
+
+        assert local.running is True
+        with pytest.raises(ProfilerBusyError):
+            local.start(0.2, 0.01)
+
+        future.result(timeout=5)
+        assert local.running is False
+        local.start(0.01, 0.01).result(timeout=5)
+
+    def test_idle_has_no_thread(self):
+        """Testa que nenhuma thread de amostragem existe fora de um perfil."""
+        SamplingProfiler().start(0.01, 0.01).result(timeout=5)
+
+        assert not any(thread.name == "profiler" and thread.is_alive() for thread in threading.enumerate()
+                       if thread is not threading.current_thread())
+
+
+class TestProfileEndpoint:
+    """Testes para o endpoint /debug/profile."""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de teste com os endpoints de debug habilitados."""
+        with patch('app.api.v1.endpoints.debug.settings.debug_endpoints_enabled', True), \
+             patch('app.api.v1.endpoints.debug.settings.debug_token', "secret"):
+            yield TestClient(create_application(), headers={"Authorization": "Bearer secret"})
+
+    def test_collapsed(self, client):
+        """Testa o perfil no formato collapsed."""
+        response = client.get("/api/v1/debug/profile?seconds=0.1&interval=0.01")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        assert "x-worker-pid" in response.headers
+        assert "MainThread;" in response.text
+
+    def test_speedscope(self, client):
+        """Testa o perfil no formato speedscope."""
+        response = client.get("/api/v1/debug/profile?seconds=0.1&format=speedscope")
+
+        assert response.status_code == 200
+        document = response.json()
+        assert document["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+        assert document["profiles"]
+
+    def test_busy(self, client):
+        """Testa a recusa de um segundo perfil simultâneo."""
+        future = profiler.start(0.3, 0.01)
+        try:
+            response = client.get("/api/v1/debug/profile?seconds=0.1")
+        finally:
+            future.result(timeout=5)
+
+        assert response.status_code == 409
+
+    @pytest.mark.parametrize("query", ["seconds=0", "seconds=3600", "interval=0", "format=pprof"])
+    def test_invalid_parameters(self, client, query):
+        """Testa parâmetros inválidos."""
+        assert client.get(f"/api/v1/debug/profile?{query}").status_code == 422
+
+    def test_disabled(self):
+        """Testa o endpoint desabilitado."""
+        assert TestClient(create_application()).get("/api/v1/debug/profile").status_code == 404
@@ -0,0 +1,64 @@
+"""Testes para os perfis do servidor."""
+
+import pytest
+from unittest.mock import patch
+
+from app.core.profiles import SERVER_PROFILES, resolve_server_profile
+
+
+class TestResolveServerProfile:
+    """Testes para a resolução dos perfis."""
+
+    def test_default_profile(self):
+        """Testa o perfil padrão com as opções padrão do uvicorn."""
+        profile = resolve_server_profile("default")
+        assert profile.uvicorn_options() == {
+            "loop": "auto",
+            "http": "auto",
+            "backlog": 2048,
+            "timeout_keep_alive": 5,
+            "access_log": False,
+        }
+        assert profile.concurrency_per_cpu == 100
+        assert profile.access_log is True
+
+    def test_fast_loop_when_available(self):
+        """Testa a escolha de uvloop e httptools quando instalados."""
+        with patch('app.core.profiles._available', return_value=True):
+            profile = resolve_server_profile("throughput")
+        assert profile.loop == "uvloop"
+        assert profile.http == "httptools"
+        assert profile.access_log is False
+
+    def test_fallback_without_fast_loop(self):
+        """Testa o fallback para asyncio e h11 sem as dependências opcionais."""
+        with patch('app.core.profiles._available', return_value=False):
+            profile = resolve_server_profile("latency")
+        assert profile.loop == "asyncio"
+        assert profile.http == "h11"
+
+    def test_dev_profile(self):
+        """Testa o perfil de desenvolvimento com loop e parser em Python."""
+        profile = resolve_server_profile("dev")
+        assert profile.loop == "asyncio"
+        assert profile.http == "h11"
+        assert profile.access_log is True
+
+    def test_latency_queues_less_than_throughput(self):
+        """Testa que o perfil de latência usa filas menores."""
+        latency = resolve_server_profile("latency")
+        throughput = resolve_server_profile("throughput")
+        assert latency.backlog < throughput.backlog
+        assert latency.concurrency_per_cpu < throughput.concurrency_per_cpu
+
+    def test_unknown_profile(self):
+        """Testa um perfil desconhecido."""
+        with pytest.raises(ValueError):
+            resolve_server_profile("fastest")
+
+    def test_settings_profiles(self):
+        """Testa que as settings aceitam todos os perfis."""
+        from app.config.settings import Settings
+
+        for name in SERVER_PROFILES:
+            assert Settings(server_profile=name).server_profile == name
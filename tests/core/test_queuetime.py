@@ -0,0 +1,96 @@
+"""Testes para o tempo de fila a partir do X-Request-Start."""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.metrics import metrics
+from app.core.queuetime import parse_request_start, queue_time
+from app.main import create_application
+
+
+NOW = 1700000000.5
+
+
+class TestParseRequestStart:
+    """Testes para a leitura do cabeçalho X-Request-Start."""
+
+    @pytest.mark.parametrize("value", [
+        "1700000000.25",
+        "t=1700000000.25",
+        "1700000000250",
+        "t=1700000000250",
+        "1700000000250000",
+        "t=1700000000250000",
+        "1700000000250000000",
+        " t=1700000000.250 ",
+    ])
+    def test_units(self, value):
+        """Testa segundos, milissegundos, microssegundos e nanossegundos."""
+        assert parse_request_start(value) == pytest.approx(1700000000.25)
+
+    @pytest.mark.parametrize("value", ["", "t=", "abc", "t=abc", "-1", "0", "nan", "inf"])
+    def test_invalid(self, value):
+        """Testa valores inválidos."""
+        assert parse_request_start(value) is None
+
+
+class TestQueueTime:
+    """Testes para o cálculo do tempo de fila."""
+
+    def test_elapsed(self):
+        """Testa o tempo decorrido desde a marcação do proxy."""
+        assert queue_time("t=1700000000.25", NOW) == pytest.approx(0.25)
+
+    def test_clock_skew(self):
+        """Testa o relógio do proxy um pouco adiantado."""
+        assert queue_time("t=1700000001.0", NOW) == 0.0
+
+    def test_implausible(self):
+        """Testa um cabeçalho com horário absurdo."""
+        assert queue_time("t=1600000000", NOW) is None
+        assert queue_time("t=1800000000", NOW) is None
+
+
+class TestQueueTimeMiddleware:
+    """Testes para a medição no middleware."""
+
+    def count(self):
+        """Soma e quantidade de observações do histograma."""
+        return (
+            metrics.registry.get_sample_value('http_request_queue_seconds_sum'),
+            metrics.registry.get_sample_value('http_request_queue_seconds_count'),
+        )
+
+    def test_records_queue_time(self):
+        """Testa o registro do histograma."""
+        client = TestClient(create_application())
+        total, count = self.count()
+
+        client.get("/api/v1/healthz", headers={"X-Request-Start": f"t={time.time() - 0.1:.3f}"})
+
+        new_total, new_count = self.count()
+        assert new_count == count + 1
+        assert 0.099 <= new_total - total < 1.0
+
+    def test_ignores_missing_and_invalid(self):
+        """Testa requisições sem o cabeçalho ou com valor inválido."""
+        client = TestClient(create_application())
+        _, count = self.count()
+
+        client.get("/api/v1/healthz")
+        client.get("/api/v1/healthz", headers={"X-Request-Start": "garbage"})
+
+        assert self.count()[1] == count
+
+    def test_disabled(self):
+        """Testa a medição desligada."""
+        client = TestClient(create_application())
+        _, count = self.count()
+
+        with patch('app.main.settings.request_start_header', None):
+            client.get("/api/v1/healthz", headers={"X-Request-Start": f"t={time.time():.3f}"})
+
+        assert self.count()[1] == count
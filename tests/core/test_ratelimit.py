@@ -0,0 +1,153 @@
+"""Testes para o rate limiting por cliente."""
+
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.ratelimit import RateLimitMiddleware, TokenBucketStore
+
+
+class TestTokenBucketStore:
+    """Testes para a classe TokenBucketStore."""
+
+    def test_burst_then_limited(self, clock):
+        """Testa que o cliente pode usar o burst e depois é limitado."""
+        store = TokenBucketStore(rate=1, burst=3, clock=clock)
+
+        assert [store.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert store.acquire("a") == pytest.approx(1.0)
+
+    def test_lazy_refill(self, clock):
+        """Testa a recarga preguiçosa dos tokens."""
+        store = TokenBucketStore(rate=2, burst=1, clock=clock)
+        store.acquire("a")
+        assert store.acquire("a") > 0
+
+        clock.now = 0.5
+        assert store.acquire("a") == 0.0
+
+    def test_refill_capped_at_burst(self, clock):
+        """Testa que a recarga não ultrapassa a capacidade."""
+        store = TokenBucketStore(rate=1, burst=2, clock=clock)
+        store.acquire("a")
+        clock.now = 100
+
+        assert [store.acquire("a") for _ in range(2)] == [0.0, 0.0]
+        assert store.acquire("a") > 0
+
+    def test_clients_are_independent(self, clock):
+        """Testa que cada cliente tem o próprio bucket."""
+        store = TokenBucketStore(rate=1, burst=1, clock=clock)
+        store.acquire("a")
+
+        assert store.acquire("a") > 0
+        assert store.acquire("b") == 0.0
+
+    def test_idle_bucket_eviction(self, clock):
+        """Testa a remoção de buckets ociosos."""
+        store = TokenBucketStore(rate=1, burst=1, shards=1, sweep_every=2, clock=clock)
+        store.acquire("a")
+        clock.now = 5
+        store.acquire("b")
+
+        assert len(store) == 1
+
+
+class TestRateLimitMiddleware:
+    """Testes para o middleware de rate limiting."""
+
+    def build_client(self, **kwargs):
+        """Aplicação mínima com o middleware de rate limiting."""
+        app = FastAPI()
+
+        @app.get("/limited")
+        async def limited():
+            return {"ok": True}
+
+        @app.get("/free")
+        async def free():
+            return {"ok": True}
+
+        app.add_middleware(RateLimitMiddleware, routes={"/limited": (0.001, 2)}, **kwargs)
+        return TestClient(app)
+
+    def test_limited_route(self):
+        """Testa o retorno 429 após o burst."""
+        client = self.build_client()
+
+        with patch('app.core.ratelimit.metrics') as mock_metrics:
+            statuses = [client.get("/limited").status_code for _ in range(3)]
+            response = client.get("/limited")
+
+        assert statuses == [200, 200, 429]
+        assert response.json()["status_code"] == 429
+        assert int(response.headers["retry-after"]) > 0
+        mock_metrics.record_rate_limited.assert_called_with("/limited")
+
+    def test_route_without_limit(self):
+        """Testa que rotas sem limite não são afetadas."""
+        client = self.build_client()
+
+        assert all(client.get("/free").status_code == 200 for _ in range(5))
+
+    def test_key_header(self):
+        """Testa a identificação do cliente pela entrada adicionada pelo proxy."""
+        client = self.build_client(key_header="X-Forwarded-For")
+
+        for _ in range(2):
+            client.get("/limited", headers={"X-Forwarded-For": "10.0.0.9, 10.0.0.1"})
+
+        assert client.get("/limited", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 429
+        assert client.get("/limited", headers={"X-Forwarded-For": "10.0.0.3"}).status_code == 200
+
+    def test_spoofed_entries_ignored(self):
+        """Testa que entradas enviadas pelo cliente não escolhem o bucket."""
+        client = self.build_client(key_header="X-Forwarded-For")
+
+        statuses = [
+            client.get("/limited", headers={"X-Forwarded-For": f"1.1.1.{index}, 10.0.0.1"}).status_code
+            for index in range(3)
+        ]
+
+        assert statuses == [200, 200, 429]
+
+    def test_trusted_hops(self):
+        """Testa a entrada a um número configurado de proxies da direita."""
+        middleware = RateLimitMiddleware(None, routes={}, key_header="X-Forwarded-For", trusted_hops=2)
+
+        def key(value):
+            return middleware._client_key({"headers": [(b"x-forwarded-for", value)], "client": ("10.9.9.9", 1)})
+
+        assert key(b"6.6.6.6, 10.0.0.1, 10.0.0.2") == "10.0.0.1"
+        # Fewer entries than proxies: the header didn't come through them
+        assert key(b"10.0.0.2") == "10.9.9.9"
+
+    def test_requests_without_key_not_limited(self):
+        """Testa que requests sem chave de cliente não compartilham um bucket."""
+        app = FastAPI()
+
+        @app.get("/limited")
+        async def limited():
+            return {"ok": True}
+
+        middleware = RateLimitMiddleware(app, routes={"/limited": (0.001, 2)})
+        scope = {"type": "http", "method": "GET", "path": "/limited", "headers": [], "query_string": b"", "client": None}
+        statuses = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        async def run():
+            for _ in range(5):
+                await middleware(dict(scope), receive, send)
+
+        asyncio.run(run())
+
+        assert statuses == [200] * 5
+        assert len(middleware.stores["/limited"]) == 0
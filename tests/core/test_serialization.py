@@ -0,0 +1,71 @@
+"""Testes para o motor de serialização JSON."""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from app.core import serialization
+from app.core.serialization import FastJSONResponse, ModelResponse
+from app.models.responses import GreetingResponse
+
+
+class TestSerialization:
+    """Testes para o módulo de serialização."""
+
+    @pytest.fixture(autouse=True)
+    def restore_engine(self):
+        """Restaura o motor configurado após cada teste."""
+        engine = serialization.json_engine
+        yield
+        serialization.set_json_engine(engine)
+
+    @pytest.mark.parametrize("engine", ["stdlib", "orjson"])
+    def test_engines_produce_same_json(self, engine):
+        """Testa que os motores produzem o mesmo conteúdo."""
+        if engine == "orjson" and serialization.orjson is None:
+            pytest.skip("orjson not installed")
+
+        serialization.set_json_engine(engine)
+        content = {"name": "João", "items": [1, 2.5, None], "nested": {"ok": True}}
+
+        assert json.loads(serialization.dumps(content)) == content
+
+    def test_dumps_non_serializable_values(self):
+        """Testa que valores não serializáveis são convertidos para string."""
+        data = json.loads(serialization.dumps({"error": ValueError("boom")}))
+
+        assert data == {"error": "boom"}
+
+    def test_auto_engine(self):
+        """Testa a resolução do motor automático."""
+        expected = "orjson" if serialization.orjson is not None else "stdlib"
+
+        assert serialization.resolve_json_engine("auto") == expected
+
+    def test_unknown_engine(self):
+        """Testa um motor desconhecido."""
+        with pytest.raises(ValueError):
+            serialization.set_json_engine("yaml")
+
+    def test_orjson_engine_not_installed(self):
+        """Testa a seleção explícita do orjson quando não está instalado."""
+        with patch.object(serialization, "orjson", None):
+            with pytest.raises(ValueError):
+                serialization.resolve_json_engine("orjson")
+            assert serialization.resolve_json_engine("auto") == "stdlib"
+
+    def test_fast_json_response(self):
+        """Testa a resposta JSON padrão da aplicação."""
+        response = FastJSONResponse({"status": "ok"})
+
+        assert json.loads(response.body) == {"status": "ok"}
+        assert response.headers["content-type"] == "application/json"
+
+    def test_model_response(self):
+        """Testa a resposta de um modelo já construído."""
+        model = GreetingResponse(message="Hello, Ana!", name="Ana", timestamp="2025-09-12T10:30:00Z")
+        response = ModelResponse(model, status_code=201)
+
+        assert response.status_code == 201
+        assert json.loads(response.body) == model.model_dump()
+        assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,140 @@
+"""Testes para o servidor uvicorn com drain no SIGTERM."""
+
+import asyncio
+import os
+import signal
+import sys
+import pytest
+from unittest.mock import patch
+
+import uvicorn
+
+import run
+from app.config.settings import settings
+from app.core.server import DrainingServer
+
+
+class FakeLifespan:
+    """Lifespan que só registra o shutdown."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    async def shutdown(self):
+        self.shut_down = True
+
+
+@pytest.fixture
+def server(clock):
+    """Servidor já iniciado com 2 segundos de pre-stop."""
+    config = uvicorn.Config("app.main:app", timeout_graceful_shutdown=0.05)
+    server = DrainingServer(config, pre_stop_delay=2.0, clock=clock)
+    server.started = True
+    server.servers = []
+    server.lifespan = FakeLifespan()
+    return server
+
+
+class TestDrainingServer:
+    """Testes para a classe DrainingServer."""
+
+    def test_sigterm_flips_readiness_and_keeps_serving(self, server, clock):
+        """Testa que o SIGTERM marca a aplicação como não pronta sem parar o servidor."""
+        with patch('app.core.server.lifecycle') as mock_lifecycle:
+            server.handle_exit(signal.SIGTERM, None)
+
+        mock_lifecycle.begin_drain.assert_called_once()
+        assert server.should_exit is False
+        assert asyncio.run(server.on_tick(1)) is False
+
+    def test_exits_after_pre_stop_delay(self, server, clock):
+        """Testa que o servidor para depois do atraso de pre-stop."""
+        with patch('app.core.server.lifecycle'):
+            server.handle_exit(signal.SIGTERM, None)
+
+        clock.now += 1.9
+        assert asyncio.run(server.on_tick(1)) is False
+        clock.now += 0.1
+        assert asyncio.run(server.on_tick(1)) is True
+
+    def test_second_signal_skips_delay(self, server):
+        """Testa que um segundo sinal encerra sem esperar o atraso."""
+        with patch('app.core.server.lifecycle'):
+            server.handle_exit(signal.SIGTERM, None)
+            server.handle_exit(signal.SIGTERM, None)
+
+        assert server.should_exit is True
+        assert server.force_exit is False
+
+    def test_signal_before_startup(self, server):
+        """Testa que um sinal durante o startup encerra direto."""
+        server.started = False
+        with patch('app.core.server.lifecycle') as mock_lifecycle:
+            server.handle_exit(signal.SIGTERM, None)
+
+        mock_lifecycle.begin_drain.assert_not_called()
+        assert server.should_exit is True
+
+    def test_shutdown_without_running_tasks(self, server, clock):
+        """Testa o drain sem requests em andamento."""
+        with patch('app.core.server.lifecycle'):
+            server.handle_exit(signal.SIGTERM, None)
+        clock.now += 2.5
+
+        asyncio.run(server.shutdown())
+
+        assert server.drain_result.dropped == 0
+        assert server.drain_result.duration == pytest.approx(2.5)
+        assert server.lifespan.shut_down is True
+
+    def test_cancelled_tasks_are_dropped(self, server):
+        """Testa que as tasks canceladas no prazo do uvicorn contam como descartadas."""
+        async def run():
+            task = asyncio.get_running_loop().create_task(asyncio.sleep(60))
+            task.add_done_callback(server.server_state.tasks.discard)
+            server.server_state.tasks.add(task)
+            await server.shutdown()
+            return task
+
+        task = asyncio.run(run())
+
+        assert task.cancelled()
+        assert server.drain_result.dropped == 1
+
+    def test_shutdown_without_signal(self, server):
+        """Testa o shutdown iniciado pelo uvicorn, e.g. por limit_max_requests."""
+        asyncio.run(server.shutdown())
+
+        assert server.drain_result.dropped == 0
+
+    def test_fractional_drain_timeout(self, server):
+        """Testa que um prazo fracionário espera as requests em andamento."""
+        server.config.timeout_graceful_shutdown = 0.5
+
+        async def run_shutdown():
+            task = asyncio.get_running_loop().create_task(asyncio.sleep(0.1))
+            task.add_done_callback(server.server_state.tasks.discard)
+            server.server_state.tasks.add(task)
+            await server.shutdown()
+            return task
+
+        task = asyncio.run(run_shutdown())
+
+        assert not task.cancelled()
+        assert server.drain_result.dropped == 0
+
+
+class TestRunScript:
+    """Testes para a configuração do uvicorn montada pelo run.py."""
+
+    def test_fractional_drain_timeout_is_kept(self):
+        """Testa que SHUTDOWN_DRAIN_TIMEOUT fracionário não é truncado para 0."""
+        with patch.object(sys, 'argv', ["run.py"]), \
+                patch.dict(os.environ), \
+                patch.object(settings, 'shutdown_drain_timeout', 0.5), \
+                patch.object(settings, 'access_log_enabled', settings.access_log_enabled), \
+                patch('app.core.server.run_server') as mock_run_server:
+            run.main()
+
+        config = mock_run_server.call_args.args[0]
+        assert config.timeout_graceful_shutdown == 0.5
@@ -0,0 +1,119 @@
+"""Testes para o dimensionamento de workers."""
+
+import pytest
+from unittest.mock import patch
+
+from app.core.sizing import read_cgroup_cpu_limit, resolve_worker_sizing
+
+
+@pytest.fixture
+def cgroup_v2(tmp_path):
+    """Cria um cgroup v2 falso com a cota informada."""
+    def make(content):
+        (tmp_path / "cpu.max").write_text(content)
+        return tmp_path
+    return make
+
+
+@pytest.fixture
+def cgroup_v1(tmp_path):
+    """Cria um cgroup v1 falso com a cota informada."""
+    def make(quota, period=100000):
+        (tmp_path / "cpu").mkdir()
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text(f"{quota}\n")
+        (tmp_path / "cpu" / "cpu.cfs_period_us").write_text(f"{period}\n")
+        return tmp_path
+    return make
+
+
+class TestReadCgroupCpuLimit:
+    """Testes para a leitura da cota de CPU."""
+
+    def test_cgroup_v2_quota(self, cgroup_v2):
+        """Testa a cota do cgroup v2."""
+        assert read_cgroup_cpu_limit(cgroup_v2("200000 100000\n")) == 2.0
+
+    def test_cgroup_v2_unlimited(self, cgroup_v2):
+        """Testa o cgroup v2 sem limite."""
+        assert read_cgroup_cpu_limit(cgroup_v2("max 100000\n")) is None
+
+    def test_cgroup_v1_quota(self, cgroup_v1):
+        """Testa a cota do cgroup v1."""
+        assert read_cgroup_cpu_limit(cgroup_v1(50000)) == 0.5
+
+    def test_cgroup_v1_unlimited(self, cgroup_v1):
+        """Testa o cgroup v1 sem limite."""
+        assert read_cgroup_cpu_limit(cgroup_v1(-1)) is None
+
+    def test_no_cgroup(self, tmp_path):
+        """Testa a ausência de cgroup."""
+        assert read_cgroup_cpu_limit(tmp_path) is None
+
+
+class TestResolveWorkerSizing:
+    """Testes para a resolução do dimensionamento."""
+
+    @pytest.fixture(autouse=True)
+    def host_cpus(self):
+        """Simula um host com 8 CPUs."""
+        with patch('app.core.sizing.os.sched_getaffinity', return_value=set(range(8))):
+            yield
+
+    def test_auto_from_cgroup(self, cgroup_v2):
+        """Testa workers automáticos a partir da cota."""
+        sizing = resolve_worker_sizing("auto", root=cgroup_v2("250000 100000"))
+
+        assert sizing.workers == 2
+        assert sizing.source == "cgroup"
+        assert sizing.cpu_limit == 2.5
+
+    def test_auto_fractional_quota(self, cgroup_v2):
+        """Testa que cotas menores que uma CPU resultam em um worker."""
+        sizing = resolve_worker_sizing("auto", root=cgroup_v2("20000 100000"))
+
+        assert sizing.workers == 1
+        assert sizing.thread_pool_size >= 4
+        assert sizing.limit_concurrency > 0
+
+    def test_auto_falls_back_to_cpu_count(self, tmp_path):
+        """Testa o uso da contagem de CPUs sem cota."""
+        sizing = resolve_worker_sizing("auto", root=tmp_path)
+
+        assert sizing.workers == 8
+        assert sizing.source == "cpu_count"
+
+    def test_explicit_workers_and_limits(self, tmp_path):
+        """Testa valores explícitos."""
+        sizing = resolve_worker_sizing(3, thread_pool_size=7, limit_concurrency=50, root=tmp_path)
+
+        assert sizing.workers == 3
+        assert sizing.source == "explicit"
+        assert sizing.thread_pool_size == 7
+        assert sizing.limit_concurrency == 50
+
+    def test_concurrency_per_cpu(self, cgroup_v2):
+        """Testa o limite de concorrência por CPU vindo do perfil do servidor."""
+        sizing = resolve_worker_sizing("auto", root=cgroup_v2("250000 100000"), concurrency_per_cpu=50)
+
+        assert sizing.limit_concurrency == 100
+
+    def test_explicit_workers_keep_defaults(self, tmp_path):
+        """Testa que workers explícitos mantêm o thread pool do anyio e a concorrência ilimitada."""
+        sizing = resolve_worker_sizing(4, root=tmp_path)
+
+        assert sizing.thread_pool_size is None
+        assert sizing.limit_concurrency is None
+        assert sizing.as_dict()["thread_pool_size"] == "default"
+        assert sizing.as_dict()["limit_concurrency"] == "unlimited"
+
+    def test_invalid_workers(self, tmp_path):
+        """Testa um número inválido de workers."""
+        with pytest.raises(ValueError):
+            resolve_worker_sizing(0, root=tmp_path)
+
+    def test_as_dict(self, tmp_path):
+        """Testa a conversão para o Info metric."""
+        data = resolve_worker_sizing(2, root=tmp_path).as_dict()
+
+        assert data["workers"] == "2"
+        assert all(isinstance(value, str) for value in data.values())
@@ -0,0 +1,154 @@
+"""Testes para a captura de requisições lentas e o atraso do event loop."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.metrics import metrics
+from app.core.slowlog import EventLoopLagMonitor, SlowRequestLog, slow_requests
+from app.core.tracing import Phases, Trace, tracer
+from app.main import create_application
+
+
+def record(log, route="/api/v1/greet", duration=0.5, phases=None, trace=None):
+    """Registra uma requisição com valores padrão."""
+    return log.record(
+        method="GET",
+        route=route,
+        path=route,
+        query="name=Ana",
+        status=200,
+        duration=duration,
+        in_flight=3,
+        loop_lag=0.002,
+        phases=phases,
+        trace=trace,
+    )
+
+
+class TestSlowRequestLog:
+    """Testes para a classe SlowRequestLog."""
+
+    def test_global_threshold(self):
+        """Testa o limite global."""
+        log = SlowRequestLog(threshold=0.1)
+
+        assert record(log, duration=0.05) is False
+        assert record(log, duration=0.2) is True
+
+        entry = log.recent(10)[0]
+        assert entry["duration_ms"] == 200.0
+        assert entry["query"] == "name=Ana"
+        assert entry["in_flight_at_start"] == 3
+        assert entry["loop_lag_ms"] == 2.0
+        assert entry["phases_ms"] is None
+        assert entry["trace_id"] is None
+
+    def test_route_threshold(self):
+        """Testa o limite específico de uma rota."""
+        log = SlowRequestLog(threshold=None, route_thresholds={"/api/v1/metrics": 0.5})
+
+        assert record(log, route="/api/v1/greet", duration=10) is False
+        assert record(log, route="/api/v1/metrics", duration=0.4) is False
+        assert record(log, route="/api/v1/metrics", duration=0.6) is True
+
+    def test_phases_of_unsampled_request(self):
+        """Testa as fases de uma requisição não amostrada."""
+        log = SlowRequestLog(threshold=0.1)
+        phases = Phases()
+        phases.handler = 0.4
+        phases.endpoint = 0.3
+        phases.serialization = 0.05
+
+        record(log, phases=phases, trace=Trace("0af7651916cd43dd8448eb211c80319c", None, False))
+
+        entry = log.recent(1)[0]
+        assert entry["phases_ms"] == {
+            "middleware": 100.0,
+            "validation": 50.0,
+            "handler": 300.0,
+            "serialization": 50.0,
+            "total": 500.0,
+        }
+        assert entry["trace_id"] is None
+
+    def test_trace_id_of_sampled_request(self):
+        """Testa o trace id de uma requisição amostrada."""
+        log = SlowRequestLog(threshold=0.1)
+        trace = Trace("0af7651916cd43dd8448eb211c80319c", None, True)
+
+        record(log, phases=Phases(), trace=trace)
+
+        entry = log.recent(1)[0]
+        assert entry["phases_ms"] == {"total": 500.0}
+        assert entry["trace_id"] == trace.trace_id
+
+    def test_capacity_and_counter(self):
+        """Testa a capacidade do buffer e o contador de capturas."""
+        log = SlowRequestLog(threshold=0.1, capacity=2)
+        counter = metrics.slow_requests_total.labels(endpoint="/slow-test")
+        before = counter._value.get()
+
+        for duration in (0.2, 0.3, 0.4):
+            record(log, route="/slow-test", duration=duration)
+
+        assert len(log) == 2
+        assert [entry["duration_ms"] for entry in log.recent(10)] == [400.0, 300.0]
+        assert counter._value.get() == before + 3
+
+
+class TestEventLoopLagMonitor:
+    """Testes para o monitor de atraso do event loop."""
+
+    def test_measures_blocked_loop(self):
+        """Testa a medição do atraso causado por código bloqueante."""
+        async def scenario():
+            monitor = EventLoopLagMonitor(interval=0.01)
+            monitor.start()
+            await asyncio.sleep(0)
+            time.sleep(0.05)
+            # O monitor acorda antes, atrasado, e a próxima medição fica para depois
+            await asyncio.sleep(0.001)
+            await monitor.stop()
+            return monitor.lag
+
+        assert asyncio.run(scenario()) >= 0.03
+
+
+class TestSlowEndpoint:
+    """Testes para o endpoint /debug/slow."""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de teste capturando todas as requisições de /greet."""
+        with patch('app.api.v1.endpoints.debug.settings.debug_endpoints_enabled', True), \
+             patch('app.api.v1.endpoints.debug.settings.debug_token', "secret"), \
+             patch.object(slow_requests, 'route_thresholds', {"/api/v1/greet": 0.0}):
+            yield TestClient(create_application(), headers={"Authorization": "Bearer secret"})
+
+    def test_captures_slow_requests(self, client):
+        """Testa a captura pelo middleware e a exposição no endpoint."""
+        client.get("/api/v1/greet?name=Ana")
+        client.get("/api/v1/healthz")
+
+        body = client.get("/api/v1/debug/slow?limit=1").json()
+
+        assert body["route_thresholds_seconds"] == {"/api/v1/greet": 0.0}
+        entry = body["requests"][0]
+        assert entry["route"] == "/api/v1/greet"
+        assert entry["query"] == "name=Ana"
+        assert entry["status"] == 200
+
+    def test_phases_without_sampling(self, client):
+        """Testa que as fases são registradas sem amostragem do trace."""
+        with patch.object(tracer, 'sample_rate', 0.0):
+            client.get("/api/v1/greet?name=Ana")
+
+        entry = client.get("/api/v1/debug/slow?limit=1").json()["requests"][0]
+
+        assert entry["trace_id"] is None
+        assert list(entry["phases_ms"]) == ["middleware", "validation", "handler", "serialization", "total"]
+        assert entry["phases_ms"]["handler"] <= entry["phases_ms"]["total"]
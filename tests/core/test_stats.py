@@ -0,0 +1,106 @@
+"""Testes para as estatísticas RED em janelas deslizantes."""
+
+import random
+
+import pytest
+
+from app.core.metrics import PrometheusMetrics
+from app.core.stats import DDSketch, RequestStats
+
+
+NOW = 1700000000.0
+
+
+class TestDDSketch:
+    """Testes para o sketch de quantis."""
+
+    def test_empty(self):
+        """Testa um sketch vazio."""
+        assert DDSketch().quantile(0.5) is None
+
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.99])
+    def test_relative_accuracy(self, q):
+        """Testa o erro relativo dos quantis."""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(-7, 1.5) for _ in range(10000)]
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        exact = sorted(values)[int(q * (len(values) - 1))]
+
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+    def test_merge(self):
+        """Testa a combinação de dois sketches."""
+        first, second, both = DDSketch(), DDSketch(), DDSketch()
+        for value in range(1, 101):
+            (first if value <= 50 else second).add(value / 1000)
+            both.add(value / 1000)
+
+        first.merge(second)
+
+        assert first.count == 100
+        assert first.bins == both.bins
+        assert first.quantile(0.9) == both.quantile(0.9)
+
+    def test_zero_values(self):
+        """Testa durações nulas."""
+        sketch = DDSketch()
+        for value in (0.0, 0.0, 0.0, 0.5):
+            sketch.add(value)
+
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(0.5, rel=0.01)
+
+
+class TestRequestStats:
+    """Testes para a classe RequestStats."""
+
+    def test_windows(self):
+        """Testa as contagens em cada janela."""
+        stats = RequestStats()
+        # 10 requisições há 10s, 20 há 2 min e 30 há 10 min, uma com erro em cada grupo
+        for age, count in ((10, 10), (120, 20), (600, 30)):
+            for index in range(count):
+                stats.record("/api/v1/greet", 500 if index == 0 else 200, 0.001 * age, now=NOW - age)
+
+        windows = stats.snapshot(NOW)["/api/v1/greet"]
+
+        assert [windows[name]["requests"] for name in ("1m", "5m", "15m")] == [10, 30, 60]
+        assert windows["1m"]["rate"] == pytest.approx(10 / 60, abs=0.001)
+        assert windows["5m"]["error_ratio"] == pytest.approx(2 / 30, abs=0.0001)
+        assert windows["1m"]["p99_ms"] == pytest.approx(10, rel=0.01)
+        assert windows["15m"]["p50_ms"] == pytest.approx(120, rel=0.01)
+        assert windows["15m"]["p90_ms"] == pytest.approx(600, rel=0.01)
+
+    def test_old_requests_expire(self):
+        """Testa que requisições fora da maior janela são descartadas."""
+        stats = RequestStats()
+        stats.record("/api/v1/greet", 200, 0.01, now=NOW - 900)
+        stats.record("/api/v1/healthz", 200, 0.01, now=NOW - 899)
+
+        snapshot = stats.snapshot(NOW)
+
+        assert "/api/v1/greet" not in snapshot
+        assert snapshot["/api/v1/healthz"]["15m"]["requests"] == 1
+        assert snapshot["/api/v1/healthz"]["1m"]["p50_ms"] is None
+
+    def test_ring_reuses_slots(self):
+        """Testa a reutilização do bucket de um segundo antigo."""
+        stats = RequestStats()
+        stats.record("/api/v1/greet", 200, 0.01, now=NOW - 900)
+        stats.record("/api/v1/greet", 200, 0.02, now=NOW)
+
+        windows = stats.snapshot(NOW)["/api/v1/greet"]
+
+        assert windows["15m"]["requests"] == 1
+        assert sum(bucket is not None for bucket in stats._routes["/api/v1/greet"]) == 1
+
+    def test_fed_from_record_request(self):
+        """Testa a alimentação pelo registro das métricas."""
+        metrics = PrometheusMetrics()
+        metrics.record_request("GET", "/api/v1/greet", 200, 0.01, route="/api/v1/greet")
+        metrics.record_request("GET", "/unknown", 404, 0.01)
+
+        assert list(metrics.request_stats.snapshot()) == ["/api/v1/greet"]
@@ -0,0 +1,164 @@
+"""Testes para os decodificadores de corpo em streaming."""
+
+import asyncio
+import pytest
+
+from app.core.streaming import (
+    JSONArrayDecoder,
+    NDJSONDecoder,
+    SpooledBody,
+    StreamDecodeError,
+    iter_json_items,
+)
+
+
+def collect(chunks, ndjson=False):
+    """Decodifica uma lista de chunks e retorna os itens."""
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [item async for item in iter_json_items(source(), ndjson=ndjson)]
+
+    return asyncio.run(run())
+
+
+class TestJSONArrayDecoder:
+    """Testes para o decodificador de arrays JSON."""
+
+    def test_single_chunk(self):
+        """Testa um array completo em um único chunk."""
+        assert collect([b'["Ana", "Bob", 3]']) == ["Ana", "Bob", 3]
+
+    def test_items_split_across_chunks(self):
+        """Testa itens divididos entre chunks."""
+        assert collect([b'["An', b'a", "B', b'ob"', b"]"]) == ["Ana", "Bob"]
+
+    def test_number_split_across_chunks(self):
+        """Testa números divididos entre chunks não são truncados."""
+        assert collect([b"[12", b"34]"]) == [1234]
+
+    def test_utf8_split_across_chunks(self):
+        """Testa caracteres multibyte divididos entre chunks."""
+        data = '["João"]'.encode()
+        assert collect([data[:4], data[4:]]) == ["João"]
+
+    def test_empty_array(self):
+        """Testa um array vazio."""
+        assert collect([b" [ ] "]) == []
+
+    @pytest.mark.parametrize("body", [
+        b"", b"[", b'{"name": "Ana"}', b'["Ana"', b'["Ana",]', b'["Ana" "Bob"]', b'["Ana"] x',
+    ])
+    def test_invalid_bodies(self, body):
+        """Testa que corpos inválidos levantam um erro."""
+        with pytest.raises(StreamDecodeError):
+            collect([body])
+
+    def test_items_before_error_are_kept(self):
+        """Testa que os itens do mesmo chunk antes do erro são retornados."""
+        decoder = JSONArrayDecoder()
+        items = decoder.feed('["Ana", "Bob" "Cid", "Dan"')
+
+        assert items[:2] == ["Ana", "Bob"]
+        assert isinstance(items[2], StreamDecodeError)
+        assert len(items) == 3
+        assert decoder.failed is True
+        assert decoder.feed(', "Eva"]') == []
+
+    def test_item_size_limit(self):
+        """Testa o limite de tamanho de um item pendente."""
+        decoder = JSONArrayDecoder(max_item_size=10)
+        items = decoder.feed('["Ana", "' + "a" * 20)
+
+        assert items[0] == "Ana"
+        assert isinstance(items[1], StreamDecodeError)
+        assert decoder.failed is True
+
+
+class TestNDJSONDecoder:
+    """Testes para o decodificador NDJSON."""
+
+    def test_lines_split_across_chunks(self):
+        """Testa linhas divididas entre chunks."""
+        assert collect([b'"Ana"\n"B', b'ob"\n\n"Carl"'], ndjson=True) == ["Ana", "Bob", "Carl"]
+
+    def test_invalid_line_in_place(self):
+        """Testa que uma linha inválida vira um erro na sua posição sem perder as outras."""
+        items = collect([b'"Ana"\n{"x":1}\nnot json\n"Bob"'], ndjson=True)
+
+        assert items[:2] == ["Ana", {"x": 1}]
+        assert isinstance(items[2], StreamDecodeError)
+        assert items[3] == "Bob"
+
+    def test_line_size_limit(self):
+        """Testa o limite de tamanho de uma linha pendente."""
+        decoder = NDJSONDecoder(max_item_size=10)
+        items = decoder.feed('"Ana"\n"' + "a" * 20)
+
+        assert items[0] == "Ana"
+        assert isinstance(items[1], StreamDecodeError)
+        assert decoder.failed is True
+
+    def test_invalid_utf8(self):
+        """Testa que UTF-8 inválido levanta um erro."""
+        with pytest.raises(StreamDecodeError, match="UTF-8"):
+            collect([b'"Ana"\n', b'"\xff"\n', b'"Bob"\n'], ndjson=True)
+
+    def test_empty_body(self):
+        """Testa que um corpo NDJSON sem linhas levanta um erro."""
+        with pytest.raises(StreamDecodeError, match="Empty"):
+            collect([b"\n  \n"], ndjson=True)
+
+    def test_items_before_fatal_error(self):
+        """Testa que os itens antes de um erro fatal são entregues antes da exceção."""
+        async def source():
+            yield b'"Ana"\n"' + b"a" * 70000
+
+        async def run():
+            items = []
+            with pytest.raises(StreamDecodeError):
+                async for item in iter_json_items(source(), ndjson=True):
+                    items.append(item)
+            return items
+
+        assert asyncio.run(run()) == ["Ana"]
+
+
+class TestSpooledBody:
+    """Testes para o corpo de resposta em spool."""
+
+    def read(self, body):
+        """Lê o corpo inteiro."""
+        async def run():
+            return b"".join([chunk async for chunk in body.iter_chunks()])
+
+        return asyncio.run(run())
+
+    def test_small_body_stays_in_memory(self):
+        """Testa um corpo pequeno mantido em memória."""
+        body = SpooledBody(max_memory=1024, chunk_size=16)
+
+        async def write():
+            for index in range(10):
+                await body.write(b"line %d\n" % index)
+
+        asyncio.run(write())
+
+        assert body.spilled is False
+        assert self.read(body) == b"".join(b"line %d\n" % index for index in range(10))
+
+    def test_large_body_spills_to_disk(self):
+        """Testa que um corpo maior que o limite vai para um arquivo temporário."""
+        body = SpooledBody(max_memory=100, chunk_size=16)
+        lines = [b"line %d\n" % index for index in range(100)]
+
+        async def write():
+            for line in lines:
+                await body.write(line)
+
+        asyncio.run(write())
+
+        assert body.spilled is True
+        assert self.read(body) == b"".join(lines)
@@ -0,0 +1,208 @@
+"""Testes para o supervisor de workers."""
+
+import os
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+import uvicorn
+
+from app.core.lifecycle import LifecycleState, lifecycle
+from app.core.metrics import PrometheusMetrics
+from app.core.supervisor import Supervisor, Worker, bind_reuse_port_socket
+
+
+def make_worker(requests=0, ready=True, max_requests=None, alive=True):
+    """Cria um worker com processo simulado."""
+    process = MagicMock()
+    process.pid = 1234
+    process.is_alive.return_value = alive
+    return Worker(process, [requests, int(ready)], max_requests)
+
+
+@pytest.fixture
+def supervisor():
+    """Supervisor com limites de RSS e requests."""
+    config = uvicorn.Config("app.main:app")
+    return Supervisor(config, workers=2, max_rss=100 * 1024 * 1024, max_requests=1000)
+
+
+class TestSupervisor:
+    """Testes para a classe Supervisor."""
+
+    def test_within_limits(self, supervisor):
+        """Testa um worker dentro dos limites."""
+        worker = make_worker(requests=10, max_requests=1000)
+        with patch.object(Worker, 'rss', return_value=50 * 1024 * 1024):
+            assert supervisor.recycle_reason(worker) is None
+
+    def test_recycle_on_requests(self, supervisor):
+        """Testa a reciclagem pelo número de requests."""
+        worker = make_worker(requests=1000, max_requests=1000)
+        assert supervisor.recycle_reason(worker) == "requests"
+
+    def test_recycle_on_rss(self, supervisor):
+        """Testa a reciclagem pelo RSS."""
+        worker = make_worker(requests=10, max_requests=1000)
+        with patch.object(Worker, 'rss', return_value=200 * 1024 * 1024):
+            assert supervisor.recycle_reason(worker) == "rss"
+
+    def test_no_limits(self):
+        """Testa um supervisor sem limites configurados."""
+        supervisor = Supervisor(uvicorn.Config("app.main:app"), workers=1)
+        worker = make_worker(requests=10 ** 6)
+        with patch.object(Worker, 'rss', return_value=10 ** 12):
+            assert supervisor.recycle_reason(worker) is None
+
+    def test_max_requests_jitter(self, supervisor):
+        """Testa a variação de até 10% no limite de requests de cada worker."""
+        supervisor.context = MagicMock()
+        for _ in range(20):
+            worker = supervisor.spawn()
+            assert 1000 <= worker.max_requests <= 1100
+
+    def test_recycle_retires_old_worker(self, supervisor):
+        """Testa a substituição do worker antes de aposentá-lo."""
+        old = make_worker(requests=1000, max_requests=1000)
+        supervisor.workers.append(old)
+        replacement = make_worker()
+
+        with patch.object(supervisor, 'spawn', return_value=replacement), \
+                patch('app.core.supervisor.os.kill') as mock_kill:
+            supervisor.recycle(old, "requests")
+
+        mock_kill.assert_called_once()
+        assert old.retiring_since is not None
+        assert supervisor.stats()["requests"] == 1
+
+    def test_check_restarts_crashed_worker(self, supervisor):
+        """Testa o reinício de um worker que morreu."""
+        crashed = make_worker(alive=False)
+        supervisor.workers.append(crashed)
+
+        with patch.object(supervisor, 'spawn') as mock_spawn:
+            supervisor.check()
+
+        mock_spawn.assert_called_once()
+        assert crashed not in supervisor.workers
+        assert supervisor.stats()["crash"] == 1
+
+    def test_check_reaps_retired_worker(self, supervisor):
+        """Testa a remoção de um worker aposentado que já terminou."""
+        retired = make_worker(alive=False)
+        retired.retiring_since = 0.0
+        supervisor.workers.append(retired)
+
+        with patch.object(supervisor, 'spawn') as mock_spawn:
+            supervisor.check()
+
+        mock_spawn.assert_not_called()
+        assert supervisor.workers == []
+        assert supervisor.stats()["crash"] == 0
+
+    def test_preload_forks_workers(self):
+        """Testa o uso de fork e o stdin herdado no modo preload."""
+        supervisor = Supervisor(uvicorn.Config("app.main:app"), workers=1, preload=True)
+        assert supervisor.context.get_start_method() == "fork"
+        assert supervisor._stdin_fileno() is None
+
+    def test_preload_loads_app_before_fork(self):
+        """Testa o carregamento da aplicação e o gc.freeze antes dos workers."""
+        config = MagicMock()
+        supervisor = Supervisor(config, workers=2, preload=True)
+        calls = []
+        config.load.side_effect = lambda: calls.append("load")
+
+        def stop():
+            calls.append("spawn")
+            supervisor.should_exit = True
+
+        with patch.object(supervisor, 'spawn', side_effect=stop), \
+                patch('app.core.supervisor.gc.freeze', side_effect=lambda: calls.append("freeze")), \
+                patch('app.core.supervisor.signal.signal'), \
+                patch.object(supervisor, 'shutdown'):
+            supervisor.run()
+
+        assert calls[:3] == ["load", "freeze", "spawn"]
+
+    def test_reuse_port_skips_shared_socket(self):
+        """Testa que o supervisor não abre o socket compartilhado com reuse port."""
+        config = MagicMock()
+        supervisor = Supervisor(config, workers=1, reuse_port=True)
+        supervisor.context = MagicMock()
+
+        def stop(*args, **kwargs):
+            supervisor.should_exit = True
+            return MagicMock()
+
+        supervisor.context.Process.side_effect = stop
+        with patch('app.core.supervisor.signal.signal'), patch.object(supervisor, 'shutdown'):
+            supervisor.run()
+
+        config.bind_socket.assert_not_called()
+        assert supervisor.context.Process.call_args.kwargs["kwargs"]["reuse_port"] is True
+
+    def test_uds_removed_on_shutdown(self, tmp_path):
+        """Testa que o arquivo do socket Unix é removido e o supervisor inicia de novo no mesmo caminho."""
+        path = str(tmp_path / "app.sock")
+
+        for _ in range(2):
+            supervisor = Supervisor(uvicorn.Config("app.main:app", uds=path), workers=1)
+            supervisor.context = MagicMock()
+
+            def stop(*args, **kwargs):
+                supervisor.should_exit = True
+                process = MagicMock()
+                process.is_alive.return_value = False
+                return process
+
+            supervisor.context.Process.side_effect = stop
+            with patch('app.core.supervisor.signal.signal'):
+                supervisor.run()
+
+            assert not os.path.exists(path)
+
+
+class TestBindReusePortSocket:
+    """Testes para os sockets com SO_REUSEPORT."""
+
+    def test_workers_share_the_port(self):
+        """Testa dois sockets ouvindo na mesma porta."""
+        first = bind_reuse_port_socket("127.0.0.1", 0)
+        port = first.getsockname()[1]
+        second = bind_reuse_port_socket("127.0.0.1", port)
+        try:
+            first.listen()
+            second.listen()
+            assert second.getsockname()[1] == port
+        finally:
+            first.close()
+            second.close()
+
+
+class TestSharedWorkerState:
+    """Testes para o estado compartilhado com o supervisor."""
+
+    def test_shared_stats(self):
+        """Testa a contagem de requests e a prontidão compartilhadas."""
+        state = LifecycleState()
+        stats = [0, 0]
+        state.attach_supervisor(stats, [0, 0, 0])
+
+        state.mark_ready()
+        state.request_started()
+        state.request_finished()
+        assert stats == [1, 1]
+
+        state.begin_drain()
+        assert stats[1] == 0
+
+    def test_recycles_metric(self):
+        """Testa a exportação das reciclagens compartilhadas."""
+        instance = PrometheusMetrics()
+        assert 'app_worker_recycles_total{reason="rss"} 0.0' in instance.get_metrics()
+
+        with patch.object(lifecycle, 'worker_recycles', [3, 1, 0]):
+            output = instance.get_metrics()
+        assert 'app_worker_recycles_total{reason="rss"} 3.0' in output
+        assert 'app_worker_recycles_total{reason="requests"} 1.0' in output
@@ -0,0 +1,370 @@
+"""Testes para o rastreamento de requisições."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.metrics import metrics
+from app.core.tracing import (
+    OTLPExporter,
+    Phases,
+    Trace,
+    TraceBuffer,
+    Tracer,
+    current_trace,
+    finish_phases,
+    otlp_payload,
+    parse_traceparent,
+    phase,
+    server_timing,
+    span,
+    start_phases,
+    tracer,
+)
+from app.main import create_application
+
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "b7ad6b7169203331"
+
+
+class TestParseTraceparent:
+    """Testes para a leitura do cabeçalho traceparent."""
+
+    def test_sampled(self):
+        """Testa um traceparent amostrado."""
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+
+    def test_not_sampled(self):
+        """Testa um traceparent não amostrado."""
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+
+    def test_future_version(self):
+        """Testa uma versão futura com campos extras."""
+        assert parse_traceparent(f"01-{TRACE_ID}-{PARENT_ID}-01-extra") == (TRACE_ID, PARENT_ID, True)
+
+    @pytest.mark.parametrize("value", [
+        "",
+        "garbage",
+        f"ff-{TRACE_ID}-{PARENT_ID}-01",
+        f"00-{'0' * 32}-{PARENT_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01",
+        f"00-{TRACE_ID.upper()}-{PARENT_ID}-01",
+        f"00-{TRACE_ID}-{PARENT_ID}-zz",
+        f"00-{TRACE_ID}-{PARENT_ID}-01-extra",
+    ])
+    def test_invalid(self, value):
+        """Testa cabeçalhos inválidos."""
+        assert parse_traceparent(value) is None
+
+
+class TestTracer:
+    """Testes para a classe Tracer."""
+
+    def test_honours_sampled_parent(self):
+        """Testa que a decisão do pai é respeitada mesmo sem amostragem local."""
+        local = Tracer(sample_rate=0.0, buffer_size=10)
+        trace = local.start_request(f"00-{TRACE_ID}-{PARENT_ID}-01")
+        try:
+            assert trace.sampled is True
+            assert trace.trace_id == TRACE_ID
+            assert current_trace() is trace
+        finally:
+            local.finish_request(trace, "GET /", 0, {})
+
+        assert current_trace() is None
+        assert local.buffer.find(TRACE_ID) is trace
+        server_span = trace.spans[-1]
+        assert server_span.parent_id == PARENT_ID
+        assert server_span.span_id == trace.span_id
+
+    def test_propagates_unsampled_parent(self):
+        """Testa a propagação de um pai não amostrado sem registrar spans."""
+        local = Tracer(sample_rate=1.0, buffer_size=10)
+        trace = local.start_request(f"00-{TRACE_ID}-{PARENT_ID}-00")
+        with span("handler") as current:
+            assert current is None
+        local.finish_request(trace, "GET /", 0, {})
+
+        assert trace.traceparent().endswith("-00")
+        assert len(local.buffer) == 0
+
+    def test_head_sampling(self):
+        """Testa a amostragem de requisições sem pai."""
+        assert Tracer(sample_rate=0.0, buffer_size=10).start_request(None) is None
+
+        local = Tracer(sample_rate=1.0, buffer_size=10)
+        trace = local.start_request(None)
+        local.finish_request(trace, "GET /", 0, {})
+        assert trace.sampled is True
+        assert len(trace.trace_id) == 32
+
+    def test_nested_spans(self):
+        """Testa o encadeamento dos spans."""
+        local = Tracer(sample_rate=1.0, buffer_size=10)
+        trace = local.start_request(None)
+        with span("handler") as handler:
+            with span("serialization") as serialization:
+                pass
+        local.finish_request(trace, "GET /", 0, {})
+
+        assert serialization.parent_id == handler.span_id
+        assert handler.parent_id == trace.span_id
+        assert [item.name for item in trace.spans] == ["serialization", "handler", "GET /"]
+
+    def test_span_records_errors(self):
+        """Testa o registro de exceções no span."""
+        local = Tracer(sample_rate=1.0, buffer_size=10)
+        trace = local.start_request(None)
+        with pytest.raises(ValueError):
+            with span("handler"):
+                raise ValueError("boom")
+        local.finish_request(trace, "GET /", 0, {})
+
+        assert trace.spans[0].attributes["error"] == "ValueError"
+
+
+class TestTraceBuffer:
+    """Testes para o buffer circular de traces."""
+
+    def test_keeps_most_recent(self):
+        """Testa a capacidade e a ordem do buffer."""
+        buffer = TraceBuffer(capacity=2)
+        traces = [Trace(f"{index:032x}", None, True) for index in range(1, 4)]
+        for trace in traces:
+            buffer.append(trace)
+
+        assert len(buffer) == 2
+        assert buffer.recent(10) == [traces[2], traces[1]]
+        assert buffer.find(traces[0].trace_id) is None
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    """Receptor OTLP local que guarda os payloads recebidos."""
+
+    payloads = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.payloads.append(json.loads(body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOTLPExporter:
+    """Testes para o exportador OTLP."""
+
+    @pytest.fixture
+    def receiver(self):
+        """Servidor HTTP local no lugar do coletor OTLP."""
+        _Receiver.payloads = []
+        server = HTTPServer(("127.0.0.1", 0), _Receiver)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}/v1/traces"
+        server.shutdown()
+
+    def sampled_trace(self):
+        local = Tracer(sample_rate=1.0, buffer_size=10)
+        trace = local.start_request(f"00-{TRACE_ID}-{PARENT_ID}-01")
+        with span("handler"):
+            pass
+        local.finish_request(trace, "GET /", 0, {"http.status_code": 200})
+        return trace
+
+    def test_payload(self):
+        """Testa o formato OTLP/JSON dos spans."""
+        payload = otlp_payload([self.sampled_trace()], "svc")
+
+        resource_spans = payload["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"][0]["value"]["stringValue"] == "svc"
+        spans = resource_spans["scopeSpans"][0]["spans"]
+        assert [item["name"] for item in spans] == ["handler", "GET /"]
+        assert spans[1]["parentSpanId"] == PARENT_ID
+        assert spans[1]["kind"] == 2
+        assert spans[1]["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
+
+    def test_flush(self, receiver):
+        """Testa o envio em lote para o coletor."""
+        exporter = OTLPExporter(receiver, service_name="svc", interval=60)
+        exporter.enqueue(self.sampled_trace())
+        exporter.enqueue(self.sampled_trace())
+
+        assert exporter.flush() == 2
+        spans = _Receiver.payloads[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert len(spans) == 4
+
+    def test_failed_export_is_counted(self):
+        """Testa a contagem de traces perdidos com o coletor fora do ar."""
+        exporter = OTLPExporter("http://127.0.0.1:9/v1/traces", service_name="svc", timeout=0.5)
+        exporter.enqueue(self.sampled_trace())
+        before = metrics.trace_export_dropped_total._value.get()
+
+        assert exporter.flush() == 0
+        assert metrics.trace_export_dropped_total._value.get() == before + 1
+
+
+class TestRequestTracing:
+    """Testes para o rastreamento no middleware da aplicação."""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de teste com os endpoints de debug habilitados."""
+        with patch('app.api.v1.endpoints.debug.settings.debug_endpoints_enabled', True), \
+             patch('app.api.v1.endpoints.debug.settings.debug_token', "secret"):
+            yield TestClient(create_application(), headers={"Authorization": "Bearer secret"})
+
+    def test_traced_request(self, client):
+        """Testa os spans de middleware, handler e serialização de uma requisição."""
+        response = client.get("/api/v1/greet?name=Ana", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+        assert response.headers["traceresponse"].startswith(f"00-{TRACE_ID}-")
+        trace = client.get(f"/api/v1/debug/traces?trace_id={TRACE_ID}").json()["traces"][0]
+        names = [item["name"] for item in trace["spans"]]
+        assert names == ["serialization", "endpoint", "handler", "GET /api/v1/greet"]
+
+    def test_exemplar(self, client):
+        """Testa o trace id como exemplar da duração das requisições."""
+        client.get("/api/v1/healthz", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+        response = client.get("/api/v1/metrics", headers={"Accept": "application/openmetrics-text"})
+
+        assert response.headers["content-type"].startswith("application/openmetrics-text")
+        assert f'# {{trace_id="{TRACE_ID}"}}' in response.text
+
+    def test_untraced_request(self, client):
+        """Testa uma requisição sem amostragem."""
+        with patch.object(tracer, 'sample_rate', 0.0):
+            response = client.get("/api/v1/healthz")
+
+        assert "traceresponse" not in response.headers
+
+    def test_debug_endpoints_disabled(self):
+        """Testa os endpoints de debug desabilitados."""
+        client = TestClient(create_application())
+
+        assert client.get("/api/v1/debug/traces").status_code == 404
+
+    def test_debug_token(self, client):
+        """Testa o token exigido pelos endpoints de debug."""
+        assert client.get("/api/v1/debug/traces", headers={"Authorization": ""}).status_code == 401
+        assert client.get(
+            "/api/v1/debug/traces", headers={"Authorization": "Bearer wrong"}
+        ).status_code == 401
+        assert client.get("/api/v1/debug/traces").status_code == 200
+
+    def test_debug_endpoints_without_token(self, client):
+        """Testa que os endpoints de debug não são servidos sem um token configurado."""
+        with patch('app.api.v1.endpoints.debug.settings.debug_token', None):
+            assert client.get("/api/v1/debug/traces").status_code == 404
+
+
+class TestServerTiming:
+    """Testes para o cabeçalho Server-Timing."""
+
+    def timings(self, header):
+        """Durações do cabeçalho indexadas pelo nome."""
+        return {
+            name: float(duration.split("=")[1])
+            for name, duration in (item.split(";") for item in header.split(", "))
+        }
+
+    def test_breakdown(self):
+        """Testa o cálculo das durações a partir das fases."""
+        phases = start_phases()
+        # Início de handler, endpoint e serialization, depois os fins, em segundos
+        with patch('app.core.tracing.time.perf_counter', side_effect=[0, 0.001, 0.0012, 0.0032, 0.0035, 0.004]):
+            try:
+                with phase("handler"):
+                    with phase("endpoint"):
+                        with phase("serialization"):
+                            pass
+            finally:
+                finish_phases(phases)
+
+        timings = self.timings(server_timing(phases, 0.005))
+
+        assert timings == {
+            "middleware": 1.0,
+            "validation": 1.5,
+            "handler": 0.5,
+            "serialization": 2.0,
+            "total": 5.0,
+        }
+
+    def test_phase_records_span_of_sampled_request(self):
+        """Testa que a fase também registra o span quando a requisição é amostrada."""
+        local = Tracer(sample_rate=1.0, buffer_size=10)
+        trace = local.start_request(None)
+        phases = start_phases()
+        try:
+            with phase("handler") as handler:
+                pass
+        finally:
+            finish_phases(phases)
+            local.finish_request(trace, "GET /", 0, {})
+
+        assert phases.handler is not None
+        assert [item.name for item in trace.spans] == ["handler", "GET /"]
+        assert trace.spans[0] is handler
+
+    def test_without_route(self):
+        """Testa uma requisição que não chegou a uma rota."""
+        assert server_timing(Phases(), 0.001) == "total;dur=1.000"
+
+    @pytest.mark.parametrize("path", ["/api/v1/greet?name=Ana", "/api/v1/metrics"])
+    def test_requested_by_header(self, path):
+        """Testa o cabeçalho pedido pelo cliente."""
+        client = TestClient(create_application())
+        with patch('app.main.settings.server_timing', "header"), patch.object(tracer, 'sample_rate', 0.0):
+            response = client.get(path, headers={"X-Server-Timing": "1"})
+            plain = client.get(path)
+
+        timings = self.timings(response.headers["server-timing"])
+        assert list(timings) == ["middleware", "validation", "handler", "serialization", "total"]
+        assert timings["total"] >= timings["handler"]
+        assert "server-timing" not in plain.headers
+
+    def test_header_does_not_force_sampling(self):
+        """Testa que o cabeçalho do cliente não força a amostragem do trace."""
+        client = TestClient(create_application())
+        local = Tracer(sample_rate=0.0, buffer_size=10)
+        with patch('app.main.settings.server_timing', "header"), patch('app.main.tracer', local):
+            response = client.get("/api/v1/healthz", headers={"X-Server-Timing": "1"})
+
+        assert "handler;dur=" in response.headers["server-timing"]
+        assert "traceresponse" not in response.headers
+        assert len(local.buffer) == 0
+
+    def test_without_tracing(self):
+        """Testa o cabeçalho com o rastreamento desligado."""
+        client = TestClient(create_application())
+        with patch('app.main.settings.server_timing', "header"), \
+                patch('app.main.settings.tracing_enabled', False):
+            response = client.get("/api/v1/greet?name=Ana", headers={"X-Server-Timing": "1"})
+
+        assert "handler;dur=" in response.headers["server-timing"]
+
+    def test_sampled_requests(self):
+        """Testa o cabeçalho em todas as requisições amostradas."""
+        client = TestClient(create_application())
+        with patch('app.main.settings.server_timing', "sampled"), patch.object(tracer, 'sample_rate', 1.0):
+            response = client.get("/api/v1/healthz")
+
+        assert "handler;dur=" in response.headers["server-timing"]
+
+    def test_disabled(self):
+        """Testa que o cabeçalho do cliente é ignorado quando desligado."""
+        client = TestClient(create_application())
+        with patch.object(tracer, 'sample_rate', 0.0):
+            response = client.get("/api/v1/healthz", headers={"X-Server-Timing": "1"})
+
+        assert "server-timing" not in response.headers
+        assert "traceresponse" not in response.headers
@@ -0,0 +1,74 @@
+"""Testes para as regras de validação de nomes."""
+
+import pytest
+from unittest.mock import patch
+
+from app.core.validation import InvalidNameError, validate_name
+
+
+class TestValidateName:
+    """Testes para a função validate_name."""
+
+    def test_valid_name(self):
+        """Testa um nome válido."""
+        assert validate_name("Ana-Paula") == "Ana-Paula"
+
+    def test_strips_spaces(self):
+        """Testa a remoção de espaços nas bordas."""
+        assert validate_name("  Ana  ") == "Ana"
+
+    def test_default_name(self):
+        """Testa o nome padrão quando nenhum nome é enviado."""
+        assert validate_name(None) == "you!!"
+
+    @pytest.mark.parametrize("name", ["", "a" * 101, "test@domain", "   ", 42])
+    def test_invalid_names(self, name):
+        """Testa nomes inválidos."""
+        with pytest.raises(InvalidNameError):
+            validate_name(name)
+
+
+class TestGreetValidationMiddleware:
+    """Testes para a rejeição antecipada de nomes inválidos."""
+
+    @pytest.mark.parametrize("query,reason", [
+        ("name=", "string_too_short"),
+        ("name=" + "a" * 101, "string_too_long"),
+        ("name=test%40domain", "string_pattern_mismatch"),
+        ("name=Ana&name=b%40", "string_pattern_mismatch"),
+    ])
+    def test_rejection_matches_validation_handler(self, test_client, query, reason):
+        """Testa que a rejeição antecipada tem o mesmo formato do handler de validação."""
+        with patch('app.core.validation.metrics') as mock_metrics:
+            response = test_client.get(f"/api/v1/greet?{query}")
+
+        assert response.status_code == 422
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        assert data["error"] == "Validation Error"
+        assert data["body"] is None
+        assert data["detail"][0]["type"] == reason
+        assert data["detail"][0]["loc"] == ["query", "name"]
+        mock_metrics.record_greet_rejection.assert_called_once_with(reason)
+
+    def test_same_body_as_fastapi_validation(self, test_client):
+        """Testa que o corpo coincide com o da validação do FastAPI (exceto o input)."""
+        from fastapi.testclient import TestClient
+        from app.main import create_application
+
+        with patch('app.main.GreetValidationMiddleware.__call__', autospec=True) as passthrough:
+            async def call(self, scope, receive, send):
+                await self.app(scope, receive, send)
+            passthrough.side_effect = call
+            expected = TestClient(create_application()).get("/api/v1/greet?name=te%40st").json()
+
+        response = test_client.get("/api/v1/greet?name=te%40st").json()
+
+        del expected["detail"][0]["input"]
+        assert response == expected
+
+    def test_valid_names_reach_endpoint(self, test_client):
+        """Testa que nomes válidos e espaços seguem para o endpoint."""
+        assert test_client.get("/api/v1/greet?name=Ana").status_code == 200
+        assert test_client.get("/api/v1/greet?name=%20%20").status_code == 400
+        assert test_client.get("/api/v1/greet").status_code == 200
@@ -0,0 +1,71 @@
+"""Testes para o aquecimento da aplicação na inicialização."""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.core.lifecycle import lifecycle
+from app.core.metrics import metrics
+from app.core.warmup import warm_up
+from app.main import create_application
+
+
+class TestWarmUp:
+    """Testes para a função warm_up."""
+
+    def test_requests_every_path(self):
+        """Testa o envio de uma requisição para cada caminho."""
+        app = FastAPI()
+        seen = []
+
+        @app.get("/items")
+        async def items(page: int = 1):
+            seen.append(page)
+            return {"page": page}
+
+        duration, failures = asyncio.run(warm_up(app, ["/items", "/items?page=2"]))
+
+        assert seen == [1, 2]
+        assert failures == []
+        assert duration > 0
+
+    def test_reports_failures(self):
+        """Testa o relato de rotas que falham sem interromper o aquecimento."""
+        app = FastAPI()
+
+        @app.get("/broken")
+        async def broken():
+            raise RuntimeError("boom")
+
+        @app.get("/ok")
+        async def ok():
+            return {}
+
+        duration, failures = asyncio.run(warm_up(app, ["/broken", "/ok"]))
+
+        assert [path for path, _ in failures] == ["/broken"]
+
+
+class TestLifespanWarmUp:
+    """Testes para o aquecimento executado no lifespan."""
+
+    def test_warm_up_is_not_recorded(self):
+        """Testa que as requisições de aquecimento não entram nas métricas."""
+        before = metrics.health_checks_total._value.get()
+
+        with TestClient(create_application()):
+            assert lifecycle.warming_up is False
+            assert metrics.warmup_seconds._value.get() > 0
+
+        assert metrics.health_checks_total._value.get() == before
+
+    def test_warm_up_disabled(self):
+        """Testa a desativação do aquecimento."""
+        with patch('app.main.settings.warmup_paths', []), \
+                patch('app.main.warm_up') as mock_warm_up:
+            with TestClient(create_application()):
+                pass
+
+        mock_warm_up.assert_not_called()